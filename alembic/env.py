@@ -10,7 +10,18 @@ sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), ".."
 
 from src.infrastructure.database import Base
 from src.feature_flags.model import FeatureFlag  # noqa
-from src.audit_logs.model import AuditLog  # noqa
+from src.audit_logs.model import (  # noqa
+    AuditLog,
+    AuditLogHourlyRollup,
+    AuditLogHourlyTotal,
+    AuditLogRollupState,
+)
+from src.idempotency.model import IdempotencyKey  # noqa
+from src.checkpoints.model import FlagStateCheckpoint  # noqa
+from src.environments.model import FlagEnvironmentState  # noqa
+from src.projects.model import Project  # noqa
+from src.flag_usage.model import FlagUsageDay  # noqa
+from src.schedules.model import ScheduledToggle  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,33 @@
+"""add operation id to audit logs
+
+Revision ID: 0b6e2d8a9c13
+Revises: f2a7c9d41e58
+Create Date: 2026-10-19 21:08:35.664102
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b6e2d8a9c13"
+down_revision: Union[str, Sequence[str], None] = "f2a7c9d41e58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("audit_logs", sa.Column("operation_id", sa.Uuid(), nullable=True))
+    op.create_index(
+        op.f("ix_audit_logs_operation_id"), "audit_logs", ["operation_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_audit_logs_operation_id"), table_name="audit_logs")
+    op.drop_column("audit_logs", "operation_id")
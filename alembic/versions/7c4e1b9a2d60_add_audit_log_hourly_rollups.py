@@ -0,0 +1,76 @@
+"""add audit log hourly rollups
+
+Revision ID: 7c4e1b9a2d60
+Revises: 0b6e2d8a9c13
+Create Date: 2026-10-19 09:12:37.604118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e1b9a2d60"
+down_revision: Union[str, Sequence[str], None] = "0b6e2d8a9c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "audit_log_hourly_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("target_entity", sa.String(), nullable=False),
+        sa.Column("target_id", sa.String(), nullable=False),
+        sa.Column("actor", sa.String(), nullable=True),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_audit_log_hourly_rollups_bucket_start"),
+        "audit_log_hourly_rollups",
+        ["bucket_start"],
+        unique=False,
+    )
+    op.create_table(
+        "audit_log_hourly_totals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("target_entity", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_audit_log_hourly_totals_bucket_start"),
+        "audit_log_hourly_totals",
+        ["bucket_start"],
+        unique=False,
+    )
+    op.create_table(
+        "audit_log_rollup_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("rolled_up_until", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("audit_log_rollup_state")
+    op.drop_index(
+        op.f("ix_audit_log_hourly_totals_bucket_start"),
+        table_name="audit_log_hourly_totals",
+    )
+    op.drop_table("audit_log_hourly_totals")
+    op.drop_index(
+        op.f("ix_audit_log_hourly_rollups_bucket_start"),
+        table_name="audit_log_hourly_rollups",
+    )
+    op.drop_table("audit_log_hourly_rollups")
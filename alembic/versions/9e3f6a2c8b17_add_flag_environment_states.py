@@ -0,0 +1,52 @@
+"""add flag environment states
+
+Revision ID: 9e3f6a2c8b17
+Revises: d5b8e3f71c24
+Create Date: 2026-10-19 09:13:21.905713
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e3f6a2c8b17"
+down_revision: Union[str, Sequence[str], None] = "d5b8e3f71c24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "flag_environment_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("flag_id", sa.Integer(), nullable=False),
+        sa.Column("environment", sa.String(), nullable=False),
+        sa.Column("is_enabled", sa.Boolean(), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.ForeignKeyConstraint(
+            ["flag_id"],
+            ["feature_flags.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_flag_environment_states_environment_flag_id",
+        "flag_environment_states",
+        ["environment", "flag_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_flag_environment_states_environment_flag_id",
+        table_name="flag_environment_states",
+    )
+    op.drop_table("flag_environment_states")
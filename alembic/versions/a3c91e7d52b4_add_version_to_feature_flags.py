@@ -0,0 +1,32 @@
+"""add version to feature flags
+
+Revision ID: a3c91e7d52b4
+Revises: 6fa1c750a6bb
+Create Date: 2026-10-19 09:12:44.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c91e7d52b4"
+down_revision: Union[str, Sequence[str], None] = "6fa1c750a6bb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "feature_flags",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("feature_flags", "version")
@@ -0,0 +1,55 @@
+"""add project to flag state checkpoints
+
+Revision ID: a8c2f5d9e317
+Revises: d9e4b2a7c158
+Create Date: 2026-10-19 13:24:08.531904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8c2f5d9e317"
+down_revision: Union[str, Sequence[str], None] = "d9e4b2a7c158"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The existing checkpoints cover all projects. They are rebuilt from the
+    # audit log, per project, when the next checkpoints are taken.
+    op.execute("DELETE FROM flag_state_checkpoints")
+    op.add_column(
+        "flag_state_checkpoints",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+    )
+    op.drop_index(
+        "ix_flag_state_checkpoints_taken_at", table_name="flag_state_checkpoints"
+    )
+    op.create_index(
+        "ix_flag_state_checkpoints_project_id_taken_at",
+        "flag_state_checkpoints",
+        ["project_id", "taken_at"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM flag_state_checkpoints")
+    op.drop_index(
+        "ix_flag_state_checkpoints_project_id_taken_at",
+        table_name="flag_state_checkpoints",
+    )
+    op.create_index(
+        "ix_flag_state_checkpoints_taken_at",
+        "flag_state_checkpoints",
+        ["taken_at"],
+        unique=True,
+    )
+    op.drop_column("flag_state_checkpoints", "project_id")
@@ -0,0 +1,308 @@
+"""add projects
+
+Revision ID: b71f4c2e9a35
+Revises: 9e3f6a2c8b17
+Create Date: 2026-10-19 10:02:47.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71f4c2e9a35"
+down_revision: Union[str, Sequence[str], None] = "9e3f6a2c8b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows all belong to the default project.
+DEFAULT_PROJECT_ID = 1
+
+AUDIT_LOG_COLUMNS = (
+    "id, project_id, timestamp, action, actor, details, target_entity, "
+    "target_id, operation_id"
+)
+# The single-column audit log indexes, which the partitioned table keeps.
+AUDIT_LOG_INDEXED_COLUMNS = (
+    "id",
+    "timestamp",
+    "target_entity",
+    "target_id",
+    "operation_id",
+)
+
+
+def _project_id_column() -> sa.Column:
+    return sa.Column(
+        "project_id",
+        sa.Integer(),
+        nullable=False,
+        server_default=str(DEFAULT_PROJECT_ID),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("has_partition", sa.Boolean(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.execute(
+        f"INSERT INTO projects (id, name, has_partition) "
+        f"VALUES ({DEFAULT_PROJECT_ID}, 'default', false)"
+    )
+    op.execute(
+        f"SELECT setval(pg_get_serial_sequence('projects', 'id'), "
+        f"{DEFAULT_PROJECT_ID})"
+    )
+
+    # Flags: names are unique per project, and (project_id, id) is the key
+    # the edges and environment states reference.
+    op.add_column("feature_flags", _project_id_column())
+    op.create_foreign_key(
+        "feature_flags_project_id_fkey",
+        "feature_flags",
+        "projects",
+        ["project_id"],
+        ["id"],
+    )
+    op.drop_index("ix_feature_flags_name", table_name="feature_flags")
+    op.create_index(
+        "ix_feature_flags_project_id_name",
+        "feature_flags",
+        ["project_id", "name"],
+        unique=True,
+    )
+    op.create_unique_constraint(
+        "uq_feature_flags_project_id_id", "feature_flags", ["project_id", "id"]
+    )
+    # `btree_gin` lets the trigram index lead with the project.
+    op.drop_index("ix_feature_flags_name_trgm", table_name="feature_flags")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index(
+        "ix_feature_flags_project_id_name_trgm",
+        "feature_flags",
+        ["project_id", "name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+    op.add_column("feature_dependency_association", _project_id_column())
+    for end in ("dependent", "parent"):
+        op.drop_constraint(
+            f"feature_dependency_association_{end}_feature_id_fkey",
+            "feature_dependency_association",
+            type_="foreignkey",
+        )
+        op.create_foreign_key(
+            f"fk_feature_dependency_association_{end}",
+            "feature_dependency_association",
+            "feature_flags",
+            ["project_id", f"{end}_feature_id"],
+            ["project_id", "id"],
+        )
+    op.create_index(
+        "ix_feature_dependency_association_project_id_parent",
+        "feature_dependency_association",
+        ["project_id", "parent_feature_id"],
+    )
+
+    op.add_column("flag_environment_states", _project_id_column())
+    op.alter_column("flag_environment_states", "project_id", server_default=None)
+    op.drop_constraint(
+        "flag_environment_states_flag_id_fkey",
+        "flag_environment_states",
+        type_="foreignkey",
+    )
+    op.create_foreign_key(
+        "flag_environment_states_project_id_flag_id_fkey",
+        "flag_environment_states",
+        "feature_flags",
+        ["project_id", "flag_id"],
+        ["project_id", "id"],
+        ondelete="CASCADE",
+    )
+    op.drop_index(
+        "ix_flag_environment_states_environment_flag_id",
+        table_name="flag_environment_states",
+    )
+    op.create_index(
+        "ix_flag_environment_states_project_id_environment_flag_id",
+        "flag_environment_states",
+        ["project_id", "environment", "flag_id"],
+        unique=True,
+    )
+
+    for table in ("audit_log_hourly_rollups", "audit_log_hourly_totals"):
+        op.add_column(table, _project_id_column())
+        op.create_index(
+            f"ix_{table}_project_id_bucket_start",
+            table,
+            ["project_id", "bucket_start"],
+        )
+
+    # The existing table becomes the default partition of a table list
+    # partitioned by project. Its rows stay where they are, and its indexes
+    # are attached to the partitioned ones rather than built again.
+    op.rename_table("audit_logs", "audit_logs_shared")
+    op.add_column("audit_logs_shared", _project_id_column())
+    op.drop_constraint("audit_logs_pkey", "audit_logs_shared", type_="primary")
+    op.create_primary_key(
+        "audit_logs_shared_pkey", "audit_logs_shared", ["id", "project_id"]
+    )
+    for column in AUDIT_LOG_INDEXED_COLUMNS:
+        op.execute(
+            f"ALTER INDEX ix_audit_logs_{column} "
+            f"RENAME TO audit_logs_shared_{column}_idx"
+        )
+    op.create_table(
+        "audit_logs",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('audit_logs_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        _project_id_column(),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("actor", sa.String(), nullable=True),
+        sa.Column("details", sa.JSON(), nullable=True),
+        sa.Column("target_entity", sa.String(), nullable=False),
+        sa.Column("target_id", sa.String(), nullable=False),
+        sa.Column("operation_id", sa.Uuid(), nullable=True),
+        sa.PrimaryKeyConstraint("id", "project_id"),
+        postgresql_partition_by="LIST (project_id)",
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("ALTER TABLE audit_logs ATTACH PARTITION audit_logs_shared DEFAULT")
+    for column in AUDIT_LOG_INDEXED_COLUMNS:
+        op.create_index(f"ix_audit_logs_{column}", "audit_logs", [column])
+    op.create_index(
+        "ix_audit_logs_project_id_timestamp",
+        "audit_logs",
+        ["project_id", "timestamp"],
+    )
+    op.create_index(
+        "ix_audit_logs_project_id_target",
+        "audit_logs",
+        ["project_id", "target_entity", "target_id"],
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+
+    Fails when flags of different projects share a name. The entries of
+    projects with an audit partition of their own are moved back.
+    """
+    connection = op.get_bind()
+    op.execute("ALTER TABLE audit_logs DETACH PARTITION audit_logs_shared")
+    partitions = connection.scalars(
+        sa.text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'audit_logs'::regclass"
+        )
+    ).all()
+    for partition in partitions:
+        op.execute(f"ALTER TABLE audit_logs DETACH PARTITION {partition}")
+        op.execute(
+            f"INSERT INTO audit_logs_shared ({AUDIT_LOG_COLUMNS}) "
+            f"SELECT {AUDIT_LOG_COLUMNS} FROM {partition}"
+        )
+        op.drop_table(partition)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs_shared.id")
+    op.drop_table("audit_logs")
+    op.rename_table("audit_logs_shared", "audit_logs")
+    for column in AUDIT_LOG_INDEXED_COLUMNS:
+        op.execute(
+            f"ALTER INDEX audit_logs_shared_{column}_idx "
+            f"RENAME TO ix_audit_logs_{column}"
+        )
+    op.drop_constraint("audit_logs_shared_pkey", "audit_logs", type_="primary")
+    op.drop_column("audit_logs", "project_id")
+    op.create_primary_key("audit_logs_pkey", "audit_logs", ["id"])
+
+    for table in ("audit_log_hourly_totals", "audit_log_hourly_rollups"):
+        op.drop_index(f"ix_{table}_project_id_bucket_start", table_name=table)
+        op.drop_column(table, "project_id")
+
+    op.drop_index(
+        "ix_flag_environment_states_project_id_environment_flag_id",
+        table_name="flag_environment_states",
+    )
+    op.create_index(
+        "ix_flag_environment_states_environment_flag_id",
+        "flag_environment_states",
+        ["environment", "flag_id"],
+        unique=True,
+    )
+    op.drop_constraint(
+        "flag_environment_states_project_id_flag_id_fkey",
+        "flag_environment_states",
+        type_="foreignkey",
+    )
+    op.create_foreign_key(
+        "flag_environment_states_flag_id_fkey",
+        "flag_environment_states",
+        "feature_flags",
+        ["flag_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.drop_column("flag_environment_states", "project_id")
+
+    op.drop_index(
+        "ix_feature_dependency_association_project_id_parent",
+        table_name="feature_dependency_association",
+    )
+    for end in ("dependent", "parent"):
+        op.drop_constraint(
+            f"fk_feature_dependency_association_{end}",
+            "feature_dependency_association",
+            type_="foreignkey",
+        )
+        op.create_foreign_key(
+            f"feature_dependency_association_{end}_feature_id_fkey",
+            "feature_dependency_association",
+            "feature_flags",
+            [f"{end}_feature_id"],
+            ["id"],
+        )
+    op.drop_column("feature_dependency_association", "project_id")
+
+    # The extensions are left installed, other objects may depend on them.
+    op.drop_index("ix_feature_flags_project_id_name_trgm", table_name="feature_flags")
+    op.create_index(
+        "ix_feature_flags_name_trgm",
+        "feature_flags",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.drop_constraint(
+        "uq_feature_flags_project_id_id", "feature_flags", type_="unique"
+    )
+    op.drop_index("ix_feature_flags_project_id_name", table_name="feature_flags")
+    op.create_index("ix_feature_flags_name", "feature_flags", ["name"], unique=True)
+    op.drop_constraint(
+        "feature_flags_project_id_fkey", "feature_flags", type_="foreignkey"
+    )
+    op.drop_column("feature_flags", "project_id")
+    op.drop_table("projects")
@@ -0,0 +1,45 @@
+"""add flag usage days
+
+Revision ID: c3d8a1f6e742
+Revises: b71f4c2e9a35
+Create Date: 2026-10-19 11:24:09.630517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8a1f6e742"
+down_revision: Union[str, Sequence[str], None] = "b71f4c2e9a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "flag_usage_days",
+        sa.Column("flag_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("evaluations", sa.BigInteger(), nullable=False),
+        sa.Column("last_evaluated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["flag_id"],
+            ["feature_flags.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("flag_id", "day"),
+    )
+    op.create_index(
+        op.f("ix_flag_usage_days_day"), "flag_usage_days", ["day"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_flag_usage_days_day"), table_name="flag_usage_days")
+    op.drop_table("flag_usage_days")
@@ -0,0 +1,33 @@
+"""add targeting rules to feature flags
+
+Revision ID: d5b8e3f71c24
+Revises: 7c4e1b9a2d60
+Create Date: 2026-10-19 09:13:02.417356
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b8e3f71c24"
+down_revision: Union[str, Sequence[str], None] = "7c4e1b9a2d60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "feature_flags",
+        sa.Column("rules", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("feature_flags", "rules")
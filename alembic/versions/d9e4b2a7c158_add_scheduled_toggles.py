@@ -0,0 +1,64 @@
+"""add scheduled toggles
+
+Revision ID: d9e4b2a7c158
+Revises: c3d8a1f6e742
+Create Date: 2026-10-19 12:41:53.207416
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9e4b2a7c158"
+down_revision: Union[str, Sequence[str], None] = "c3d8a1f6e742"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scheduled_toggles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("flag_id", sa.Integer(), nullable=False),
+        sa.Column("is_enabled", sa.Boolean(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("actor", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), server_default="pending", nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("executed_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["project_id", "flag_id"],
+            ["feature_flags.project_id", "feature_flags.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduled_toggles_pending_due_at",
+        "scheduled_toggles",
+        ["due_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_scheduled_toggles_project_id_flag_id",
+        "scheduled_toggles",
+        ["project_id", "flag_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_scheduled_toggles_project_id_flag_id", table_name="scheduled_toggles"
+    )
+    op.drop_index("ix_scheduled_toggles_pending_due_at", table_name="scheduled_toggles")
+    op.drop_table("scheduled_toggles")
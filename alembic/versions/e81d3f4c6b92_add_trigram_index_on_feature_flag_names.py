@@ -0,0 +1,37 @@
+"""add trigram index on feature flag names
+
+Revision ID: e81d3f4c6b92
+Revises: c52e08f9a1d3
+Create Date: 2026-10-19 17:26:08.514390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e81d3f4c6b92"
+down_revision: Union[str, Sequence[str], None] = "c52e08f9a1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_feature_flags_name_trgm",
+        "feature_flags",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension is left installed, other objects may depend on it.
+    op.drop_index("ix_feature_flags_name_trgm", table_name="feature_flags")
@@ -0,0 +1,56 @@
+"""add flag state checkpoints
+
+Revision ID: f2a7c9d41e58
+Revises: e81d3f4c6b92
+Create Date: 2026-10-19 19:41:52.207331
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a7c9d41e58"
+down_revision: Union[str, Sequence[str], None] = "e81d3f4c6b92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "flag_state_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("flag_count", sa.Integer(), nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_flag_state_checkpoints_taken_at",
+        "flag_state_checkpoints",
+        ["taken_at"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_audit_logs_timestamp"), "audit_logs", ["timestamp"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_audit_logs_timestamp"), table_name="audit_logs")
+    op.drop_index(
+        "ix_flag_state_checkpoints_taken_at", table_name="flag_state_checkpoints"
+    )
+    op.drop_table("flag_state_checkpoints")
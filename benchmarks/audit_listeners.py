@@ -0,0 +1,123 @@
+"""
+Measures the CPU overhead of the audit listeners per row, without a database.
+
+    python -m benchmarks.audit_listeners --rows 10000 --output audit.json
+
+Each listener is called directly on flags attached to an unbound session, in
+coalescing mode, so the numbers cover building the audit entries only. The
+compiled serializer and differ are also compared with the mapper reflection
+they replaced.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import (
+    Session,
+    attributes,
+    make_transient_to_detached,
+    object_session,
+)
+
+from src.audit_logs import events
+from src.feature_flags.model import FeatureFlag
+
+
+def _reflective_snapshot(instance: Any) -> dict[str, Any]:
+    mapper = inspect(instance.__class__)
+    return {c.key: getattr(instance, c.key) for c in mapper.column_attrs}
+
+
+def _reflective_diff(instance: Any) -> dict[str, dict[str, Any]]:
+    changes = {}
+    for attr in inspect(instance).mapper.column_attrs:
+        history = attributes.get_history(instance, attr.key)
+        if history.has_changes():
+            changes[attr.key] = {
+                "before": history.deleted[0] if history.deleted else None,
+                "after": history.added[0] if history.added else None,
+            }
+    return changes
+
+
+def _flags(session: Session, rows: int, persistent: bool) -> list[FeatureFlag]:
+    flags = []
+    for i in range(rows):
+        flag = FeatureFlag(
+            id=i + 1, name=f"flag-{i}", description="d", is_enabled=False, version=1
+        )
+        if persistent:
+            make_transient_to_detached(flag)
+        session.add(flag)
+        if persistent:
+            flag.is_enabled = True
+        flags.append(flag)
+    return flags
+
+
+def _per_row_us(fn: Callable[[FeatureFlag], Any], flags: list[FeatureFlag]) -> float:
+    # Drops the entries pending from the previous run.
+    object_session(flags[0]).info.clear()
+    started = time.perf_counter()
+    for flag in flags:
+        fn(flag)
+    return (time.perf_counter() - started) / len(flags) * 1_000_000
+
+
+def measure(rows: int, repeats: int) -> dict[str, float]:
+    events.register_audit_listeners(coalesce=True)
+    auditor = events._auditors[FeatureFlag]
+    mapper = inspect(FeatureFlag)
+    # The sessions are kept referenced, flags only hold them weakly.
+    sessions = Session(), Session()
+    new_flags = _flags(sessions[0], rows, persistent=False)
+    changed_flags = _flags(sessions[1], rows, persistent=True)
+
+    cases = {
+        "log_create": (lambda f: events.log_create(mapper, None, f), new_flags),
+        "log_update": (lambda f: events.log_update(mapper, None, f), changed_flags),
+        "log_delete": (lambda f: events.log_delete(mapper, None, f), changed_flags),
+        "snapshot_compiled": (auditor.snapshot, changed_flags),
+        "snapshot_reflective": (_reflective_snapshot, changed_flags),
+        "diff_compiled": (auditor.diff, changed_flags),
+        "diff_reflective": (_reflective_diff, changed_flags),
+    }
+    results = {}
+    for name, (fn, flags) in cases.items():
+        results[f"{name}_us"] = min(_per_row_us(fn, flags) for _ in range(repeats))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure audit listener overhead.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    summary = {
+        name: round(value, 3)
+        for name, value in measure(args.rows, args.repeats).items()
+    }
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "rows": args.rows,
+            "repeats": args.repeats,
+        },
+        "per_row": summary,
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures cold start: launches the API in a fresh uvicorn process and records
+how long it takes to become ready and to serve its first fast request.
+
+    python -m benchmarks.cold_start --runs 5 --output cold_start.json
+
+The database from DEPENDENCY_APP_POSTGRES_DSN must already have the schema.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from .metrics import percentile
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(timeout: float) -> dict:
+    port = _free_port()
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base_url, timeout=1.0) as client:
+            listening_s = ready_s = None
+            while time.perf_counter() - launched < timeout:
+                try:
+                    response = client.get("/ready")
+                except httpx.TransportError:
+                    time.sleep(0.01)
+                    continue
+                listening_s = listening_s or time.perf_counter() - launched
+                if response.status_code == 200:
+                    ready_s = time.perf_counter() - launched
+                    break
+                time.sleep(0.01)
+            if ready_s is None:
+                raise RuntimeError("The service did not become ready in time.")
+
+            first_request_started = time.perf_counter()
+            client.get("/flags/", headers={"X-Actor": "cold-start"})
+            first_request_ms = (time.perf_counter() - first_request_started) * 1000
+            timeline = client.get("/ready").json()
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "listening_s": listening_s,
+        "ready_s": ready_s,
+        "first_request_ms": first_request_ms,
+        "timeline": timeline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure service cold start.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    runs = [measure_once(args.timeout) for _ in range(args.runs)]
+    summary = {}
+    for key in ("listening_s", "ready_s", "first_request_ms"):
+        values = sorted(run[key] for run in runs)
+        summary[key] = {"p50": percentile(values, 50), "max": values[-1]}
+    fast = sorted(
+        run["timeline"]["time_to_first_fast_request"]
+        for run in runs
+        if run["timeline"]["time_to_first_fast_request"] is not None
+    )
+    summary["time_to_first_fast_request_s"] = {
+        "p50": percentile(fast, 50),
+        "max": fast[-1] if fast else None,
+    }
+    report = {
+        "meta": {"started_at": datetime.now(timezone.utc).isoformat()},
+        "summary": summary,
+        "runs": runs,
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Measures flag evaluations per second on one core, without a database.
+
+    python -m benchmarks.flag_evaluation --contexts 10000 --output eval.json
+
+Each case evaluates the same flags for a set of synthetic contexts. The
+compiled evaluators are compared with interpreting the stored rules on
+every evaluation, which is what serving them without compilation costs.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from src.feature_flags.evaluation import (
+    BUCKETS,
+    EvaluatorCache,
+    _OPERATORS,
+    parse_semver_range,
+    parse_version,
+)
+
+FLAGS: dict[str, Optional[list[dict]]] = {
+    "no_rules": None,
+    "rollout": [{"percentage": 20}],
+    "targeted": [
+        {
+            "conditions": [
+                {"kind": "in", "attribute": "country", "values": ["NL", "DE", "BE"]},
+                {"kind": "in", "attribute": "plan", "values": ["pro", "team"]},
+            ],
+        },
+        {
+            "conditions": [
+                {
+                    "kind": "semver",
+                    "attribute": "app_version",
+                    "range": ">=2.4.0 <3.0.0 || >=3.1.0-beta.1",
+                },
+            ],
+            "percentage": 50,
+        },
+        {"percentage": 5, "bucket_by": "user_id"},
+    ],
+}
+
+
+def _contexts(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(42)
+
+    def version() -> str:
+        return f"{rng.randint(1, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 5)}"
+
+    return [
+        {
+            "key": f"user-{i}",
+            "user_id": i,
+            "country": rng.choice(["NL", "DE", "FR", "US", "BE"]),
+            "plan": rng.choice(["free", "pro", "team"]),
+            "app_version": version(),
+        }
+        for i in range(count)
+    ]
+
+
+def _interpret(
+    flag_id: int, rules: Optional[list[dict]], context: dict[str, Any]
+) -> bool:
+    """Evaluates the stored rules as they are, parsing them every time."""
+    if not rules:
+        return True
+    for rule in rules:
+        matched = True
+        for condition in rule.get("conditions", ()):
+            value = context.get(condition["attribute"])
+            if condition["kind"] == "in":
+                matched = value in condition["values"]
+            else:
+                version = parse_version(value) if isinstance(value, str) else None
+                matched = version is not None and any(
+                    all(_OPERATORS[op](version, bound) for op, bound in comparators)
+                    for comparators in parse_semver_range(condition["range"])
+                )
+            if not matched:
+                break
+        if matched:
+            subject = context.get(rule.get("bucket_by", "key"))
+            threshold = rule.get("percentage", 100) * BUCKETS / 100
+            if subject is None:
+                return False
+            digest = hashlib.blake2b(
+                f"{flag_id}:{subject}".encode(), digest_size=8
+            ).digest()
+            return int.from_bytes(digest, "big") % BUCKETS < threshold
+    return False
+
+
+def _per_second(evaluate: Callable[[dict[str, Any]], Any], contexts: list) -> float:
+    started = time.perf_counter()
+    for context in contexts:
+        evaluate(context)
+    return len(contexts) / (time.perf_counter() - started)
+
+
+def measure(contexts: int, repeats: int) -> dict[str, float]:
+    samples = _contexts(contexts)
+    cache = EvaluatorCache()
+    results = {}
+    for flag_id, (name, rules) in enumerate(FLAGS.items(), start=1):
+        evaluator = cache.get_or_compile(flag_id, 1, True, rules)
+        cases = {
+            "compiled": evaluator.evaluate,
+            # Includes the cache lookup a request does.
+            "cached": lambda c, i=flag_id, r=rules: cache.get_or_compile(
+                i, 1, True, r
+            ).evaluate(c),
+            "interpreted": lambda c, i=flag_id, r=rules: _interpret(i, r, c),
+        }
+        for case, evaluate in cases.items():
+            results[f"{name}_{case}_per_s"] = max(
+                _per_second(evaluate, samples) for _ in range(repeats)
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure flag evaluation speed.")
+    parser.add_argument("--contexts", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    summary = {
+        name: round(value)
+        for name, value in measure(args.contexts, args.repeats).items()
+    }
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "contexts": args.contexts,
+            "repeats": args.repeats,
+        },
+        "evaluations": summary,
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import statistics
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """Counts the statements executed through an engine since the last reset."""
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine.sync_engine
+        self.count = 0
+
+    def _before_cursor_execute(self, *args: Any) -> None:
+        self.count += 1
+
+    def attach(self) -> None:
+        event.listen(self._engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def detach(self) -> None:
+        event.remove(self._engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def reset(self) -> None:
+        self.count = 0
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    params: dict[str, Any] = field(default_factory=dict)
+    latencies_ms: list[float] = field(default_factory=list)
+    query_counts: list[int] = field(default_factory=list)
+    cpu_ms: list[float] = field(default_factory=list)
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def record(
+        self, latency_ms: float, queries: int, cpu_ms: float | None = None
+    ) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.query_counts.append(queries)
+        if cpu_ms is not None:
+            self.cpu_ms.append(cpu_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        result = {
+            "params": self.params,
+            "iterations": len(latencies),
+            "latency_ms": {
+                "min": latencies[0] if latencies else 0.0,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else 0.0,
+                "mean": statistics.fmean(latencies) if latencies else 0.0,
+            },
+            "queries": {
+                "min": min(self.query_counts, default=0),
+                "max": max(self.query_counts, default=0),
+                "mean": (
+                    statistics.fmean(self.query_counts) if self.query_counts else 0.0
+                ),
+            },
+        }
+        if self.cpu_ms:
+            cpu_ms = sorted(self.cpu_ms)
+            result["cpu_ms"] = {
+                "p50": percentile(cpu_ms, 50),
+                "p99": percentile(cpu_ms, 99),
+                "mean": statistics.fmean(cpu_ms),
+            }
+        if self.extra:
+            result.update(self.extra)
+        return result
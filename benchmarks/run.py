@@ -0,0 +1,121 @@
+"""
+Runs the benchmark scenarios against a local Postgres and writes a JSON report.
+
+    python -m benchmarks.run --flags 5000 --depth 10 --output results.json
+
+The database referenced by DEPENDENCY_APP_POSTGRES_DSN (or --dsn) is dropped
+and re-seeded, never point this at a database you care about.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+
+from .metrics import QueryCounter
+from .scenarios import SCENARIOS, BenchContext
+from .seed import add_shape_arguments, seed_graph, shape_from_arguments
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.dsn:
+        os.environ["DEPENDENCY_APP_POSTGRES_DSN"] = args.dsn
+    # Imported late so the app factory sees the DSN override.
+    from src.app import create_app
+
+    app = create_app()
+    engine = app.container.database().engine
+    graph = await seed_graph(engine, shape_from_arguments(args))
+
+    counter = QueryCounter(engine)
+    counter.attach()
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "graph": graph.summary(),
+        },
+        "scenarios": {},
+    }
+    try:
+        async with app.router.lifespan_context(app):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                ctx = BenchContext(
+                    client=client,
+                    engine=engine,
+                    graph=graph,
+                    counter=counter,
+                    iterations=args.iterations,
+                    warmup=args.warmup,
+                    rng=random.Random(args.seed),
+                )
+                for name in args.scenario or SCENARIOS:
+                    for result in await SCENARIOS[name](ctx):
+                        report["scenarios"][result.name] = result.to_dict()
+    finally:
+        counter.detach()
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument("--dsn", help="Defaults to DEPENDENCY_APP_POSTGRES_DSN.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run, may be repeated. Defaults to all.",
+    )
+    parser.add_argument("--output", type=Path, help="Path of the JSON report.")
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / (
+        datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        cpu = result.get("cpu_ms", {}).get("mean")
+        print(
+            f"{name:32} p50={latency['p50']:8.2f}ms p99={latency['p99']:8.2f}ms "
+            f"queries={result['queries']['mean']:.1f}"
+            + (f" cpu={cpu:.2f}ms" if cpu is not None else "")
+        )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
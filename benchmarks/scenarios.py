@@ -0,0 +1,342 @@
+import asyncio
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.audit_logs.model import AuditLog, AuditLogHourlyRollup
+from src.audit_logs.repository import AuditLogRepository, AuditLogRollupRepository
+from src.audit_logs.service import AuditLogService
+from src.feature_flags.enums import FeatureFlagAuditActionEnum
+from .metrics import QueryCounter, ScenarioResult
+from .seed import SeededGraph, enable_all_flags, flag_name
+
+HEADERS = {"X-Actor": "benchmark"}
+
+
+@dataclass
+class BenchContext:
+    client: AsyncClient
+    engine: AsyncEngine
+    graph: SeededGraph
+    counter: QueryCounter
+    iterations: int
+    warmup: int
+    rng: random.Random
+
+    async def measure(
+        self,
+        result: ScenarioResult,
+        request: Callable[[int], Awaitable[Response]],
+        setup: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> ScenarioResult:
+        """
+        Runs `request` for warmup + measured iterations, recording the wall
+        clock latency, the process CPU time and the number of SQL statements
+        of each measured call.
+        `setup` runs before every call and is excluded from the measurement.
+        """
+        for i in range(self.warmup + self.iterations):
+            if setup:
+                await setup()
+            self.counter.reset()
+            started = time.perf_counter()
+            cpu_started = time.process_time()
+            response = await request(i)
+            cpu_ms = (time.process_time() - cpu_started) * 1000
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if response.is_error:
+                raise RuntimeError(
+                    f"{result.name}: {response.status_code} {response.text}"
+                )
+            if i >= self.warmup:
+                result.record(elapsed_ms, self.counter.count, cpu_ms)
+        return result
+
+
+Scenario = Callable[[BenchContext], Awaitable[list[ScenarioResult]]]
+
+
+async def create_with_deep_dependencies(ctx: BenchContext) -> list[ScenarioResult]:
+    """Creates flags depending on leaves, so validation walks the full depth."""
+    dependency_count = min(3, len(ctx.graph.leaves))
+    result = ScenarioResult(
+        name="create_deep_dependencies",
+        params={"dependencies": dependency_count, "depth": ctx.graph.shape.depth},
+    )
+
+    async def request(i: int) -> Response:
+        return await ctx.client.post(
+            "/flags/",
+            json={
+                "name": f"bench-created-{time.time_ns()}-{i}",
+                "dependency_ids": ctx.rng.sample(ctx.graph.leaves, dependency_count),
+            },
+            headers=HEADERS,
+        )
+
+    return [await ctx.measure(result, request)]
+
+
+async def toggle_cascade(ctx: BenchContext) -> list[ScenarioResult]:
+    """Disables a root flag, cascading through all of its descendants."""
+    result = ScenarioResult(
+        name="toggle_cascade", params={"roots": len(ctx.graph.roots)}
+    )
+
+    async def setup() -> None:
+        await enable_all_flags(ctx.engine)
+
+    async def request(i: int) -> Response:
+        root_id = ctx.graph.roots[i % len(ctx.graph.roots)]
+        return await ctx.client.patch(
+            f"/flags/{root_id}/toggle", json={"is_enabled": False}, headers=HEADERS
+        )
+
+    await ctx.measure(result, request, setup=setup)
+    await enable_all_flags(ctx.engine)
+    return [result]
+
+
+async def get_all_paging(ctx: BenchContext) -> list[ScenarioResult]:
+    """Lists flags page by page for several page sizes."""
+    results = []
+    for limit in (10, 100, 500):
+        result = ScenarioResult(name=f"get_all_limit_{limit}", params={"limit": limit})
+        pages = max(1, ctx.graph.shape.flags // limit)
+
+        async def request(i: int, limit: int = limit, pages: int = pages) -> Response:
+            return await ctx.client.get(
+                "/flags/",
+                params={"skip": (i % pages) * limit, "limit": limit},
+                headers=HEADERS,
+            )
+
+        results.append(await ctx.measure(result, request))
+    return results
+
+
+async def get_history_filtering(ctx: BenchContext) -> list[ScenarioResult]:
+    """Reads audit history unfiltered and with each supported filter."""
+    flag_ids = ctx.graph.flag_ids
+    actions = [action.value for action in FeatureFlagAuditActionEnum]
+    filters: dict[str, Callable[[int], dict]] = {
+        "unfiltered": lambda i: {"skip": (i % 10) * 100},
+        "target_id": lambda i: {
+            "target_entity": "feature_flags",
+            "target_id": str(ctx.rng.choice(flag_ids)),
+        },
+        "action": lambda i: {"action": actions[i % len(actions)]},
+        "target_id_and_action": lambda i: {
+            "target_id": str(ctx.rng.choice(flag_ids)),
+            "action": actions[i % len(actions)],
+        },
+    }
+    results = []
+    for name, build_params in filters.items():
+        result = ScenarioResult(name=f"get_history_{name}", params={"filter": name})
+
+        async def request(i: int, build_params=build_params) -> Response:
+            return await ctx.client.get(
+                "/history/", params=build_params(i), headers=HEADERS
+            )
+
+        results.append(await ctx.measure(result, request))
+    return results
+
+
+async def audit_stats(ctx: BenchContext) -> list[ScenarioResult]:
+    """
+    Counts toggles per hour, in total and per flag, over the whole seeded
+    history: first from the audit log alone, then after rolling it up.
+    """
+    queries = {
+        "hourly": {"bucket": "hour", "action": "toggle", "limit": 10_000},
+        "hourly_per_flag": {
+            "bucket": "hour",
+            "action": "toggle",
+            "group_by": "target_id",
+            "limit": 10_000,
+        },
+    }
+
+    async def measure_all(suffix: str, extra: dict) -> list[ScenarioResult]:
+        results = []
+        for name, params in queries.items():
+
+            async def request(i: int, params=params) -> Response:
+                return await ctx.client.get(
+                    "/history/stats", params=params, headers=HEADERS
+                )
+
+            result = ScenarioResult(
+                name=f"stats_{name}_{suffix}", params=params, extra=dict(extra)
+            )
+            results.append(await ctx.measure(result, request))
+        return results
+
+    results = await measure_all("raw", {})
+    async with AsyncSession(ctx.engine) as session:
+        service = AuditLogService(
+            repository=AuditLogRepository(model=AuditLog, db_session=session),
+            rollup_repository=AuditLogRollupRepository(
+                model=AuditLogHourlyRollup, db_session=session
+            ),
+        )
+        started = time.perf_counter()
+        added = await service.roll_up(until=datetime.utcnow())
+        rollup_ms = (time.perf_counter() - started) * 1000
+    return results + await measure_all(
+        "rolled_up", {"rollup_rows": added, "rollup_ms": rollup_ms}
+    )
+
+
+async def lookup_by_name(ctx: BenchContext) -> list[ScenarioResult]:
+    """
+    Looks up flags by their exact name, and searches by a name prefix and by
+    a substring, as SDKs and UIs resolving names do.
+    """
+    flag_ids = ctx.graph.flag_ids
+    lookups: dict[str, Callable[[], tuple[str, dict]]] = {
+        "by_name": lambda: (
+            f"/flags/by-name/{flag_name(ctx.rng.choice(flag_ids))}",
+            {},
+        ),
+        "search_prefix": lambda: (
+            "/flags/search",
+            {"q": flag_name(ctx.rng.choice(flag_ids)), "fields": "name"},
+        ),
+        "search_substring": lambda: (
+            "/flags/search",
+            {"q": f"flag-{ctx.rng.choice(flag_ids)}", "fields": "name"},
+        ),
+    }
+    results = []
+    for name, build_request in lookups.items():
+        result = ScenarioResult(
+            name=f"lookup_{name}",
+            params={"trigram_index": ctx.graph.name_search_index},
+        )
+
+        async def request(i: int, build_request=build_request) -> Response:
+            path, params = build_request()
+            return await ctx.client.get(path, params=params, headers=HEADERS)
+
+        results.append(await ctx.measure(result, request))
+    return results
+
+
+def _toggle_writer(
+    root_id: int, warmup: int, iterations: int, barrier: Any
+) -> tuple[list[float], float, float]:
+    """
+    Runs in a separate process with its own app instance, so that writers
+    are limited by the database rather than by one event loop. Returns the
+    latencies and the wall clock bounds of the measured toggles.
+    """
+
+    async def run() -> tuple[list[float], float, float]:
+        from src.app import create_app
+
+        app = create_app()
+        latencies = []
+        async with app.router.lifespan_context(app):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                for i in range(warmup + iterations):
+                    if i == warmup:
+                        barrier.wait()
+                        window_started = time.time()
+                    started = time.perf_counter()
+                    # Alternating states, so disabling cascades down the chain.
+                    response = await client.patch(
+                        f"/flags/{root_id}/toggle",
+                        json={"is_enabled": i % 2 == 1},
+                        headers=HEADERS,
+                    )
+                    if response.is_error:
+                        raise RuntimeError(f"{response.status_code} {response.text}")
+                    if i >= warmup:
+                        latencies.append((time.perf_counter() - started) * 1000)
+        await app.container.database().engine.dispose()
+        return latencies, window_started, time.time()
+
+    return asyncio.run(run())
+
+
+async def parallel_writes(ctx: BenchContext) -> list[ScenarioResult]:
+    """
+    Runs a fixed number of concurrent writer processes spread over 1, 2, 4
+    and 8 independent chains of flags. Writers on the same chain serialize
+    on its advisory locks, so throughput should grow with the number of chains.
+    """
+    writers, chain_length = 8, 5
+    chains: list[list[int]] = []
+    for c in range(writers):
+        chain: list[int] = []
+        for n in range(chain_length):
+            response = await ctx.client.post(
+                "/flags/",
+                json={
+                    "name": f"bench-chain-{time.time_ns()}-{c}-{n}",
+                    "is_enabled": True,
+                    "dependency_ids": chain[-1:],
+                },
+                headers=HEADERS,
+            )
+            response.raise_for_status()
+            chain.append(response.json()["id"])
+        chains.append(chain)
+
+    results = []
+    mp_context = multiprocessing.get_context("spawn")
+    with mp_context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=writers, mp_context=mp_context
+    ) as pool:
+        loop = asyncio.get_running_loop()
+        for components in (1, 2, 4, 8):
+            result = ScenarioResult(
+                name=f"parallel_writes_{components}_components",
+                params={"writers": writers, "components": components},
+            )
+            barrier = manager.Barrier(writers)
+            runs = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool,
+                        _toggle_writer,
+                        chains[w % components][0],
+                        ctx.warmup,
+                        ctx.iterations,
+                        barrier,
+                    )
+                    for w in range(writers)
+                )
+            )
+            for latencies, _, _ in runs:
+                for latency_ms in latencies:
+                    # Statements run in the writer processes and are not counted.
+                    result.record(latency_ms, 0)
+            window = max(run[2] for run in runs) - min(run[1] for run in runs)
+            result.extra["throughput_per_s"] = writers * ctx.iterations / window
+            results.append(result)
+    return results
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "create": create_with_deep_dependencies,
+    "toggle": toggle_cascade,
+    "get_all": get_all_paging,
+    "get_history": get_history_filtering,
+    "parallel_writes": parallel_writes,
+    "lookup": lookup_by_name,
+    "stats": audit_stats,
+}
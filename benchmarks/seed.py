@@ -0,0 +1,281 @@
+"""
+Synthetic flag graph generator.
+
+Builds a layered dependency DAG with a fixed shape and inserts it with bulk
+Core statements, bypassing the ORM and the audit listeners so seeding large
+graphs stays fast. Audit history is generated separately and inserted the same
+way.
+
+Run standalone to seed a database for manual exploration:
+
+    python -m benchmarks.seed --flags 10000 --depth 8 --fan-in 2 --fan-out 4
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.audit_logs.model import AuditLog
+from src.common.settings import Settings
+from src.feature_flags.enums import FeatureFlagAuditActionEnum
+from src.feature_flags.model import FeatureFlag, feature_dependency_association
+from src.infrastructure.database import Base
+
+INSERT_BATCH_SIZE = 5_000
+
+
+@dataclass(frozen=True)
+class GraphShape:
+    """
+    Describes the shape of a generated flag graph.
+
+    :param flags: Total number of flags.
+    :param depth: Number of dependency layers below the roots, i.e. the
+        length of the longest dependency chain.
+    :param fan_in: Number of dependencies each non-root flag has.
+    :param fan_out: Soft cap on the number of dependents per flag.
+    :param history: Number of audit log rows to generate.
+    :param seed: Random seed, so the same shape always yields the same graph.
+    """
+
+    flags: int = 1_000
+    depth: int = 5
+    fan_in: int = 2
+    fan_out: int = 4
+    history: int = 10_000
+    seed: int = 42
+
+
+@dataclass
+class SeededGraph:
+    shape: GraphShape
+    layers: list[list[int]] = field(default_factory=list)
+    edges: int = 0
+    # Whether the trigram name index of the migrations could be created.
+    name_search_index: bool = False
+
+    @property
+    def roots(self) -> list[int]:
+        return self.layers[0]
+
+    @property
+    def leaves(self) -> list[int]:
+        return self.layers[-1]
+
+    @property
+    def flag_ids(self) -> list[int]:
+        return [flag_id for layer in self.layers for flag_id in layer]
+
+    def summary(self) -> dict:
+        return {
+            **asdict(self.shape),
+            "layer_sizes": [len(layer) for layer in self.layers],
+            "edges": self.edges,
+            "name_search_index": self.name_search_index,
+        }
+
+
+def flag_name(flag_id: int) -> str:
+    return f"bench-flag-{flag_id}"
+
+
+def build_layers(shape: GraphShape) -> list[list[int]]:
+    """Splits flag ids 1..N into `depth + 1` layers of (nearly) equal size."""
+    layer_count = min(shape.depth + 1, shape.flags)
+    base, extra = divmod(shape.flags, layer_count)
+    layers, next_id = [], 1
+    for i in range(layer_count):
+        size = base + (1 if i < extra else 0)
+        layers.append(list(range(next_id, next_id + size)))
+        next_id += size
+    return layers
+
+
+def build_edges(
+    layers: list[list[int]], shape: GraphShape, rng: random.Random
+) -> list[dict[str, int]]:
+    """
+    Connects every flag to `fan_in` parents in the layer directly above it,
+    preferring parents that have not yet reached `fan_out` dependents.
+    """
+    edges = []
+    for upper, lower in zip(layers, layers[1:]):
+        dependents_count = {parent_id: 0 for parent_id in upper}
+        for child_id in lower:
+            open_parents = [
+                p for p in upper if dependents_count[p] < shape.fan_out
+            ] or upper
+            parents = rng.sample(open_parents, min(shape.fan_in, len(open_parents)))
+            for parent_id in parents:
+                dependents_count[parent_id] += 1
+                edges.append(
+                    {"dependent_feature_id": child_id, "parent_feature_id": parent_id}
+                )
+    return edges
+
+
+def build_history(
+    flag_ids: list[int], shape: GraphShape, rng: random.Random
+) -> list[dict]:
+    """Generates `history` audit rows spread over the last 30 days."""
+    actions = [action.value for action in FeatureFlagAuditActionEnum]
+    actors = [f"actor-{i}" for i in range(20)]
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(shape.history):
+        flag_id = rng.choice(flag_ids)
+        enabled = rng.random() < 0.5
+        rows.append(
+            {
+                "timestamp": now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)),
+                "action": rng.choice(actions),
+                "actor": rng.choice(actors),
+                "target_entity": FeatureFlag.__tablename__,
+                "target_id": str(flag_id),
+                "details": {
+                    "changes": {"is_enabled": {"before": not enabled, "after": enabled}}
+                },
+            }
+        )
+    return rows
+
+
+async def _bulk_insert(conn, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await conn.execute(insert(table), rows[start : start + INSERT_BATCH_SIZE])
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def create_name_search_index(conn) -> bool:
+    """
+    Creates the trigram index on flag projects and names that the migrations
+    add, which `create_all` does not know about. Returns False when the
+    server does not ship the `pg_trgm` and `btree_gin` extensions, in which
+    case searches scan the project's flags.
+    """
+    available = await conn.scalar(
+        text(
+            "SELECT count(*) FROM pg_available_extensions "
+            "WHERE name IN ('pg_trgm', 'btree_gin')"
+        )
+    )
+    if available < 2:
+        return False
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+    await conn.execute(
+        text(
+            "CREATE INDEX ix_feature_flags_project_id_name_trgm "
+            "ON feature_flags USING gin (project_id, name gin_trgm_ops)"
+        )
+    )
+    return True
+
+
+async def seed_graph(engine: AsyncEngine, shape: GraphShape) -> SeededGraph:
+    """
+    Recreates the schema and fills it with a graph of the given shape.
+
+    All flags start enabled so that disabling a root cascades through every
+    descendant.
+    """
+    rng = random.Random(shape.seed)
+    layers = build_layers(shape)
+    edges = build_edges(layers, shape, rng)
+    flag_ids = [flag_id for layer in layers for flag_id in layer]
+
+    await reset_schema(engine)
+    async with engine.begin() as conn:
+        await _bulk_insert(
+            conn,
+            FeatureFlag.__table__,
+            [
+                {
+                    "id": flag_id,
+                    "name": flag_name(flag_id),
+                    "description": f"Synthetic flag {flag_id}",
+                    "is_enabled": True,
+                }
+                for flag_id in flag_ids
+            ],
+        )
+        await _bulk_insert(conn, feature_dependency_association, edges)
+        # Built after the bulk insert, which is much faster than maintaining it.
+        name_search_index = await create_name_search_index(conn)
+        await _bulk_insert(
+            conn, AuditLog.__table__, build_history(flag_ids, shape, rng)
+        )
+        await conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('feature_flags', 'id'), :max_id)"
+            ),
+            {"max_id": max(flag_ids)},
+        )
+        await conn.execute(text("ANALYZE"))
+
+    return SeededGraph(
+        shape=shape,
+        layers=layers,
+        edges=len(edges),
+        name_search_index=name_search_index,
+    )
+
+
+async def enable_all_flags(engine: AsyncEngine) -> None:
+    """Restores the seeded state after a cascade scenario disabled flags."""
+    async with engine.begin() as conn:
+        # Bumping the version, like every write does, invalidates cached
+        # response fragments of the flags.
+        await conn.execute(
+            text(
+                "UPDATE feature_flags SET is_enabled = true, version = version + 1 "
+                "WHERE NOT is_enabled"
+            )
+        )
+
+
+def add_shape_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = GraphShape()
+    parser.add_argument("--flags", type=int, default=defaults.flags)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fan-in", type=int, default=defaults.fan_in)
+    parser.add_argument("--fan-out", type=int, default=defaults.fan_out)
+    parser.add_argument("--history", type=int, default=defaults.history)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def shape_from_arguments(args: argparse.Namespace) -> GraphShape:
+    return GraphShape(
+        flags=args.flags,
+        depth=args.depth,
+        fan_in=args.fan_in,
+        fan_out=args.fan_out,
+        history=args.history,
+        seed=args.seed,
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.dsn or str(Settings().postgres_dsn))
+    try:
+        graph = await seed_graph(engine, shape_from_arguments(args))
+    finally:
+        await engine.dispose()
+    print(graph.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a synthetic flag graph.")
+    parser.add_argument("--dsn", help="Defaults to DEPENDENCY_APP_POSTGRES_DSN.")
+    add_shape_arguments(parser)
+    asyncio.run(_main(parser.parse_args()))
@@ -1,37 +1,168 @@
-from contextlib import asynccontextmanager
+# Imported first so the startup timeline starts as early as possible.
+from src.infrastructure.startup import (
+    FirstFastRequestMiddleware,
+    StartupTimeline,
+    run_warm_up,
+)
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 
 from src.audit_logs.events import register_audit_listeners
 from src.audit_logs.router import router as audit_logs_router
+from src.environments.router import router as environments_router
 from src.feature_flags.router import router as feature_flags_router
+from src.projects.router import router as projects_router
+from src.schedules.router import router as schedules_router
 
+from src.audit_logs.rollup import roll_up_audit_logs_periodically
+from src.checkpoints.scheduler import create_checkpoints_periodically
+from src.flag_usage.flush import flush_flag_usage_periodically
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.idempotency.cleanup import purge_expired_keys_periodically
+from src.infrastructure.admission import (
+    AdmissionBudget,
+    AdmissionControlMiddleware,
+    classify_by_method,
+)
 from src.infrastructure.containers import AppContainer
 from src.infrastructure.database import Database
+from src.infrastructure.tracing import tracer
 from src.middlewares.db_session import DBSessionMiddleware
+from src.middlewares.idempotency import IdempotencyMiddleware
+
+_IMPORTS_DONE_AT = time.perf_counter()
+
+# Evaluations are sent as POST, but only read, so they share the reads budget
+# rather than queueing behind graph writes.
+READ_ONLY_POST_PATHS = r"/flags/(\d+/)?evaluate"
+
+
+async def _preload_flags(db: Database, limit: int) -> None:
+    """
+    Loads the first page of flags through the regular repository path, which
+    warms SQLAlchemy's statement cache and Postgres' buffers for the hot queries.
+    """
+    async with db.session_scope():
+        repository = FeatureFlagRepository(
+            model=FeatureFlag, db_session=db.get_session()
+        )
+        await repository.get_all(skip=0, limit=limit)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Handles application startup and shutdown events gracefully.
+
+    Warm-up runs in the background so the process accepts connections (and
+    liveness checks) right away, while `/ready` only passes once it is done.
     """
+    timeline: StartupTimeline = app.startup_timeline
+    settings: Settings = app.container.settings()
+    db: Database = app.container.database()
+
     app.container.wire(
         modules=[
             "src.audit_logs.router",
+            "src.environments.router",
             "src.feature_flags.router",
+            "src.projects.router",
+            "src.schedules.router",
         ]
     )
-    register_audit_listeners()
+    timeline.mark("container_wired")
+    register_audit_listeners(coalesce=settings.audit_coalescing_enabled)
+    timeline.mark("listeners_registered")
+
+    warmers = []
+    if settings.warmup_preload:
+        warmers.append(lambda: _preload_flags(db, settings.warmup_preload_limit))
+    warm_up = asyncio.create_task(
+        run_warm_up(
+            timeline,
+            db.engine,
+            pool_connections=min(
+                settings.warmup_pool_connections,
+                settings.db_pool_size + settings.db_max_overflow,
+            ),
+            warmers=warmers,
+        )
+    )
+    purge = asyncio.create_task(
+        purge_expired_keys_periodically(
+            db,
+            interval_s=settings.idempotency_purge_interval_s,
+            batch_size=settings.idempotency_purge_batch_size,
+        )
+    )
+    background = [warm_up, purge]
+    if settings.checkpoints_enabled:
+        background.append(
+            asyncio.create_task(
+                create_checkpoints_periodically(
+                    db,
+                    interval_s=settings.checkpoint_interval_s,
+                    settle_s=settings.checkpoint_settle_s,
+                )
+            )
+        )
+    if settings.audit_rollups_enabled:
+        background.append(
+            asyncio.create_task(
+                roll_up_audit_logs_periodically(
+                    db,
+                    interval_s=settings.audit_rollup_interval_s,
+                    settle_s=settings.audit_rollup_settle_s,
+                )
+            )
+        )
+    if settings.flag_usage_enabled:
+        background.append(
+            asyncio.create_task(
+                flush_flag_usage_periodically(
+                    db,
+                    app.container.flag_usage_counter(),
+                    interval_s=settings.flag_usage_flush_interval_s,
+                )
+            )
+        )
+    toggle_scheduler = app.container.toggle_scheduler()
+    if settings.schedules_enabled:
+        background.append(asyncio.create_task(toggle_scheduler.run()))
     yield
+    toggle_scheduler.close()
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    toggle_committer = app.container.toggle_committer()
+    if toggle_committer is not None:
+        await toggle_committer.close()
     app.container.unwire()
+    tracer.shutdown()
+    await db.engine.dispose()
 
 
-def create_app() -> FastAPI:
+def create_app(settings: Settings | None = None) -> FastAPI:
     """
     Application factory to create and configure the FastAPI app instance.
+
+    :param settings: Optional settings overriding the ones read from the environment.
     """
+    timeline = StartupTimeline()
+    timeline.mark("imports", at=_IMPORTS_DONE_AT)
+
     container = AppContainer()
+    if settings is not None:
+        container.settings.override(settings)
+    settings = container.settings()
 
     app = FastAPI(
         title="Feature Flag Management Service",
@@ -40,15 +171,128 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
     app.container = container
+    app.startup_timeline = timeline
     db_instance: Database = container.database()
     app.add_middleware(DBSessionMiddleware, db_manager=db_instance)
+    app.add_middleware(
+        IdempotencyMiddleware,
+        db_manager=db_instance,
+        ttl_s=settings.idempotency_ttl_s,
+        wait_timeout_s=settings.idempotency_wait_timeout_s,
+    )
+    admission_budgets: dict[str, AdmissionBudget] = {}
+    if settings.admission_control_enabled:
+        admission_budgets = {
+            "writes": AdmissionBudget(
+                "writes",
+                limit=settings.admission_write_limit,
+                max_queue=settings.admission_write_queue,
+                queue_timeout_ms=settings.admission_write_queue_timeout_ms,
+            ),
+            "reads": AdmissionBudget(
+                "reads",
+                limit=settings.admission_read_limit,
+                max_queue=settings.admission_read_queue,
+                queue_timeout_ms=settings.admission_read_queue_timeout_ms,
+            ),
+            "exports": AdmissionBudget(
+                "exports",
+                limit=settings.admission_export_limit,
+                max_queue=settings.admission_export_queue,
+                queue_timeout_ms=settings.admission_read_queue_timeout_ms,
+            ),
+        }
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            budgets=admission_budgets,
+            classify=classify_by_method(
+                dedicated_paths={"/history/export": "exports"},
+                read_paths=READ_ONLY_POST_PATHS,
+            ),
+        )
+    app.admission_budgets = admission_budgets
+    app.add_middleware(
+        FirstFastRequestMiddleware,
+        timeline=timeline,
+        threshold_ms=settings.startup_fast_request_ms,
+    )
+
+    # Diagnostics modules are rarely enabled, so they are only imported when used.
+    if settings.profiling_enabled:
+        from src.middlewares.profiling import ProfilingMiddleware
+
+        app.add_middleware(
+            ProfilingMiddleware,
+            output_dir=settings.profiling_output_dir,
+            header_token=settings.profiling_header_token,
+            sample_rate=settings.profiling_sample_rate,
+            interval_ms=settings.profiling_interval_ms,
+        )
+    if settings.slow_query_threshold_ms is not None:
+        from src.infrastructure.profiling import SlowQueryLogger
+
+        SlowQueryLogger(
+            threshold_ms=settings.slow_query_threshold_ms,
+            explain=settings.slow_query_explain,
+        ).attach(db_instance.engine.sync_engine)
+
+    if settings.tracing_export_path:
+        from src.infrastructure.tracing import FileSpanExporter
+        from src.middlewares.tracing import TracingMiddleware
+
+        tracer.configure(
+            FileSpanExporter(
+                settings.tracing_export_path,
+                service_name=settings.tracing_service_name,
+            )
+        )
+        tracer.instrument_engine(db_instance.engine.sync_engine)
+        tracer.instrument_sessions()
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+
     app.include_router(audit_logs_router)
     app.include_router(feature_flags_router)
+    app.include_router(environments_router)
+    app.include_router(projects_router)
+    app.include_router(schedules_router)
 
     @app.get("/", tags=["Root"])
     def read_root():
         return {"status": "ok", "message": "Welcome to the Feature Flag Service!"}
 
+    @app.get("/ready", tags=["Root"])
+    def read_ready():
+        """
+        Readiness probe. Returns 503 until the connection pool and caches are
+        warm, along with the startup timeline.
+        """
+        return JSONResponse(
+            status_code=200 if timeline.ready else 503,
+            content=timeline.to_dict(),
+        )
+
+    @app.get("/metrics", tags=["Root"])
+    def read_metrics():
+        """
+        Counters of the single-flight read coalescing, the response fragment
+        caches, the compiled flag evaluators, the flag usage counts, the toggle
+        scheduler and admission control.
+        """
+        return {
+            "single_flight": container.single_flight().stats(),
+            "fragment_cache": {
+                "feature_flags": container.feature_flag_list_serializer().cache.stats(),
+                "audit_logs": container.audit_log_list_serializer().cache.stats(),
+            },
+            "flag_evaluators": container.flag_evaluators().stats(),
+            "flag_usage": container.flag_usage_counter().stats(),
+            "toggle_scheduler": container.toggle_scheduler().stats(),
+            "admission": {
+                name: budget.stats() for name, budget in admission_budgets.items()
+            },
+        }
+
+    timeline.mark("app_created")
     return app
 
 
@@ -1,9 +1,17 @@
+from typing import ClassVar, Optional
+
+
 class Auditable:
     """
     A simple marker mixin class.
 
     Any SQLAlchemy model that inherits from this class will be automatically
     registered for audit logging by the event listener system.
+
+    All column attributes are audited unless the model narrows them down with
+    `__audit_include__` (the columns to audit) or `__audit_exclude__` (the
+    columns to leave out).
     """
 
-    pass
+    __audit_include__: ClassVar[Optional[tuple[str, ...]]] = None
+    __audit_exclude__: ClassVar[tuple[str, ...]] = ()
@@ -0,0 +1,103 @@
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper, attributes
+
+from src.common.context import project_context
+
+
+class ModelAuditor:
+    """
+    Serializer and differ of one audited model, compiled once from its mapper
+    so that the audit listeners do not reflect on the mapper for every row.
+
+    Only the column attributes selected by the model's `__audit_include__`
+    and `__audit_exclude__` are audited.
+    """
+
+    def __init__(self, mapper: Mapper, keys: Iterable[str]):
+        self.entity: str = mapper.local_table.name
+        self.keys: tuple[str, ...] = tuple(keys)
+        self._audited = frozenset(self.keys)
+        self._get_id: Callable[[Any], Any] = attrgetter(
+            mapper.get_property_by_column(mapper.primary_key[0]).key
+        )
+        # Entries are written to the project of the audited row, or of the
+        # request for models without one.
+        self._get_project_id: Callable[[Any], int] = (
+            attrgetter("project_id")
+            if "project_id" in mapper.column_attrs.keys()
+            else lambda instance: project_context.get()
+        )
+
+    def target_id(self, instance: Any) -> str:
+        return str(self._get_id(instance))
+
+    def project_id(self, instance: Any) -> int:
+        return self._get_project_id(instance)
+
+    def snapshot(self, instance: Any) -> dict[str, Any]:
+        """
+        The audited column values of `instance`.
+
+        Loaded values are read from the instance's `__dict__`, skipping the
+        attribute instrumentation; expired ones are loaded as usual.
+        """
+        loaded = instance.__dict__
+        return {
+            key: loaded[key] if key in loaded else getattr(instance, key)
+            for key in self.keys
+        }
+
+    def diff(self, instance: Any) -> dict[str, dict[str, Any]]:
+        """
+        The audited columns changed in the current flush, with their values
+        before and after it.
+
+        Only the attributes in the instance's committed state, i.e. the ones
+        that were modified, are looked at.
+        """
+        state = inspect(instance)
+        changed = self._audited.intersection(state.committed_state)
+        if not changed:
+            return {}
+        changes: dict[str, dict[str, Any]] = {}
+        for key in self.keys:
+            if key not in changed:
+                continue
+            history = state.get_history(key, attributes.PASSIVE_OFF)
+            if history.has_changes():
+                changes[key] = {
+                    "before": history.deleted[0] if history.deleted else None,
+                    "after": history.added[0] if history.added else None,
+                }
+        return changes
+
+
+def compile_auditor(
+    model: type,
+    include: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+) -> ModelAuditor:
+    """
+    Compiles the auditor of a mapped model.
+
+    :param include: The columns to audit, all column attributes by default.
+        Falls back to the model's `__audit_include__`.
+    :param exclude: Columns left out of the audit, in addition to the
+        model's `__audit_exclude__`.
+    :raises ValueError: If a configured field is not a column attribute.
+    """
+    mapper: Mapper = inspect(model)
+    columns = [attr.key for attr in mapper.column_attrs]
+    if include is None:
+        include = getattr(model, "__audit_include__", None)
+    exclude = {*exclude, *getattr(model, "__audit_exclude__", ())}
+    unknown = (set(include or ()) | exclude).difference(columns)
+    if unknown:
+        raise ValueError(
+            f"{model.__name__} has no audited columns {', '.join(sorted(unknown))}."
+        )
+    selected = columns if include is None else [c for c in columns if c in include]
+    return ModelAuditor(mapper, [c for c in selected if c not in exclude])
@@ -1,16 +1,34 @@
+import uuid
+from contextlib import contextmanager
 from enum import Enum
 from functools import wraps
 
-from typing import Callable, Any
-from contextvars import ContextVar
+from typing import Callable, Any, Iterator
 
-action_context: ContextVar[Enum] = ContextVar("action_context")
+from src.common.context import action_context, operation_context
+
+
+@contextmanager
+def audit_operation() -> Iterator[uuid.UUID]:
+    """
+    Groups the audit entries written within the block under a new
+    operation id.
+    """
+    operation_id = uuid.uuid4()
+    token = operation_context.set(operation_id)
+    try:
+        yield operation_id
+    finally:
+        operation_context.reset(token)
 
 
 def with_audit_action(action: Enum) -> Callable:
     """
     A decorator to set the audit action context for a service method.
 
+    The outermost decorated call starts an audit operation. Nested calls,
+    such as the cascade of a toggle, join it with their own action.
+
     Args:
         action: The specific audit action (e.g., "toggle") to log.
     """
@@ -20,7 +38,10 @@ def with_audit_action(action: Enum) -> Callable:
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             token = action_context.set(action)
             try:
-                return await func(*args, **kwargs)
+                if operation_context.get() is not None:
+                    return await func(*args, **kwargs)
+                with audit_operation():
+                    return await func(*args, **kwargs)
             finally:
                 action_context.reset(token)
 
@@ -1,13 +1,21 @@
+from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
-from sqlalchemy import event, inspect
+from sqlalchemy import event, insert
 from sqlalchemy.engine import Connection
-from sqlalchemy.orm import Mapper, Session, attributes, object_session
+from sqlalchemy.orm import (
+    Mapper,
+    Session,
+    SessionTransaction,
+    object_session,
+)
 
 from src.infrastructure.database import Base
-from src.common.context import actor_context
+from src.common.context import actor_context, operation_context
+from src.infrastructure.tracing import traced
 from .auditable import Auditable
+from .auditors import ModelAuditor, compile_auditor
 from .enums import AuditAction
 from .model import AuditLog
 from .decorators import action_context
@@ -20,10 +28,17 @@ def get_action_context_value(default: Enum) -> str:
     return default.value
 
 
-def _model_to_dict(model_instance: Any) -> dict[str, Any]:
-    """A simple utility to serialize a model's column values into a dictionary."""
-    mapper: Mapper = inspect(model_instance.__class__)
-    return {c.key: getattr(model_instance, c.key) for c in mapper.column_attrs}
+# The auditor of every registered model, compiled at registration.
+_auditors: dict[type, ModelAuditor] = {}
+
+
+def _get_auditor(target: Any) -> ModelAuditor:
+    cls = type(target)
+    auditor = _auditors.get(cls)
+    if auditor is None:
+        # A subclass of a registered model, compiled on first use.
+        auditor = _auditors[cls] = compile_auditor(cls)
+    return auditor
 
 
 def _get_session(target: Any) -> Session | None:
@@ -31,76 +46,153 @@ def _get_session(target: Any) -> Session | None:
     return object_session(target)
 
 
+# Session.info key of the entries waiting for the next commit, in coalescing
+# mode, each with the savepoint it was written in.
+PENDING_ENTRIES_KEY = "pending_audit_entries"
+
+_coalesce_entries = False
+
+
+def _record(session: Session, **entry: Any) -> None:
+    """
+    Records an audit entry for the session's transaction.
+
+    By default the entry is added to the session as an `AuditLog` instance.
+    In coalescing mode it is kept as a plain row until the transaction or
+    savepoint commits, and then written with all other pending entries in a
+    single INSERT.
+    """
+    entry["operation_id"] = operation_context.get()
+    if not _coalesce_entries:
+        session.add(AuditLog(**entry))
+        return
+    entry.setdefault("timestamp", datetime.utcnow())
+    session.info.setdefault(PENDING_ENTRIES_KEY, []).append(
+        (session.get_nested_transaction(), entry)
+    )
+
+
+@traced("audit.write_pending_entries")
+def write_pending_entries(session: Session) -> None:
+    """Flushes the session and writes its pending audit entries."""
+    session.flush()
+    pending = session.info.pop(PENDING_ENTRIES_KEY, None)
+    if pending:
+        session.execute(insert(AuditLog).values([entry for _, entry in pending]))
+
+
+def _within(
+    savepoint: Optional[SessionTransaction], transaction: SessionTransaction
+) -> bool:
+    while savepoint is not None:
+        if savepoint is transaction:
+            return True
+        savepoint = savepoint.parent
+    return False
+
+
+def discard_rolled_back_entries(
+    session: Session, previous_transaction: SessionTransaction
+) -> None:
+    """Drops the pending entries written in a transaction that rolled back."""
+    pending = session.info.get(PENDING_ENTRIES_KEY)
+    if not pending:
+        return
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_ENTRIES_KEY)
+        return
+    session.info[PENDING_ENTRIES_KEY] = [
+        (savepoint, entry)
+        for savepoint, entry in pending
+        if not _within(savepoint, previous_transaction)
+    ]
+
+
+@traced("audit.log_create")
 def log_create(mapper: Mapper, connection: Connection, target: Any) -> None:
     """Generic listener for the 'after_insert' event."""
     session = _get_session(target)
     if not session:
         return
 
-    log_details = {"created": _model_to_dict(target)}
-    log_entry = AuditLog(
+    auditor = _get_auditor(target)
+    _record(
+        session,
         action=get_action_context_value(AuditAction.CREATE),
         actor=actor_context.get(),
-        target_entity=target.__tablename__,
-        target_id=str(target.id),
-        details=log_details,
+        project_id=auditor.project_id(target),
+        target_entity=auditor.entity,
+        target_id=auditor.target_id(target),
+        details={"created": auditor.snapshot(target)},
     )
-    session.add(log_entry)
 
 
+@traced("audit.log_update")
 def log_update(mapper: Mapper, connection: Connection, target: Any) -> None:
     """Generic listener for the 'after_update' event."""
     session = _get_session(target)
     if not session:
         return
 
-    changes: dict[str, dict[str, Any]] = {}
-    for attr in inspect(target).mapper.column_attrs:
-        hist = attributes.get_history(target, attr.key)
-        if hist.has_changes():
-            old_value = hist.deleted[0] if hist.deleted else None
-            new_value = hist.added[0] if hist.added else None
-            changes[attr.key] = {"before": old_value, "after": new_value}
-
+    auditor = _get_auditor(target)
+    changes = auditor.diff(target)
     if not changes:
         return
 
-    log_entry = AuditLog(
+    _record(
+        session,
         action=get_action_context_value(AuditAction.UPDATE),
         actor=actor_context.get(),
-        target_entity=target.__tablename__,
-        target_id=str(target.id),
+        project_id=auditor.project_id(target),
+        target_entity=auditor.entity,
+        target_id=auditor.target_id(target),
         details={"changes": changes},
     )
-    session.add(log_entry)
 
 
+@traced("audit.log_delete")
 def log_delete(mapper: Mapper, connection: Connection, target: Any) -> None:
     """Generic listener for the 'before_delete' event."""
     session = _get_session(target)
     if not session:
         return
 
-    log_details = {"deleted": _model_to_dict(target)}
-    log_entry = AuditLog(
+    auditor = _get_auditor(target)
+    _record(
+        session,
         action=get_action_context_value(AuditAction.DELETE),
         actor=actor_context.get(),
-        target_entity=target.__tablename__,
-        target_id=str(target.id),
-        details=log_details,
+        project_id=auditor.project_id(target),
+        target_entity=auditor.entity,
+        target_id=auditor.target_id(target),
+        details={"deleted": auditor.snapshot(target)},
     )
-    session.add(log_entry)
 
 
-def register_audit_listeners() -> None:
+def register_audit_listeners(coalesce: bool = False) -> None:
     """
-    Finds all models that inherit from the 'Auditable' mixin and
-    attaches the generic audit event listeners to them.
+    Finds all models that inherit from the 'Auditable' mixin, compiles
+    their auditors and attaches the generic audit event listeners to them.
+
+    :param coalesce: Write the audit entries of a transaction in one
+        statement when it commits, instead of one ORM instance per entry.
     """
+    global _coalesce_entries
+    _coalesce_entries = coalesce
+    for identifier, listener in (
+        ("before_commit", write_pending_entries),
+        ("after_soft_rollback", discard_rolled_back_entries),
+    ):
+        registered = event.contains(Session, identifier, listener)
+        if coalesce and not registered:
+            event.listen(Session, identifier, listener)
+        elif not coalesce and registered:
+            event.remove(Session, identifier, listener)
     for mapper in Base.registry.mappers:
         cls = mapper.class_
         if issubclass(cls, Auditable):
             print(f"  -> Registering audit listeners for model: {cls.__name__}")
+            _auditors[cls] = compile_auditor(cls)
             event.listen(cls, "after_insert", log_create)
             event.listen(cls, "after_update", log_update)
             event.listen(cls, "before_delete", log_delete)
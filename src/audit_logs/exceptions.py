@@ -0,0 +1,15 @@
+from src.common.exceptions import BadRequestException, NotFoundException
+
+
+class AuditLogException(Exception):
+    pass
+
+
+class AuditOperationNotFoundException(NotFoundException, AuditLogException):
+    def __init__(self, message: str = "Audit operation not found."):
+        super().__init__(message=message)
+
+
+class AuditLogBadRequestException(BadRequestException, AuditLogException):
+    def __init__(self, message: str = "Invalid audit log request."):
+        super().__init__(message=message)
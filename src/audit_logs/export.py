@@ -0,0 +1,90 @@
+import zlib
+from contextlib import aclosing
+from typing import AsyncIterator, Literal
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+from src.common.context import project_context
+from src.infrastructure.database import Database
+from .model import AuditLog
+from .repository import AuditLogRepository
+from .schemas import AuditLogExportQuery
+from .serializers import AuditLogExportSerializer
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows fetched from the cursor, and encoded into one chunk, at a time.
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_audit_logs(
+    db: Database,
+    query: AuditLogExportQuery,
+    export_format: ExportFormat,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Returns the audit entries matching `query` as a stream of encoded
+    chunks, one per batch of rows, optionally gzip-compressed.
+
+    It reads through its own session rather than the request's, since the
+    request scope closes before a streamed body is sent; for the same
+    reason the project is read when the export is created. The next batch is
+    only fetched when the previous chunk has been consumed, so memory use
+    stays constant and the export runs at the client's pace.
+    """
+    chunks = _encode(db, query, export_format, project_context.get())
+    return _gzip(chunks) if compress else chunks
+
+
+async def _encode(
+    db: Database,
+    query: AuditLogExportQuery,
+    export_format: ExportFormat,
+    project_id: int,
+) -> AsyncIterator[bytes]:
+    serializer = AuditLogExportSerializer
+    encode = serializer.csv if export_format == "csv" else serializer.ndjson
+    if export_format == "csv":
+        yield serializer.csv_header()
+    async with db.new_session() as session:
+        repository = AuditLogRepository(model=AuditLog, db_session=session)
+        async with aclosing(
+            repository.stream_rows(
+                query=query, batch_size=EXPORT_BATCH_SIZE, project_id=project_id
+            )
+        ) as batches:
+            async for rows in batches:
+                yield encode(rows)
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    # wbits=31 writes the gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(wbits=31)
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+    yield compressor.flush()
+
+
+class ExportResponse(StreamingResponse):
+    """
+    Streams an export and closes it however the stream ends. Starlette
+    leaves the body iterator suspended when the client disconnects, which
+    would hold the export's cursor and session until garbage collection.
+    """
+
+    async def stream_response(self, send: Send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            # Shielded, since the disconnect cancels the surrounding scope
+            # and closing the session awaits the database.
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
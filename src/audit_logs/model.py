@@ -1,21 +1,123 @@
 from datetime import datetime
 from sqlalchemy import (
+    DDL,
     Column,
     DateTime,
+    Index,
     Integer,
     String,
     JSON,
+    Uuid,
+    event,
 )
+from src.common.context import DEFAULT_PROJECT_ID
 from src.infrastructure.database import Base
 
+# The partition holding the audit entries of all projects without one of
+# their own, see `ProjectService.create_audit_partition`.
+SHARED_AUDIT_PARTITION = "audit_logs_shared"
+
 
 class AuditLog(Base):
+    """
+    An audit entry. The table is list partitioned by project, so the primary
+    key includes the project, as Postgres requires of partitioned tables.
+    """
+
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    project_id = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=False,
+        server_default=str(DEFAULT_PROJECT_ID),
+    )
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     action = Column(String, nullable=False)
     actor = Column(String, nullable=True, default="system")
     details = Column(JSON, nullable=True)
     target_entity = Column(String, index=True, nullable=False)
     target_id = Column(String, index=True, nullable=False)
+    # Shared by all entries written by one service operation, e.g. a toggle
+    # and the automatic disables of its cascade.
+    operation_id = Column(Uuid, index=True, nullable=True)
+
+    __table_args__ = (
+        Index("ix_audit_logs_project_id_timestamp", "project_id", "timestamp"),
+        Index(
+            "ix_audit_logs_project_id_target",
+            "project_id",
+            "target_entity",
+            "target_id",
+        ),
+        {"postgresql_partition_by": "LIST (project_id)"},
+    )
+
+
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL(f"CREATE TABLE {SHARED_AUDIT_PARTITION} PARTITION OF audit_logs DEFAULT"),
+)
+
+
+class AuditLogHourlyRollup(Base):
+    """
+    The number of audit entries per hour, target, actor and action, for the
+    hours before the watermark in `AuditLogRollupState`.
+    """
+
+    __tablename__ = "audit_log_hourly_rollups"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False, server_default=str(DEFAULT_PROJECT_ID))
+    # Naive UTC start of the hour, like the audit log timestamps.
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    target_entity = Column(String, nullable=False)
+    target_id = Column(String, nullable=False)
+    actor = Column(String, nullable=True)
+    action = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_audit_log_hourly_rollups_project_id_bucket_start",
+            "project_id",
+            "bucket_start",
+        ),
+    )
+
+
+class AuditLogHourlyTotal(Base):
+    """
+    The number of audit entries per hour, entity type and action, for stats
+    that neither group nor filter by target or actor. It covers the same
+    hours as `AuditLogHourlyRollup`, in far fewer rows.
+    """
+
+    __tablename__ = "audit_log_hourly_totals"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False, server_default=str(DEFAULT_PROJECT_ID))
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    target_entity = Column(String, nullable=False)
+    action = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_audit_log_hourly_totals_project_id_bucket_start",
+            "project_id",
+            "bucket_start",
+        ),
+    )
+
+
+class AuditLogRollupState(Base):
+    """A single row holding the end of the hours rolled up into both rollups."""
+
+    __tablename__ = "audit_log_rollup_state"
+
+    id = Column(Integer, primary_key=True)
+    rolled_up_until = Column(DateTime, nullable=False)
@@ -1,17 +1,56 @@
+import uuid
+from datetime import datetime
+
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import (
+    BigInteger,
+    Row,
+    Select,
+    cast,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from src.common.context import project_context
 from src.infrastructure.base_repository import BaseRepository
-from .model import AuditLog
-from .schemas import AuditLogCreate, AuditLogHistoryQuery
-from typing import Any, Generic, Type, TypeVar
+from src.infrastructure.tracing import traced
+from src.common.timestamps import ceil_hour, floor_hour
+from .model import (
+    AuditLog,
+    AuditLogHourlyRollup,
+    AuditLogHourlyTotal,
+    AuditLogRollupState,
+)
+from .schemas import (
+    AuditLogCreate,
+    AuditLogExportQuery,
+    AuditLogHistoryQuery,
+    AuditLogStatsQuery,
+)
+from typing import Any, AsyncIterator, Generic, Optional, Type, TypeVar
 from src.infrastructure.database import Base
 
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Key of the advisory lock serializing rollups across workers.
+ROLLUP_LOCK_KEY = 0x0A0D17
+
 
 class AuditLogRepository(BaseRepository[AuditLog, AuditLogCreate, BaseModel]):
+    """
+    Reads the audit entries of the current project, see `project_context`.
+    `stream_rows` and `get_changes` are given their project instead, since
+    they also run outside of requests.
+    """
+
+    @traced()
     async def get_history(
         self,
         *,
@@ -23,7 +62,172 @@ class AuditLogRepository(BaseRepository[AuditLog, AuditLogCreate, BaseModel]):
         :param query: A Pydantic object containing all filter and pagination options.
         :return: A list of audit log model instances.
         """
-        statement = select(self.model).order_by(self.model.timestamp.desc())
+        result = await self.db.execute(
+            self._history_statement(select(self.model), query)
+        )
+        return result.scalars().all()
+
+    @traced()
+    async def get_history_rows(self, *, query: AuditLogHistoryQuery) -> list[Row]:
+        """
+        Same as `get_history`, but selects plain column rows, skipping the
+        construction of ORM instances for read-only responses.
+        """
+        result = await self.db.execute(
+            self._history_statement(select(*self.model.__table__.columns), query)
+        )
+        return result.all()
+
+    async def stream_rows(
+        self, *, query: AuditLogExportQuery, batch_size: int, project_id: int
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Yields the project's entries matching `query` in the order they were
+        written, `batch_size` rows at a time, from a server-side cursor. Only
+        one batch is held in memory, and the next one is fetched when the
+        caller asks for it.
+
+        The project is passed explicitly, since a streamed body outlives the
+        request's `project_context`.
+        """
+        statement = (
+            select(*self.model.__table__.columns)
+            .where(self.model.project_id == project_id)
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for column in ("target_entity", "target_id", "actor", "action"):
+            value = getattr(query, column)
+            if value is not None:
+                statement = statement.where(getattr(self.model, column) == value)
+        if query.start is not None:
+            statement = statement.where(self.model.timestamp >= query.start)
+        if query.end is not None:
+            statement = statement.where(self.model.timestamp < query.end)
+        result = await self.db.stream(statement)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    @traced()
+    async def get_operation(self, *, operation_id: uuid.UUID) -> list[Row]:
+        """Selects the entries of one operation, in the order they were written."""
+        statement = (
+            select(*self.model.__table__.columns)
+            .where(
+                self.model.project_id == project_context.get(),
+                self.model.operation_id == operation_id,
+            )
+            .order_by(self.model.id)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_changes(
+        self,
+        *,
+        project_id: int,
+        target_entity: str,
+        after: Optional[datetime],
+        until: datetime,
+    ) -> list[Row]:
+        """
+        Selects the `target_id` and `details` of the project's entries for
+        one entity type written in the time range (`after`, `until`], in the
+        order they were written.
+        """
+        statement = (
+            select(self.model.target_id, self.model.details)
+            .where(
+                self.model.project_id == project_id,
+                self.model.target_entity == target_entity,
+                self.model.timestamp <= until,
+            )
+            .order_by(self.model.timestamp, self.model.id)
+        )
+        if after is not None:
+            statement = statement.where(self.model.timestamp > after)
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_stats(
+        self, *, query: AuditLogStatsQuery, rolled_up_until: Optional[datetime]
+    ) -> list[Row]:
+        """
+        Counts the entries matching `query` per time bucket and dimension.
+
+        The whole hours of the requested range before `rolled_up_until` are
+        counted from the hourly rollups, the rest from the audit log itself.
+        Stats not involving targets or actors use the smaller hourly totals.
+        """
+        covered_from = ceil_hour(query.start) if query.start else None
+        covered_until = rolled_up_until
+        if covered_until is not None and query.end is not None:
+            covered_until = min(covered_until, floor_hour(query.end))
+        if covered_until is not None and covered_from is not None:
+            if covered_from >= covered_until:
+                covered_until = None
+
+        raw = self._stats_statement(
+            self.model, self.model.timestamp, func.count(), query
+        )
+        if covered_until is None:
+            statement = raw.order_by(*list(raw.selected_columns)[:-1])
+        else:
+            by_target_or_actor = {"target_id", "actor"}.intersection(
+                query.group_by
+            ) or (query.target_id, query.actor) != (None, None)
+            rollup = AuditLogHourlyRollup if by_target_or_actor else AuditLogHourlyTotal
+            raw = raw.where(
+                self.model.timestamp >= covered_until
+                if covered_from is None
+                else or_(
+                    self.model.timestamp < covered_from,
+                    self.model.timestamp >= covered_until,
+                )
+            )
+            rolled_up = self._stats_statement(
+                rollup, rollup.bucket_start, func.sum(rollup.count), query
+            ).where(rollup.bucket_start < covered_until)
+            if covered_from is not None:
+                rolled_up = rolled_up.where(rollup.bucket_start >= covered_from)
+            combined = union_all(raw, rolled_up).subquery()
+            keys = [column for column in combined.c if column.key != "count"]
+            count = cast(func.sum(combined.c.count), BigInteger).label("count")
+            statement = select(*keys, count).group_by(*keys).order_by(*keys)
+        return (await self.db.execute(statement.limit(query.limit))).all()
+
+    @staticmethod
+    def _stats_statement(
+        model: type, time_column: Any, count: Any, query: AuditLogStatsQuery
+    ) -> Select:
+        keys = [getattr(model, dimension) for dimension in query.group_by]
+        if query.bucket:
+            # The unit is inlined, a bound parameter would make the select
+            # and the GROUP BY expressions differ.
+            unit = literal_column(f"'{query.bucket}'")
+            keys.insert(0, func.date_trunc(unit, time_column).label("bucket"))
+        statement = select(*keys, cast(count, BigInteger).label("count")).where(
+            model.project_id == project_context.get()
+        )
+        for column in ("target_entity", "target_id", "actor", "action"):
+            value = getattr(query, column)
+            if value is not None:
+                statement = statement.where(getattr(model, column) == value)
+        if query.start is not None:
+            statement = statement.where(time_column >= query.start)
+        if query.end is not None:
+            statement = statement.where(time_column < query.end)
+        return statement.group_by(*keys)
+
+    def _history_statement(
+        self, statement: Select, query: AuditLogHistoryQuery
+    ) -> Select:
+        statement = statement.where(
+            self.model.project_id == project_context.get()
+        ).order_by(self.model.timestamp.desc())
 
         if query.target_entity:
             statement = statement.where(self.model.target_entity == query.target_entity)
@@ -35,7 +239,86 @@ class AuditLogRepository(BaseRepository[AuditLog, AuditLogCreate, BaseModel]):
             statement = statement.where(self.model.action == query.action)
 
         # Apply pagination from the query object
-        statement = statement.offset(query.skip).limit(query.limit)
+        return statement.offset(query.skip).limit(query.limit)
 
-        result = await self.db.execute(statement)
-        return result.scalars().all()
+
+class AuditLogRollupRepository(
+    BaseRepository[AuditLogHourlyRollup, BaseModel, BaseModel]
+):
+    @traced()
+    async def get_watermark(self) -> Optional[datetime]:
+        """The end of the hours rolled up so far, None before the first rollup."""
+        return await self.db.scalar(select(AuditLogRollupState.rolled_up_until))
+
+    @traced()
+    async def try_lock(self) -> bool:
+        """
+        Takes the transaction-scoped rollup lock without waiting.
+
+        :return: False if another transaction holds it.
+        """
+        return await self.db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}
+        )
+
+    @traced()
+    async def roll_up(self, *, after: Optional[datetime], until: datetime) -> int:
+        """
+        Adds the counts of the audit entries written in [`after`, `until`),
+        both on the hour, to both rollups, moves the watermark to `until`
+        and commits.
+
+        :return: The number of rollup rows added.
+        """
+        added = await self._roll_up_into(
+            self.model,
+            (
+                AuditLog.project_id,
+                AuditLog.target_entity,
+                AuditLog.target_id,
+                AuditLog.actor,
+                AuditLog.action,
+            ),
+            after,
+            until,
+        )
+        added += await self._roll_up_into(
+            AuditLogHourlyTotal,
+            (AuditLog.project_id, AuditLog.target_entity, AuditLog.action),
+            after,
+            until,
+        )
+        await self.db.execute(
+            pg_insert(AuditLogRollupState)
+            .values(id=1, rolled_up_until=until)
+            .on_conflict_do_update(
+                index_elements=[AuditLogRollupState.id],
+                set_={"rolled_up_until": until},
+            )
+        )
+        await self.db.commit()
+        return added
+
+    async def _roll_up_into(
+        self,
+        rollup: type,
+        dimensions: tuple[Any, ...],
+        after: Optional[datetime],
+        until: datetime,
+    ) -> int:
+        bucket = func.date_trunc(literal_column("'hour'"), AuditLog.timestamp)
+        counts = (
+            select(bucket, *dimensions, func.count())
+            .where(AuditLog.timestamp < until)
+            .group_by(bucket, *dimensions)
+        )
+        if after is not None:
+            counts = counts.where(AuditLog.timestamp >= after)
+        columns = ["bucket_start", *(column.key for column in dimensions), "count"]
+        inserted = (
+            insert(rollup)
+            .from_select(columns, counts)
+            .returning(rollup.id)
+            .cte("inserted")
+        )
+        return await self.db.scalar(select(func.count()).select_from(inserted))
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.infrastructure.database import Database
+from .model import AuditLog, AuditLogHourlyRollup
+from .repository import AuditLogRepository, AuditLogRollupRepository
+from .service import AuditLogService
+
+logger = logging.getLogger(__name__)
+
+
+async def roll_up_audit_logs(db: Database, settle_s: float) -> Optional[int]:
+    """
+    Rolls up the audit entries of every full hour that ended at least
+    `settle_s` seconds ago, so that entries of transactions still running
+    are left for the next run.
+    """
+    async with db.session_scope():
+        session = db.get_session()
+        service = AuditLogService(
+            repository=AuditLogRepository(model=AuditLog, db_session=session),
+            rollup_repository=AuditLogRollupRepository(
+                model=AuditLogHourlyRollup, db_session=session
+            ),
+        )
+        return await service.roll_up(
+            until=datetime.utcnow() - timedelta(seconds=settle_s)
+        )
+
+
+async def roll_up_audit_logs_periodically(
+    db: Database, interval_s: float, settle_s: float
+) -> None:
+    """Runs `roll_up_audit_logs` every `interval_s` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            added = await roll_up_audit_logs(db, settle_s)
+        except Exception:
+            logger.exception("Rolling up the audit log failed.")
+            continue
+        if added is not None:
+            logger.info("Added %d hourly audit rollup rows.", added)
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
 from dependency_injector.wiring import inject, Provide
 
 from src.infrastructure.containers import AppContainer
+from src.infrastructure.database import Database
+from src.infrastructure.single_flight import SingleFlight
 from . import schemas
+from .export import MEDIA_TYPES, ExportFormat, ExportResponse, export_audit_logs
+from .serializers import AuditLogListSerializer
 from .service import AuditLogService
-from src.common.dependencies import set_actor_from_header
+from src.common.context import project_context
+from src.common.dependencies import set_actor_from_header, set_project_from_header
 
-router = APIRouter(prefix="/history", tags=["Audit Logs"])
+router = APIRouter(
+    prefix="/history",
+    tags=["Audit Logs"],
+    dependencies=[Depends(set_project_from_header)],
+)
 
 
 @router.get("/", response_model=list[schemas.AuditLog])
@@ -15,11 +28,115 @@ async def get_audit_history(
     query: schemas.AuditLogHistoryQuery = Depends(),
     _actor_context: None = Depends(set_actor_from_header),
     service: AuditLogService = Depends(Provide[AppContainer.audit_log_service]),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+    serializer: AuditLogListSerializer = Depends(
+        Provide[AppContainer.audit_log_list_serializer]
+    ),
 ):
     """
     Retrieve the audit history for all operations.
 
     Supports filtering by `target_entity`, `target_id`, and `action`,
-    as well as pagination with `skip` and `limit`.
+    as well as pagination with `skip` and `limit`. Identical concurrent
+    requests share one query and one response body.
+    """
+
+    async def load() -> bytes:
+        return serializer.encode(await service.get_history_rows(query=query))
+
+    key = ("history.get", project_context.get(), *query.model_dump().values())
+    body = await single_flight.do(key, load)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/export",
+    response_class=ExportResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}
+    },
+)
+@inject
+async def export_audit_history(
+    query: schemas.AuditLogExportQuery = Depends(),
+    format: ExportFormat = Query("ndjson", description="`ndjson` or `csv`."),
+    gzip: bool = Query(False, description="Compress the body with gzip."),
+    _actor_context: None = Depends(set_actor_from_header),
+    database: Database = Depends(Provide[AppContainer.database]),
+):
+    """
+    Stream every audit entry matching the filters, oldest first, as NDJSON
+    (one history entry per line) or CSV. The entries are read from a
+    server-side cursor batch by batch, as fast as the client reads them.
+    With `gzip=true` the body is sent with `Content-Encoding: gzip`.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="audit-logs.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return ExportResponse(
+        export_audit_logs(database, query, format, compress=gzip),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+def get_stats_query(
+    group_by: Optional[str] = Query(
+        None,
+        description="Comma-separated dimensions to group by: `target_id`, "
+        "`actor`, `action`. Defaults to none.",
+    ),
+    bucket: Optional[schemas.StatsBucket] = Query(
+        None, description="Time bucket to count by. Defaults to the whole range."
+    ),
+    start: Optional[datetime] = Query(None, description="Inclusive, UTC if naive."),
+    end: Optional[datetime] = Query(None, description="Exclusive, UTC if naive."),
+    target_entity: Optional[str] = None,
+    target_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+) -> schemas.AuditLogStatsQuery:
+    """A dependency parsing the grouping, bucketing and filter parameters."""
+    return schemas.AuditLogStatsQuery.parse(
+        group_by=group_by,
+        bucket=bucket,
+        start=start,
+        end=end,
+        target_entity=target_entity,
+        target_id=target_id,
+        actor=actor,
+        action=action,
+        limit=limit,
+    )
+
+
+@router.get("/stats", response_model=schemas.AuditLogStats)
+@inject
+async def get_audit_stats(
+    query: schemas.AuditLogStatsQuery = Depends(get_stats_query),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: AuditLogService = Depends(Provide[AppContainer.audit_log_service]),
+):
+    """
+    Count audit entries per time bucket (`hour`, `day`, `week`, `month`)
+    and per `target_id`, `actor` and `action`, e.g. the toggles of each flag
+    per hour. The counting is done in the database; whole hours that were
+    already rolled up are read from the hourly rollup.
+    """
+    return await service.get_stats(query=query)
+
+
+@router.get("/operations/{operation_id}", response_model=schemas.AuditOperation)
+@inject
+async def get_audit_operation(
+    operation_id: uuid.UUID,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: AuditLogService = Depends(Provide[AppContainer.audit_log_service]),
+):
+    """
+    Retrieve everything one operation changed, e.g. a toggle together with
+    the flags its cascade disabled, as a single record. The `operation_id`
+    is part of every history entry.
     """
-    return await service.get_history(query=query)
+    return await service.get_operation(operation_id=operation_id)
@@ -1,7 +1,11 @@
 import datetime
-from typing import Any, Optional
+import uuid
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+from src.common.timestamps import to_utc_naive
+from .exceptions import AuditLogBadRequestException
 
 
 class AuditLogBase(BaseModel):
@@ -19,6 +23,7 @@ class AuditLogCreate(AuditLogBase):
 class AuditLog(AuditLogBase):
     id: int
     timestamp: datetime.datetime
+    operation_id: Optional[uuid.UUID] = None
 
     class Config:
         from_attributes = True
@@ -30,3 +35,98 @@ class AuditLogHistoryQuery(BaseModel):
     action: Optional[str] = None
     skip: int = 0
     limit: int = 100
+
+
+class AuditLogExportQuery(BaseModel):
+    target_entity: Optional[str] = None
+    target_id: Optional[str] = None
+    actor: Optional[str] = None
+    action: Optional[str] = None
+    # Inclusive and exclusive bounds, UTC if naive.
+    start: Optional[datetime.datetime] = None
+    end: Optional[datetime.datetime] = None
+
+    @field_validator("start", "end")
+    @classmethod
+    def _to_utc_naive(
+        cls, moment: Optional[datetime.datetime]
+    ) -> Optional[datetime.datetime]:
+        return to_utc_naive(moment) if moment is not None else None
+
+
+class AuditOperationChange(BaseModel):
+    target_id: str
+    action: str
+    details: Optional[dict[str, Any]]
+
+
+class AuditOperation(BaseModel):
+    """The entries of one service operation, without their repeated fields."""
+
+    operation_id: uuid.UUID
+    # The actor, entity type and time of the operation's first entry.
+    actor: Optional[str]
+    target_entity: str
+    timestamp: datetime.datetime
+    target_ids: list[str]
+    changes: list[AuditOperationChange]
+
+
+# The columns the audit statistics can be grouped by.
+STATS_DIMENSIONS = ("target_id", "actor", "action")
+
+StatsBucket = Literal["hour", "day", "week", "month"]
+
+
+class AuditLogStatsQuery(BaseModel):
+    """Grouping, time bucketing and filters of an audit statistics request."""
+
+    group_by: tuple[str, ...] = ()
+    bucket: Optional[StatsBucket] = None
+    # Naive UTC; `start` is inclusive, `end` exclusive.
+    start: Optional[datetime.datetime] = None
+    end: Optional[datetime.datetime] = None
+    target_entity: Optional[str] = None
+    target_id: Optional[str] = None
+    actor: Optional[str] = None
+    action: Optional[str] = None
+    limit: int = Field(default=1000, ge=1)
+
+    @classmethod
+    def parse(cls, group_by: Optional[str], **values: Any) -> "AuditLogStatsQuery":
+        """
+        Parses the comma-separated `group_by` query parameter and converts
+        `start` and `end` to naive UTC.
+        """
+        requested = {
+            name.strip() for name in (group_by or "").split(",") if name.strip()
+        }
+        unknown = requested - set(STATS_DIMENSIONS)
+        if unknown:
+            raise AuditLogBadRequestException(
+                f"Unknown group_by dimensions: {', '.join(sorted(unknown))}."
+            )
+        for bound in ("start", "end"):
+            if values.get(bound) is not None:
+                values[bound] = to_utc_naive(values[bound])
+        return cls(
+            group_by=tuple(name for name in STATS_DIMENSIONS if name in requested),
+            **values,
+        )
+
+
+class AuditLogStatsRow(BaseModel):
+    # Null for the dimensions that were not grouped by.
+    bucket: Optional[datetime.datetime] = None
+    target_id: Optional[str] = None
+    actor: Optional[str] = None
+    action: Optional[str] = None
+    count: int
+
+
+class AuditLogStats(BaseModel):
+    bucket: Optional[StatsBucket]
+    group_by: list[str]
+    # Entries written before this were counted from the hourly rollup.
+    rolled_up_until: Optional[datetime.datetime]
+    rows: list[AuditLogStatsRow]
@@ -0,0 +1,88 @@
+import csv
+import io
+from typing import Any
+
+from sqlalchemy import Row
+
+from src.infrastructure.serialization import FragmentCache, encode_json
+
+
+def audit_log_fields(row: Row) -> dict[str, Any]:
+    """The fields of `schemas.AuditLog`, in the same order."""
+    return {
+        "action": row.action,
+        "actor": row.actor,
+        "details": row.details,
+        "target_entity": row.target_entity,
+        "target_id": row.target_id,
+        "id": row.id,
+        "timestamp": row.timestamp,
+        "operation_id": row.operation_id,
+    }
+
+
+class AuditLogListSerializer:
+    """
+    Encodes audit log rows into the JSON of `list[schemas.AuditLog]`, with
+    the same fields in the same order as the response model. Audit entries
+    never change, so each fragment is cached under the entry's id.
+    """
+
+    def __init__(self, cache: FragmentCache):
+        self.cache = cache
+
+    def encode(self, rows: list[Row]) -> bytes:
+        return self.cache.join(
+            self.cache.get_or_encode(row.id, lambda row=row: audit_log_fields(row))
+            for row in rows
+        )
+
+
+class AuditLogExportSerializer:
+    """
+    Encodes batches of audit log rows for exports, as NDJSON with one
+    `schemas.AuditLog` object per line, or as CSV with the same columns and
+    the details as a JSON string. Export rows are read once, so nothing is
+    cached.
+    """
+
+    CSV_COLUMNS = (
+        "id",
+        "timestamp",
+        "action",
+        "actor",
+        "target_entity",
+        "target_id",
+        "operation_id",
+        "details",
+    )
+
+    @staticmethod
+    def ndjson(rows: list[Row]) -> bytes:
+        return b"".join(encode_json(audit_log_fields(row)) + b"\n" for row in rows)
+
+    @classmethod
+    def csv_header(cls) -> bytes:
+        return cls._csv([cls.CSV_COLUMNS])
+
+    @classmethod
+    def csv(cls, rows: list[Row]) -> bytes:
+        return cls._csv(
+            (
+                row.id,
+                row.timestamp.isoformat(),
+                row.action,
+                row.actor,
+                row.target_entity,
+                row.target_id,
+                row.operation_id or "",
+                encode_json(row.details).decode() if row.details is not None else "",
+            )
+            for row in rows
+        )
+
+    @staticmethod
+    def _csv(records) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        return buffer.getvalue().encode()
@@ -1,7 +1,24 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Row
+
+from .exceptions import AuditOperationNotFoundException
 from .model import AuditLog
 
-from .schemas import AuditLogCreate, AuditLogHistoryQuery
-from .repository import AuditLogRepository
+from .schemas import (
+    AuditLogCreate,
+    AuditLogHistoryQuery,
+    AuditLogStats,
+    AuditLogStatsQuery,
+    AuditLogStatsRow,
+    AuditOperation,
+    AuditOperationChange,
+)
+from .repository import AuditLogRepository, AuditLogRollupRepository
+from src.common.timestamps import floor_hour, to_utc_naive
+from src.infrastructure.tracing import traced
 
 
 class AuditLogService:
@@ -10,9 +27,15 @@ class AuditLogService:
     It depends on the repository for data access.
     """
 
-    def __init__(self, repository: AuditLogRepository):
+    def __init__(
+        self,
+        repository: AuditLogRepository,
+        rollup_repository: AuditLogRollupRepository,
+    ):
         self.repository = repository
+        self.rollup_repository = rollup_repository
 
+    @traced()
     async def create_log(
         self,
         *,
@@ -25,6 +48,7 @@ class AuditLogService:
         """
         await self.repository.create(obj_in=log_data)
 
+    @traced()
     async def get_history(
         self,
         *,
@@ -37,3 +61,73 @@ class AuditLogService:
         :return: A list of audit log model instances.
         """
         return await self.repository.get_history(query=query)
+
+    @traced()
+    async def get_history_rows(self, *, query: AuditLogHistoryQuery) -> list[Row]:
+        """
+        Fetches the same history as `get_history`, as plain column rows
+        for the serialization fast path.
+        """
+        return await self.repository.get_history_rows(query=query)
+
+    @traced()
+    async def get_operation(self, *, operation_id: uuid.UUID) -> AuditOperation:
+        """
+        Collects the entries of one operation into a single record listing
+        every affected target and its change.
+        """
+        rows = await self.repository.get_operation(operation_id=operation_id)
+        if not rows:
+            raise AuditOperationNotFoundException()
+        first = rows[0]
+        return AuditOperation(
+            operation_id=operation_id,
+            actor=first.actor,
+            target_entity=first.target_entity,
+            timestamp=first.timestamp,
+            target_ids=list(dict.fromkeys(row.target_id for row in rows)),
+            changes=[
+                AuditOperationChange(
+                    target_id=row.target_id, action=row.action, details=row.details
+                )
+                for row in rows
+            ],
+        )
+
+    @traced()
+    async def get_stats(self, *, query: AuditLogStatsQuery) -> AuditLogStats:
+        """
+        Counts audit entries per time bucket and grouped dimensions, using
+        the hourly rollup for the hours it covers.
+        """
+        rolled_up_until = await self.rollup_repository.get_watermark()
+        rows = await self.repository.get_stats(
+            query=query, rolled_up_until=rolled_up_until
+        )
+        return AuditLogStats(
+            bucket=query.bucket,
+            group_by=list(query.group_by),
+            rolled_up_until=rolled_up_until,
+            rows=[AuditLogStatsRow(**row._mapping) for row in rows],
+        )
+
+    @traced()
+    async def roll_up(self, *, until: datetime) -> Optional[int]:
+        """
+        Rolls the audit entries up to the last full hour before `until` into
+        the hourly rollup.
+
+        Audit entries must not be written with a timestamp before `until`
+        afterwards, so callers leave a delay for running transactions.
+
+        :return: The number of rollup rows added, or None if another worker
+            is rolling up or there is no new full hour.
+        """
+        until = floor_hour(to_utc_naive(until))
+        if not await self.rollup_repository.try_lock():
+            return None
+        watermark = await self.rollup_repository.get_watermark()
+        if watermark is not None and watermark >= until:
+            await self.rollup_repository.rollback()
+            return None
+        return await self.rollup_repository.roll_up(after=watermark, until=until)
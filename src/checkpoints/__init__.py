@@ -0,0 +1,9 @@
+from .model import FlagStateCheckpoint
+from .repository import FlagStateCheckpointRepository
+from .service import FlagStateService
+
+__all__ = [
+    "FlagStateCheckpoint",
+    "FlagStateCheckpointRepository",
+    "FlagStateService",
+]
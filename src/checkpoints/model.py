@@ -0,0 +1,34 @@
+from sqlalchemy import Column, DateTime, Index, Integer, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.infrastructure.database import Base
+
+
+class FlagStateCheckpoint(Base):
+    """
+    The state of every feature flag of a project as of `taken_at`, i.e. the
+    result of replaying the project's feature flag audit entries with a
+    timestamp up to and including it.
+    """
+
+    __tablename__ = "flag_state_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    # Naive UTC, like the audit log timestamps it is compared with.
+    taken_at = Column(DateTime, nullable=False)
+    flag_count = Column(Integer, nullable=False)
+    # {"<flag id>": [name, description, is_enabled]}
+    state = Column(JSONB, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_flag_state_checkpoints_project_id_taken_at",
+            "project_id",
+            "taken_at",
+            unique=True,
+        ),
+    )
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import func, literal_column, select, text
+
+from src.audit_logs.model import AuditLog
+from src.feature_flags.model import FeatureFlag
+from src.infrastructure.base_repository import BaseRepository
+from src.projects.model import Project
+from src.infrastructure.tracing import traced
+from .model import FlagStateCheckpoint
+
+# Key of the advisory lock serializing checkpoint creation across workers.
+CHECKPOINT_LOCK_KEY = 0x0F1A6C
+
+
+class FlagStateCheckpointRepository(
+    BaseRepository[FlagStateCheckpoint, BaseModel, BaseModel]
+):
+    @traced()
+    async def get_latest(
+        self, *, project_id: int, at_or_before: datetime
+    ) -> Optional[FlagStateCheckpoint]:
+        """
+        Retrieves the project's most recent checkpoint taken at or before the
+        given time.
+        """
+        statement = (
+            select(self.model)
+            .where(
+                self.model.project_id == project_id,
+                self.model.taken_at <= at_or_before,
+            )
+            .order_by(self.model.taken_at.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(statement)
+        return result.scalar_one_or_none()
+
+    @traced()
+    async def get_changed_project_ids(self, *, until: datetime) -> list[int]:
+        """
+        The ids of the projects with feature flag audit entries written after
+        their latest checkpoint and up to `until`. Each project's entries are
+        probed through its (project_id, timestamp) index, from its latest
+        checkpoint on.
+        """
+        latest = (
+            select(func.max(self.model.taken_at))
+            .where(self.model.project_id == Project.id, self.model.taken_at <= until)
+            .scalar_subquery()
+        )
+        changed = select(AuditLog.id).where(
+            AuditLog.project_id == Project.id,
+            AuditLog.target_entity == FeatureFlag.__tablename__,
+            AuditLog.timestamp <= until,
+            AuditLog.timestamp
+            > func.coalesce(latest, literal_column("'-infinity'::timestamp")),
+        )
+        statement = select(Project.id).where(changed.exists()).order_by(Project.id)
+        return list((await self.db.execute(statement)).scalars())
+
+    @traced()
+    async def try_lock(self) -> bool:
+        """
+        Takes the transaction-scoped checkpoint lock without waiting.
+
+        :return: False if another transaction holds it.
+        """
+        return await self.db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": CHECKPOINT_LOCK_KEY},
+        )
+
+    @traced()
+    async def add(
+        self, *, project_id: int, taken_at: datetime, state: dict
+    ) -> FlagStateCheckpoint:
+        """Stores a new checkpoint, without committing it."""
+        checkpoint = self.model(
+            project_id=project_id,
+            taken_at=taken_at,
+            flag_count=len(state),
+            state=state,
+        )
+        self.db.add(checkpoint)
+        await self.db.flush()
+        return checkpoint
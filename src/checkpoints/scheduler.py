@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from src.audit_logs.model import AuditLog
+from src.audit_logs.repository import AuditLogRepository
+from src.infrastructure.database import Database
+from .model import FlagStateCheckpoint
+from .repository import FlagStateCheckpointRepository
+from .service import FlagStateService
+
+logger = logging.getLogger(__name__)
+
+
+async def create_checkpoints(
+    db: Database, settle_s: float
+) -> list[FlagStateCheckpoint]:
+    """
+    Stores a checkpoint of the flag states of every changed project as of
+    `settle_s` seconds ago, so that audit entries of transactions still
+    running are left for the next.
+    """
+    async with db.session_scope():
+        session = db.get_session()
+        service = FlagStateService(
+            checkpoint_repository=FlagStateCheckpointRepository(
+                model=FlagStateCheckpoint, db_session=session
+            ),
+            audit_log_repository=AuditLogRepository(model=AuditLog, db_session=session),
+        )
+        return await service.create_checkpoints(
+            until=datetime.utcnow() - timedelta(seconds=settle_s)
+        )
+
+
+async def create_checkpoints_periodically(
+    db: Database, interval_s: float, settle_s: float
+) -> None:
+    """Runs `create_checkpoints` every `interval_s` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            checkpoints = await create_checkpoints(db, settle_s)
+        except Exception:
+            logger.exception("Creating flag state checkpoints failed.")
+            continue
+        for checkpoint in checkpoints:
+            logger.info(
+                "Stored a checkpoint of %d flags of project %d as of %s.",
+                checkpoint.flag_count,
+                checkpoint.project_id,
+                checkpoint.taken_at,
+            )
@@ -0,0 +1,20 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class FlagState(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    is_enabled: bool
+
+
+class FlagStatesAsOf(BaseModel):
+    as_of: datetime.datetime
+    # The checkpoint the states were reconstructed from, if any.
+    checkpoint_taken_at: Optional[datetime.datetime] = None
+    # Audit entries replayed on top of the checkpoint.
+    replayed_changes: int
+    flags: list[FlagState]
@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Optional
+
+from src.audit_logs.repository import AuditLogRepository
+from src.common.context import project_context
+from src.common.timestamps import to_utc_naive
+from src.feature_flags.model import FeatureFlag
+from src.infrastructure.tracing import traced
+from . import schemas
+from .model import FlagStateCheckpoint
+from .replay import FlagStates, decode_states, encode_states, replay
+from .repository import FlagStateCheckpointRepository
+
+
+class FlagStateService:
+    """
+    Reconstructs the state of a project's flags at a point in time from the
+    project's nearest earlier checkpoint and the audit entries written since.
+    """
+
+    def __init__(
+        self,
+        checkpoint_repository: FlagStateCheckpointRepository,
+        audit_log_repository: AuditLogRepository,
+    ):
+        self.checkpoint_repository = checkpoint_repository
+        self.audit_log_repository = audit_log_repository
+
+    async def _replay_since(
+        self,
+        project_id: int,
+        checkpoint: Optional[FlagStateCheckpoint],
+        until: datetime,
+    ) -> tuple[FlagStates, int]:
+        states = decode_states(checkpoint.state) if checkpoint else {}
+        entries = await self.audit_log_repository.get_changes(
+            project_id=project_id,
+            target_entity=FeatureFlag.__tablename__,
+            after=checkpoint.taken_at if checkpoint else None,
+            until=until,
+        )
+        return states, replay(states, entries)
+
+    @traced()
+    async def get_states_as_of(self, moment: datetime) -> schemas.FlagStatesAsOf:
+        """
+        Returns the state of every flag of the current project that existed
+        at `moment`.
+        """
+        moment = to_utc_naive(moment)
+        project_id = project_context.get()
+        checkpoint = await self.checkpoint_repository.get_latest(
+            project_id=project_id, at_or_before=moment
+        )
+        states, replayed = await self._replay_since(project_id, checkpoint, moment)
+        return schemas.FlagStatesAsOf(
+            as_of=moment,
+            checkpoint_taken_at=checkpoint.taken_at if checkpoint else None,
+            replayed_changes=replayed,
+            flags=[
+                schemas.FlagState(
+                    id=flag_id, name=name, description=description, is_enabled=enabled
+                )
+                for flag_id, (name, description, enabled) in sorted(states.items())
+            ],
+        )
+
+    @traced()
+    async def create_checkpoints(self, *, until: datetime) -> list[FlagStateCheckpoint]:
+        """
+        Stores a checkpoint of the flag states as of `until` for every
+        project with audit entries written since its latest checkpoint,
+        built from that checkpoint and the entries since.
+
+        Audit entries must not be written with a timestamp up to `until`
+        afterwards, so callers leave a delay for running transactions.
+
+        :return: The checkpoints stored, none if another worker is creating
+            checkpoints.
+        """
+        until = to_utc_naive(until)
+        if not await self.checkpoint_repository.try_lock():
+            return []
+        checkpoints = []
+        for project_id in await self.checkpoint_repository.get_changed_project_ids(
+            until=until
+        ):
+            latest = await self.checkpoint_repository.get_latest(
+                project_id=project_id, at_or_before=until
+            )
+            states, _ = await self._replay_since(project_id, latest, until)
+            checkpoints.append(
+                await self.checkpoint_repository.add(
+                    project_id=project_id, taken_at=until, state=encode_states(states)
+                )
+            )
+        await self.checkpoint_repository.commit()
+        return checkpoints
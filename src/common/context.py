@@ -1,4 +1,21 @@
 from contextvars import ContextVar
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
 
+if TYPE_CHECKING:
+    from src.infrastructure.tracing import Span
+
+
+# Rows written without a project belong to this one, created by the migrations.
+DEFAULT_PROJECT_ID = 1
 
 actor_context: ContextVar[str] = ContextVar("actor_context", default="system")
+project_context: ContextVar[int] = ContextVar(
+    "project_context", default=DEFAULT_PROJECT_ID
+)
+action_context: ContextVar[Enum] = ContextVar("action_context")
+operation_context: ContextVar[Optional[UUID]] = ContextVar(
+    "operation_context", default=None
+)
+trace_context: ContextVar[Optional["Span"]] = ContextVar("trace_context", default=None)
@@ -1,7 +1,8 @@
 from typing import Optional
 from fastapi import Header, Request
 
-from .context import actor_context
+from .context import DEFAULT_PROJECT_ID, actor_context, project_context
+from .exceptions import BadRequestException
 
 
 async def set_actor_from_header(
@@ -19,3 +20,42 @@ async def set_actor_from_header(
         yield
     finally:
         actor_context.reset(token)
+
+
+async def set_project_from_header(
+    x_project_id: int = Header(
+        DEFAULT_PROJECT_ID,
+        alias="X-Project-Id",
+        ge=1,
+        description="The project whose flags and history are used.",
+    )
+):
+    """
+    A dependency that sets the project context for a request. Flags, their
+    dependencies and audit entries of other projects are invisible to it.
+    """
+    token = project_context.set(x_project_id)
+    try:
+        yield
+    finally:
+        project_context.reset(token)
+
+
+async def get_if_match_version(
+    if_match: Optional[str] = Header(
+        None,
+        alias="If-Match",
+        description="The ETag (version) the client last saw; a mismatch fails with 409.",
+    )
+) -> Optional[int]:
+    """
+    A dependency that parses an `If-Match` header carrying a resource version.
+    Both strong (`"3"`) and weak (`W/"3"`) ETags are accepted, `*` matches any.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip().removeprefix("W/").strip('"')
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequestException("Invalid If-Match header.")
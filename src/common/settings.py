@@ -1,5 +1,6 @@
 from os import path
 from functools import lru_cache
+from typing import Optional
 
 from pydantic import PostgresDsn, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -7,6 +8,111 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     postgres_dsn: PostgresDsn
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=10, ge=0)
+
+    # Environments with their own flag states, e.g. `["dev", "eu-prod"]`.
+    environments: list[str] = Field(
+        default_factory=lambda: ["dev", "staging", "prod"], min_length=1
+    )
+
+    # Attempts for toggles hitting a concurrent modification before a 409.
+    optimistic_lock_attempts: int = Field(default=3, ge=1)
+
+    # Concurrent toggles arriving within this window are applied in one
+    # transaction and commit; None applies each toggle on its own.
+    toggle_group_commit_window_ms: Optional[float] = Field(default=None, gt=0)
+    toggle_group_commit_max_batch: int = Field(default=100, ge=1)
+
+    # Opt-in concurrency budgets for graph writes and reads. Requests beyond
+    # the limit queue up to the queue size and timeout, then get a 503. Keep
+    # the limits together below the pool size, so reads always find one.
+    admission_control_enabled: bool = False
+    admission_write_limit: int = Field(default=4, ge=1)
+    admission_write_queue: int = Field(default=64, ge=0)
+    admission_write_queue_timeout_ms: float = Field(default=5000.0, ge=0)
+    admission_read_limit: int = Field(default=8, ge=1)
+    admission_read_queue: int = Field(default=256, ge=0)
+    admission_read_queue_timeout_ms: float = Field(default=1000.0, ge=0)
+    # Audit exports stream for as long as the client reads and hold a
+    # connection meanwhile, so they get a small budget of their own.
+    admission_export_limit: int = Field(default=2, ge=1)
+    admission_export_queue: int = Field(default=0, ge=0)
+
+    # Responses of writes sent with an Idempotency-Key are kept this long.
+    # Duplicates wait this long for the first execution before a 409, and a
+    # running execution holds its key 30 seconds longer than that.
+    idempotency_ttl_s: float = Field(default=86400.0, gt=0)
+    idempotency_wait_timeout_s: float = Field(default=10.0, ge=0)
+    # Expired keys are purged periodically, in batches of this size.
+    idempotency_purge_interval_s: float = Field(default=300.0, gt=0)
+    idempotency_purge_batch_size: int = Field(default=1000, ge=1)
+
+    # Opt-in: write the audit entries of a transaction with one INSERT at
+    # commit, instead of one ORM instance each.
+    audit_coalescing_enabled: bool = False
+
+    # Audit entries are counted per hour, target, actor and action into a
+    # rollup this often, so `/history/stats` reads few rows for old hours.
+    # Hours that ended less than the settle delay ago are left for the next
+    # run, since transactions writing them may still be running.
+    audit_rollups_enabled: bool = True
+    audit_rollup_interval_s: float = Field(default=300.0, gt=0)
+    audit_rollup_settle_s: float = Field(default=60.0, ge=0)
+
+    # A checkpoint of the flag states of each changed project is stored this
+    # often, so point-in-time reads only replay the audit entries written
+    # since. Entries younger than the settle delay are left for the next
+    # checkpoint, since transactions writing them may still be running.
+    checkpoints_enabled: bool = True
+    checkpoint_interval_s: float = Field(default=3600.0, gt=0)
+    checkpoint_settle_s: float = Field(default=60.0, ge=0)
+
+    # Encoded JSON fragments of flags and audit entries kept for reuse in
+    # list responses, per entity type.
+    fragment_cache_size: int = Field(default=10_000, ge=0)
+
+    # Compiled targeting rules kept for reuse, one per flag version.
+    evaluator_cache_size: int = Field(default=10_000, ge=0)
+
+    # Flag reads and evaluations are counted in memory per worker, and the
+    # counts are added to the usage table this often.
+    flag_usage_enabled: bool = True
+    flag_usage_flush_interval_s: float = Field(default=5.0, gt=0)
+
+    # Scheduled toggles: the scheduler sleeps until the next one is due, but
+    # at most this long, to pick up toggles scheduled by other workers.
+    schedules_enabled: bool = True
+    schedule_max_sleep_s: float = Field(default=60.0, gt=0)
+
+    # Identical concurrent reads share one query and one response body.
+    single_flight_enabled: bool = True
+
+    # Warm-up before `/ready` passes: pool connections to pre-open and
+    # whether to preload the first page of flags.
+    warmup_pool_connections: int = Field(default=2, ge=0)
+    warmup_preload: bool = True
+    warmup_preload_limit: int = Field(default=100, ge=1)
+    # A request faster than this counts towards time-to-first-fast-request.
+    startup_fast_request_ms: float = Field(default=50.0, gt=0)
+
+    # Profiling is off unless a header token or a sample rate is configured.
+    profiling_header_token: Optional[str] = None
+    profiling_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    profiling_interval_ms: float = Field(default=1.0, gt=0)
+    profiling_output_dir: str = "profiles"
+
+    # Statements slower than this are logged with their plan; None disables it.
+    slow_query_threshold_ms: Optional[float] = Field(default=None, ge=0)
+    slow_query_explain: bool = True
+
+    # Spans are appended as OTLP/JSON lines to this file; None disables tracing.
+    tracing_export_path: Optional[str] = None
+    tracing_service_name: str = "feature-flag-service"
+
+    @property
+    def profiling_enabled(self) -> bool:
+        return bool(self.profiling_header_token) or self.profiling_sample_rate > 0
 
     model_config = SettingsConfigDict(
         env_prefix="DEPENDENCY_APP_",
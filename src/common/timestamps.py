@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, timezone
+
+
+def to_utc_naive(moment: datetime) -> datetime:
+    """Converts to naive UTC, the format of audit timestamps. Naive input is UTC."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(moment: datetime) -> datetime:
+    floored = floor_hour(moment)
+    return floored if floored == moment else floored + timedelta(hours=1)
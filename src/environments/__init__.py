@@ -0,0 +1,9 @@
+from .model import FlagEnvironmentState
+from .repository import FlagEnvironmentStateRepository
+from .service import EnvironmentFlagService
+
+__all__ = [
+    "FlagEnvironmentState",
+    "FlagEnvironmentStateRepository",
+    "EnvironmentFlagService",
+]
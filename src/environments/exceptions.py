@@ -0,0 +1,10 @@
+from src.common.exceptions import NotFoundException
+
+
+class EnvironmentException(Exception):
+    pass
+
+
+class EnvironmentNotFoundException(NotFoundException, EnvironmentException):
+    def __init__(self, environment: str):
+        super().__init__(message=f"Unknown environment '{environment}'.")
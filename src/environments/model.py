@@ -0,0 +1,41 @@
+from sqlalchemy import Boolean, Column, ForeignKeyConstraint, Index, Integer, String
+
+from src.infrastructure.database import Base
+from ..audit_logs.auditable import Auditable
+
+
+class FlagEnvironmentState(Base, Auditable):
+    """
+    The enabled state of a feature flag in one environment. Flags, and the
+    dependencies between them, are shared by all environments. A flag
+    without a state in an environment is disabled there.
+    """
+
+    __tablename__ = "flag_environment_states"
+    # Every audit entry records its project already.
+    __audit_exclude__ = ("project_id",)
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    flag_id = Column(Integer, nullable=False)
+    environment = Column(String, nullable=False)
+    is_enabled = Column(Boolean, default=False, nullable=False)
+    # Optimistic concurrency, as for the flag's own state.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["project_id", "flag_id"],
+            ["feature_flags.project_id", "feature_flags.id"],
+            ondelete="CASCADE",
+        ),
+        # Resolving an environment reads its states in one index range.
+        Index(
+            "ix_flag_environment_states_project_id_environment_flag_id",
+            "project_id",
+            "environment",
+            "flag_id",
+            unique=True,
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,104 @@
+from sqlalchemy import Row, and_, false, func, select
+
+from src.common.context import project_context
+from src.feature_flags.model import FeatureFlag, feature_dependency_association
+from src.infrastructure.base_repository import BaseRepository
+from src.infrastructure.tracing import traced
+from .model import FlagEnvironmentState
+from .schemas import FlagEnvironmentStateUpdate
+
+
+class FlagEnvironmentStateRepository(
+    BaseRepository[
+        FlagEnvironmentState, FlagEnvironmentStateUpdate, FlagEnvironmentStateUpdate
+    ]
+):
+    @traced()
+    async def get_resolved_rows(self, *, environment: str) -> list[Row]:
+        """
+        Resolves the state of every flag of the current project in an
+        environment with one query, as plain rows (`id`, `name`,
+        `is_enabled`, `version`) in id order. Flags without a state in the
+        environment are disabled, version 0.
+        """
+        statement = (
+            select(
+                FeatureFlag.id,
+                FeatureFlag.name,
+                func.coalesce(self.model.is_enabled, false()).label("is_enabled"),
+                func.coalesce(self.model.version, 0).label("version"),
+            )
+            .outerjoin(
+                self.model,
+                and_(
+                    self.model.project_id == FeatureFlag.project_id,
+                    self.model.environment == environment,
+                    self.model.flag_id == FeatureFlag.id,
+                ),
+            )
+            .where(FeatureFlag.project_id == project_context.get())
+            .order_by(FeatureFlag.id)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_states(
+        self, *, environment: str, flag_ids: list[int]
+    ) -> dict[int, FlagEnvironmentState]:
+        """Retrieves the states of the given flags in an environment, by flag id."""
+        if not flag_ids:
+            return {}
+        statement = select(self.model).where(
+            self.model.project_id == project_context.get(),
+            self.model.environment == environment,
+            self.model.flag_id.in_(flag_ids),
+        )
+        result = await self.db.execute(statement)
+        return {state.flag_id: state for state in result.scalars()}
+
+    @traced()
+    async def get_enabled_dependents(
+        self, *, environment: str, flag_ids: list[int]
+    ) -> list[FlagEnvironmentState]:
+        """
+        Retrieves the enabled states, in an environment, of the flags directly
+        depending on any of the given flags.
+        """
+        if not flag_ids:
+            return []
+        association = feature_dependency_association
+        statement = (
+            select(self.model)
+            .join(
+                association,
+                (association.c.project_id == self.model.project_id)
+                & (association.c.dependent_feature_id == self.model.flag_id),
+            )
+            .where(
+                self.model.project_id == project_context.get(),
+                self.model.environment == environment,
+                self.model.is_enabled.is_(True),
+                association.c.parent_feature_id.in_(flag_ids),
+            )
+            .distinct()
+        )
+        result = await self.db.execute(statement)
+        return result.scalars().all()
+
+    @traced()
+    async def add(
+        self, *, environment: str, flag_id: int, is_enabled: bool
+    ) -> FlagEnvironmentState:
+        """
+        Adds the first state of a flag of the current project in an
+        environment, without committing.
+        """
+        state = self.model(
+            project_id=project_context.get(),
+            environment=environment,
+            flag_id=flag_id,
+            is_enabled=is_enabled,
+        )
+        self.db.add(state)
+        await self.db.flush()
+        return state
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from dependency_injector.wiring import inject, Provide
+from fastapi import APIRouter, Depends, Response
+
+from src.common.context import project_context
+from src.common.dependencies import (
+    get_if_match_version,
+    set_actor_from_header,
+    set_project_from_header,
+)
+from src.feature_flags.router import TogglePayload
+from src.infrastructure.containers import AppContainer
+from src.infrastructure.serialization import encode_json
+from src.infrastructure.single_flight import SingleFlight
+from . import schemas
+from .service import EnvironmentFlagService
+
+router = APIRouter(
+    prefix="/environments",
+    tags=["Environments"],
+    dependencies=[Depends(set_project_from_header)],
+)
+
+
+@router.get("/{environment}/flags", response_model=list[schemas.EnvironmentFlag])
+@inject
+async def get_environment_flags(
+    environment: str,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: EnvironmentFlagService = Depends(
+        Provide[AppContainer.environment_flag_service]
+    ),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+):
+    """
+    Resolve the state of every flag in an environment, in one query.
+
+    - Flags never toggled in the environment are disabled there.
+    - Identical concurrent requests share one query and one response body.
+    """
+
+    async def load() -> bytes:
+        rows = await service.get_resolved_rows(environment)
+        return encode_json([row._asdict() for row in rows])
+
+    body = await single_flight.do(
+        ("environments.flags", project_context.get(), environment), load
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.patch(
+    "/{environment}/flags/{flag_id}/toggle",
+    response_model=schemas.FlagEnvironmentState,
+)
+@inject
+async def toggle_environment_flag(
+    environment: str,
+    flag_id: int,
+    payload: TogglePayload,
+    response: Response,
+    expected_version: Optional[int] = Depends(get_if_match_version),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: EnvironmentFlagService = Depends(
+        Provide[AppContainer.environment_flag_service]
+    ),
+):
+    """
+    Toggle a feature flag ON or OFF in one environment.
+
+    - When enabling, verifies that all dependencies are active in the
+      environment.
+    - When disabling, disables the flag's dependents in the environment.
+    - With `If-Match`, fails with 409 if the flag's version in the
+      environment changed.
+    """
+    state = await service.toggle(
+        environment=environment,
+        flag_id=flag_id,
+        is_enabled=payload.is_enabled,
+        expected_version=expected_version,
+    )
+    response.headers["ETag"] = f'"{state.version}"'
+    return state
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class EnvironmentFlag(BaseModel):
+    """A flag's state in one environment, as resolved for all flags."""
+
+    id: int
+    name: str
+    is_enabled: bool
+    # 0 until the flag is first toggled in the environment.
+    version: int
+
+
+class FlagEnvironmentState(BaseModel):
+    flag_id: int
+    environment: str
+    is_enabled: bool
+    version: int
+
+    class Config:
+        from_attributes = True
+
+
+class FlagEnvironmentStateUpdate(BaseModel):
+    is_enabled: bool
@@ -0,0 +1,153 @@
+from sqlalchemy import Row
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.audit_logs.decorators import with_audit_action
+from src.feature_flags.enums import FeatureFlagAuditActionEnum
+from src.feature_flags.exceptions import (
+    FeatureFlagNotFoundException,
+    FeatureFlagVersionConflictException,
+    MissingDependenciesException,
+)
+from src.feature_flags.repository import FeatureFlagRepository
+from src.infrastructure.tracing import traced
+from .exceptions import EnvironmentNotFoundException
+from .model import FlagEnvironmentState
+from .repository import FlagEnvironmentStateRepository
+from .schemas import FlagEnvironmentStateUpdate
+
+
+class EnvironmentFlagService:
+    """
+    Reads and toggles the state of flags per environment. The dependency
+    rules apply within each environment: a flag can only be enabled where
+    its dependencies are, and disabling it disables its dependents there.
+    """
+
+    def __init__(
+        self,
+        repository: FlagEnvironmentStateRepository,
+        flag_repository: FeatureFlagRepository,
+        environments: list[str],
+        max_attempts: int = 3,
+    ):
+        self.repository = repository
+        self.flag_repository = flag_repository
+        self.environments = frozenset(environments)
+        self.max_attempts = max_attempts
+
+    def _check_environment(self, environment: str) -> None:
+        if environment not in self.environments:
+            raise EnvironmentNotFoundException(environment)
+
+    @traced()
+    async def get_resolved_rows(self, environment: str) -> list[Row]:
+        """Retrieves the state of every flag in an environment."""
+        self._check_environment(environment)
+        return await self.repository.get_resolved_rows(environment=environment)
+
+    async def _lock_subgraph(self, flag_ids: list[int]) -> None:
+        """
+        Takes the same advisory locks as writes to the flags' own state, see
+        `FeatureFlagRepository.lock_subgraph`, so writes to the same part of
+        the graph are serialized across environments and edge changes.
+        """
+        await self.flag_repository.lock_subgraph(flag_ids=flag_ids)
+
+    @with_audit_action(FeatureFlagAuditActionEnum.TOGGLE)
+    @traced()
+    async def toggle(
+        self,
+        *,
+        environment: str,
+        flag_id: int,
+        is_enabled: bool,
+        expected_version: int | None = None,
+    ) -> FlagEnvironmentState:
+        """
+        Toggles a flag in one environment, with its cascade, in a single
+        transaction. A concurrent modification is retried from a fresh read,
+        unless the caller pinned a version with `If-Match`.
+        """
+        self._check_environment(environment)
+        attempts = 1 if expected_version is not None else self.max_attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._toggle(
+                    environment=environment,
+                    flag_id=flag_id,
+                    is_enabled=is_enabled,
+                    expected_version=expected_version,
+                )
+            except StaleDataError:
+                await self.repository.rollback()
+                if attempt == attempts:
+                    raise FeatureFlagVersionConflictException()
+
+    async def _toggle(
+        self,
+        *,
+        environment: str,
+        flag_id: int,
+        is_enabled: bool,
+        expected_version: int | None,
+    ) -> FlagEnvironmentState:
+        await self._lock_subgraph([flag_id])
+        flag = await self.flag_repository.get(_id=flag_id)
+        if not flag:
+            raise FeatureFlagNotFoundException()
+        states = await self.repository.get_states(
+            environment=environment,
+            flag_ids=[flag_id, *(dep.id for dep in flag.dependencies)],
+        )
+        state = states.get(flag_id)
+        version = state.version if state else 0
+        if expected_version is not None and version != expected_version:
+            raise FeatureFlagVersionConflictException(
+                f"Feature flag version in '{environment}' is {version}, "
+                f"expected {expected_version}."
+            )
+
+        if is_enabled:
+            missing_deps = [
+                dep.name
+                for dep in flag.dependencies
+                if dep.id not in states or not states[dep.id].is_enabled
+            ]
+            if missing_deps:
+                raise MissingDependenciesException(missing_dependencies=missing_deps)
+
+        if state is None:
+            state = await self.repository.add(
+                environment=environment, flag_id=flag_id, is_enabled=is_enabled
+            )
+        elif state.is_enabled != is_enabled:
+            await self.repository.update(
+                db_obj=state,
+                obj_in=FlagEnvironmentStateUpdate(is_enabled=is_enabled),
+                commit=False,
+            )
+        if not is_enabled:
+            await self._cascade_disable(environment, flag_id)
+
+        await self.repository.commit()
+        return state
+
+    @with_audit_action(FeatureFlagAuditActionEnum.AUTO_DISABLE)
+    @traced()
+    async def _cascade_disable(self, environment: str, flag_id: int) -> None:
+        """
+        Disables, in one environment, all flags depending on the given flag,
+        level by level with one query each.
+        """
+        frontier = [flag_id]
+        while frontier:
+            dependents = await self.repository.get_enabled_dependents(
+                environment=environment, flag_ids=frontier
+            )
+            for state in dependents:
+                await self.repository.update(
+                    db_obj=state,
+                    obj_in=FlagEnvironmentStateUpdate(is_enabled=False),
+                    commit=False,
+                )
+            frontier = [state.flag_id for state in dependents]
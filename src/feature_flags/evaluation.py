@@ -0,0 +1,252 @@
+import hashlib
+import operator
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+Context = dict[str, Any]
+Predicate = Callable[[Context], bool]
+
+# Rollout buckets per flag; percentages have a resolution of 0.01%.
+BUCKETS = 10_000
+
+Version = tuple[int, int, int, int, str]
+
+_VERSION = re.compile(
+    r"v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?"
+)
+_COMPARATOR = re.compile(r"\s*(>=|<=|>|<|==|=)?\s*([^\s<>=]+)")
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+    "=": operator.eq,
+    "": operator.eq,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_version(text: str) -> Optional[Version]:
+    """
+    Parses a semantic version into a comparable tuple, e.g. `2.1` into
+    `(2, 1, 0, 1, "")`. Missing parts are 0, a pre-release sorts before its
+    release, pre-release tags compare as strings and build metadata is
+    ignored.
+
+    :return: None if `text` is not a version.
+    """
+    match = _VERSION.fullmatch(text.strip())
+    if match is None:
+        return None
+    major, minor, patch, pre = match.groups()
+    return (int(major), int(minor or 0), int(patch or 0), 0 if pre else 1, pre or "")
+
+
+def parse_semver_range(text: str) -> list[list[tuple[str, Version]]]:
+    """
+    Parses a range such as `>=1.2.0 <2.0.0 || >=3.0.0`: comparators
+    separated by spaces must all hold, alternatives are separated by `||`.
+
+    :raises ValueError: If the range is empty or malformed.
+    """
+    alternatives = []
+    for alternative in text.split("||"):
+        comparators = []
+        position = 0
+        while position < len(alternative.rstrip()):
+            match = _COMPARATOR.match(alternative, position)
+            version = parse_version(match.group(2)) if match else None
+            if version is None:
+                raise ValueError(f"Invalid semver range: {text!r}.")
+            comparators.append((match.group(1) or "", version))
+            position = match.end()
+        if not comparators:
+            raise ValueError(f"Invalid semver range: {text!r}.")
+        alternatives.append(comparators)
+    return alternatives
+
+
+def bucket(flag_id: int, subject: Any) -> int:
+    """
+    The stable rollout bucket of a subject for a flag, in `[0, BUCKETS)`.
+
+    Hashing the flag id along with the subject spreads the subjects of
+    different flags independently, and keeps them across renames.
+    """
+    return _bucketer(flag_id)(subject)
+
+
+def _bucketer(flag_id: int) -> Callable[[Any], int]:
+    prefix = f"{flag_id}:".encode()
+    blake2b = hashlib.blake2b
+    from_bytes = int.from_bytes
+
+    def bucket_of(subject: Any) -> int:
+        digest = blake2b(prefix + str(subject).encode(), digest_size=8).digest()
+        return from_bytes(digest, "big") % BUCKETS
+
+    return bucket_of
+
+
+def _compile_in(attribute: str, values: list) -> Predicate:
+    allowed = frozenset(values)
+
+    def matches(context: Context) -> bool:
+        try:
+            return context.get(attribute) in allowed
+        except TypeError:  # An unhashable context value.
+            return False
+
+    return matches
+
+
+def _compile_semver(attribute: str, range_: str) -> Predicate:
+    alternatives = tuple(
+        tuple((_OPERATORS[op], bound) for op, bound in comparators)
+        for comparators in parse_semver_range(range_)
+    )
+
+    def matches(context: Context) -> bool:
+        value = context.get(attribute)
+        version = parse_version(value) if isinstance(value, str) else None
+        if version is None:
+            return False
+        for comparators in alternatives:
+            for compare, bound in comparators:
+                if not compare(version, bound):
+                    break
+            else:
+                return True
+        return False
+
+    return matches
+
+
+_CONDITION_COMPILERS: dict[str, Callable[[dict], Predicate]] = {
+    "in": lambda condition: _compile_in(condition["attribute"], condition["values"]),
+    "semver": lambda condition: _compile_semver(
+        condition["attribute"], condition["range"]
+    ),
+}
+
+
+class Evaluation(NamedTuple):
+    enabled: bool
+    reason: str
+    # Index of the rule that decided, if any.
+    rule: Optional[int] = None
+
+
+DISABLED = Evaluation(False, "disabled")
+ENABLED = Evaluation(True, "enabled")
+NO_RULE_MATCHED = Evaluation(False, "no_rule_matched")
+
+
+class FlagEvaluator:
+    """
+    The targeting of one version of a flag, compiled from its stored rules
+    into predicates over plain dicts, so that evaluating it does no parsing,
+    validation or allocation.
+
+    A disabled flag is off. An enabled flag without rules is on. Otherwise
+    the first rule whose conditions all match decides: the flag is on if the
+    subject's bucket falls within the rule's percentage. When no rule
+    matches, the flag is off.
+    """
+
+    __slots__ = ("flag_id", "version", "evaluate")
+
+    def __init__(
+        self,
+        flag_id: int,
+        version: int,
+        is_enabled: bool,
+        rules: Optional[list[dict]],
+    ):
+        self.flag_id = flag_id
+        self.version = version
+        self.evaluate: Callable[[Context], Evaluation]
+        if not is_enabled:
+            self.evaluate = lambda context: DISABLED
+        elif not rules:
+            self.evaluate = lambda context: ENABLED
+        else:
+            self.evaluate = self._compile(rules)
+
+    def _compile(self, rules: list[dict]) -> Callable[[Context], Evaluation]:
+        bucket_of = _bucketer(self.flag_id)
+        compiled = tuple(
+            (
+                tuple(
+                    _CONDITION_COMPILERS[condition["kind"]](condition)
+                    for condition in rule.get("conditions", ())
+                ),
+                # Subjects in a bucket below the threshold are in the rollout.
+                round(rule.get("percentage", 100) * BUCKETS / 100),
+                rule.get("bucket_by", "key"),
+                Evaluation(True, "rule_match", index),
+                Evaluation(False, "rollout_excluded", index),
+            )
+            for index, rule in enumerate(rules)
+        )
+
+        def evaluate(context: Context) -> Evaluation:
+            for predicates, threshold, bucket_by, matched, excluded in compiled:
+                for predicate in predicates:
+                    if not predicate(context):
+                        break
+                else:
+                    if threshold >= BUCKETS:
+                        return matched
+                    subject = context.get(bucket_by)
+                    if subject is not None and bucket_of(subject) < threshold:
+                        return matched
+                    return excluded
+            return NO_RULE_MATCHED
+
+        return evaluate
+
+
+class EvaluatorCache:
+    """
+    A bounded LRU cache of compiled evaluators, keyed by flag id and
+    version, so a changed flag is compiled again and the stale evaluator
+    ages out.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._evaluators: OrderedDict[Hashable, FlagEvaluator] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(
+        self,
+        flag_id: int,
+        version: int,
+        is_enabled: bool,
+        rules: Optional[list[dict]],
+    ) -> FlagEvaluator:
+        key = (flag_id, version)
+        evaluator = self._evaluators.get(key)
+        if evaluator is not None:
+            self._evaluators.move_to_end(key)
+            self.hits += 1
+            return evaluator
+
+        self.misses += 1
+        evaluator = FlagEvaluator(flag_id, version, is_enabled, rules)
+        self._evaluators[key] = evaluator
+        if len(self._evaluators) > self.max_size:
+            self._evaluators.popitem(last=False)
+        return evaluator
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._evaluators),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
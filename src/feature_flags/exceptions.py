@@ -40,3 +40,8 @@ class MissingDependenciesException(FeatureFlagBadRequestException):
     def __init__(self, missing_dependencies: list[str]):
         self.missing_dependencies = missing_dependencies
         super().__init__(message="Cannot enable due to inactive dependencies.")
+
+
+class FeatureFlagVersionConflictException(FeatureFlagConflictException):
+    def __init__(self, message: str = "Feature flag was modified concurrently."):
+        super().__init__(message=message)
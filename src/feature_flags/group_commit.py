@@ -0,0 +1,40 @@
+from typing import Union
+
+from src.infrastructure.database import Database
+from src.infrastructure.group_commit import GroupCommitter
+from . import model, schemas
+from .repository import FeatureFlagRepository
+from .service import FeatureFlagService
+
+
+class ToggleGroupCommitter(GroupCommitter[schemas.ToggleRequest, model.FeatureFlag]):
+    """
+    Applies concurrent toggle requests in one transaction, so a burst of
+    toggles pays for a single commit instead of one per request.
+
+    Batches run in their own session scope, independent of the sessions of
+    the requests that submitted them.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        window_ms: float,
+        max_batch: int = 100,
+        max_attempts: int = 3,
+    ):
+        super().__init__(window_ms=window_ms, max_batch=max_batch)
+        self.database = database
+        self.max_attempts = max_attempts
+
+    async def apply(
+        self, items: list[schemas.ToggleRequest]
+    ) -> list[Union[model.FeatureFlag, Exception]]:
+        async with self.database.session_scope():
+            service = FeatureFlagService(
+                FeatureFlagRepository(
+                    model=model.FeatureFlag, db_session=self.database.get_session()
+                ),
+                max_attempts=self.max_attempts,
+            )
+            return await service.toggle_batch(items)
@@ -2,44 +2,89 @@ from sqlalchemy import (
     Boolean,
     Column,
     ForeignKey,
+    ForeignKeyConstraint,
+    Index,
     Integer,
     String,
     Table,
+    UniqueConstraint,
+    and_,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
+from src.common.context import DEFAULT_PROJECT_ID
 from src.infrastructure.database import Base
 from ..audit_logs.auditable import Auditable
 
 
+# Both ends of an edge are referenced together with the edge's project, so
+# the database rejects dependencies between flags of different projects.
 feature_dependency_association = Table(
     "feature_dependency_association",
     Base.metadata,
+    Column("dependent_feature_id", Integer, primary_key=True),
+    Column("parent_feature_id", Integer, primary_key=True),
     Column(
-        "dependent_feature_id",
+        "project_id",
         Integer,
-        ForeignKey("feature_flags.id"),
-        primary_key=True,
+        nullable=False,
+        server_default=str(DEFAULT_PROJECT_ID),
     ),
-    Column(
-        "parent_feature_id", Integer, ForeignKey("feature_flags.id"), primary_key=True
+    ForeignKeyConstraint(
+        ["project_id", "dependent_feature_id"],
+        ["feature_flags.project_id", "feature_flags.id"],
+        name="fk_feature_dependency_association_dependent",
+    ),
+    ForeignKeyConstraint(
+        ["project_id", "parent_feature_id"],
+        ["feature_flags.project_id", "feature_flags.id"],
+        name="fk_feature_dependency_association_parent",
+    ),
+    # Cascades and the dependency graph walks look up edges by parent.
+    Index(
+        "ix_feature_dependency_association_project_id_parent",
+        "project_id",
+        "parent_feature_id",
     ),
 )
 
 
 class FeatureFlag(Base, Auditable):
     __tablename__ = "feature_flags"
+    # Every audit entry records its project already.
+    __audit_exclude__ = ("project_id",)
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True, nullable=False)
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id"),
+        nullable=False,
+        server_default=str(DEFAULT_PROJECT_ID),
+    )
+    # Names are unique per project. Name search is also served by a
+    # `pg_trgm` GIN index on the project and name, which is created in a
+    # migration since it requires extensions.
+    name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_enabled = Column(Boolean, default=False, nullable=False)
+    # Optimistic concurrency: every UPDATE checks and increments the version.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Targeting rules, as validated by `schemas.TargetingRule`. They are
+    # compiled into an evaluator per version, see `evaluation.FlagEvaluator`.
+    rules = Column(JSONB, nullable=True)
 
     dependencies = relationship(
         "FeatureFlag",
         secondary=feature_dependency_association,
-        primaryjoin=(feature_dependency_association.c.dependent_feature_id == id),
-        secondaryjoin=(feature_dependency_association.c.parent_feature_id == id),
+        primaryjoin=and_(
+            feature_dependency_association.c.dependent_feature_id == id,
+            feature_dependency_association.c.project_id == project_id,
+        ),
+        secondaryjoin=and_(
+            feature_dependency_association.c.parent_feature_id == id,
+            feature_dependency_association.c.project_id == project_id,
+        ),
         back_populates="dependents",
         lazy="selectin",
     )
@@ -47,8 +92,21 @@ class FeatureFlag(Base, Auditable):
     dependents = relationship(
         "FeatureFlag",
         secondary=feature_dependency_association,
-        primaryjoin=(feature_dependency_association.c.parent_feature_id == id),
-        secondaryjoin=(feature_dependency_association.c.dependent_feature_id == id),
+        primaryjoin=and_(
+            feature_dependency_association.c.parent_feature_id == id,
+            feature_dependency_association.c.project_id == project_id,
+        ),
+        secondaryjoin=and_(
+            feature_dependency_association.c.dependent_feature_id == id,
+            feature_dependency_association.c.project_id == project_id,
+        ),
         back_populates="dependencies",
         lazy="selectin",
     )
+
+    __table_args__ = (
+        # Lists are read per project in id order, and edges reference it.
+        UniqueConstraint("project_id", "id", name="uq_feature_flags_project_id_id"),
+        Index("ix_feature_flags_project_id_name", "project_id", "name", unique=True),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -1,27 +1,101 @@
 from typing import Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, Select, select, text, tuple_, union, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import lazyload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 
+from src.common.context import project_context
 from src.infrastructure.base_repository import BaseRepository
-from .model import FeatureFlag
-from .schemas import FeatureFlagCreate, FeatureFlagUpdate
+from src.infrastructure.tracing import traced
+from .model import FeatureFlag, feature_dependency_association
+from .schemas import (
+    FLAG_FIELDS,
+    FeatureFlagCreate,
+    FeatureFlagReadOptions,
+    FeatureFlagUpdate,
+)
+
+# First key of every flag and project advisory lock, so they cannot collide
+# with advisory locks taken by other applications sharing the database.
+FLAG_LOCK_NAMESPACE = 0x0F1A6
+PROJECT_LOCK_NAMESPACE = 0x0F1A7
+
+# Subgraphs up to this size are locked flag by flag, larger ones take their
+# project's lock exclusively instead. Postgres sizes its lock table for
+# `max_locks_per_transaction` (64 by default) locks per connection.
+MAX_FLAG_LOCKS = 32
+
+DEADLOCK_DETECTED = "40P01"
+
+# Within one statement the keys are sorted, projects first, then flags. A
+# write whose subgraph grew after its first locks takes the new ones in a
+# later statement, out of that order, so overlapping writes can still
+# deadlock. Postgres then aborts one of them, which starts over.
+LOCK_FLAGS_STATEMENT = text(
+    "SELECT count(*) FROM ("
+    "SELECT CASE WHEN :exclusive_projects "
+    "THEN pg_advisory_xact_lock(CAST(:project_namespace AS integer), projects.key) "
+    "ELSE pg_advisory_xact_lock_shared("
+    "CAST(:project_namespace AS integer), projects.key"
+    ") END FROM ("
+    "SELECT unnest(CAST(:project_ids AS integer[])) AS key ORDER BY 1"
+    ") AS projects "
+    "UNION ALL "
+    "SELECT pg_advisory_xact_lock(CAST(:flag_namespace AS integer), flags.key) FROM ("
+    "SELECT unnest(CAST(:flag_ids AS integer[])) AS key ORDER BY 1"
+    ") AS flags"
+    ") AS locks"
+)
 
 
 class FeatureFlagRepository(
     BaseRepository[FeatureFlag, FeatureFlagCreate, FeatureFlagUpdate]
 ):
+    """
+    Reads and writes the flags of the current project, see `project_context`.
+    Flags of other projects are not found, and cannot become dependencies.
+    """
+
+    loaded_relationships = ("dependencies", "dependents")
+
+    def _in_project(self, statement: Select) -> Select:
+        return statement.where(self.model.project_id == project_context.get())
+
+    @traced()
+    async def _load_batch(self, ids: list[int]) -> dict[int, FeatureFlag]:
+        statement = self._in_project(
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .options(
+                selectinload(self.model.dependencies),
+                selectinload(self.model.dependents),
+            )
+        )
+        result = await self.db.execute(statement)
+        return {instance.id: instance for instance in result.scalars()}
+
+    def _get_loaded(self, _id: int) -> FeatureFlag | None:
+        instance = super()._get_loaded(_id)
+        if instance is None or instance.project_id != project_context.get():
+            return None
+        return instance
+
+    @traced()
     async def _get_dependencies_from_ids(
         self, *, dependency_ids: list[int]
     ) -> list[FeatureFlag]:
-        if not dependency_ids:
-            return []
-        statement = select(self.model).where(self.model.id.in_(dependency_ids))
-        result = await self.db.execute(statement)
-        return result.scalars().all()
+        """
+        Loads the given flags, skipping unknown ids. Flags already loaded in
+        this session are not queried again.
+        """
+        flags = await self.load_many(ids=list(dict.fromkeys(dependency_ids)))
+        return [flag for flag in flags if flag is not None]
 
+    @traced()
     async def get(self, _id: int) -> Optional[FeatureFlag]:
-        statement = (
+        statement = self._in_project(
             select(self.model)
             .where(self.model.id == _id)
             .options(
@@ -32,19 +106,44 @@ class FeatureFlagRepository(
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
+    @traced()
+    async def get_many(self, *, ids: list[int]) -> list[FeatureFlag]:
+        """
+        Retrieves several flags with their relationships, overwriting any
+        state already loaded in the session with the database's.
+
+        The flags are not limited to the current project, since a batch of
+        toggles spans the projects of its requesters.
+        """
+        if not ids:
+            return []
+        statement = (
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .options(
+                selectinload(self.model.dependencies),
+                selectinload(self.model.dependents),
+            )
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(statement)
+        return result.scalars().all()
+
+    @traced()
     async def get_by_name(self, *, name: str) -> Optional[FeatureFlag]:
         """Retrieves a feature flag by its unique name."""
-        statement = select(self.model).where(self.model.name == name)
+        statement = self._in_project(select(self.model).where(self.model.name == name))
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
+    @traced()
     async def create(self, *, obj_in: FeatureFlagCreate) -> FeatureFlag:
         """
         Overrides the base create method to handle the many-to-many relationship.
         """
         obj_in_data = obj_in.model_dump(exclude={"dependency_ids"})
 
-        db_obj = self.model(**obj_in_data)
+        db_obj = self.model(**obj_in_data, project_id=project_context.get())
 
         if obj_in.dependency_ids:
             dependencies = await self._get_dependencies_from_ids(
@@ -57,8 +156,9 @@ class FeatureFlagRepository(
         await self.db.refresh(db_obj)
         return db_obj
 
+    @traced()
     async def update(
-        self, *, db_obj: FeatureFlag, obj_in: FeatureFlagUpdate
+        self, *, db_obj: FeatureFlag, obj_in: FeatureFlagUpdate, commit: bool = True
     ) -> FeatureFlag:
         """
         Overrides the base update method to handle the many-to-many relationship.
@@ -74,12 +174,316 @@ class FeatureFlagRepository(
             db_obj.dependencies = dependencies
 
         self.db.add(db_obj)
+        if not commit:
+            await self.db.flush()
+            return db_obj
         await self.db.commit()
         await self.db.refresh(db_obj)
         return db_obj
 
-    async def get_all(self, *, skip: int = 0, limit: int = 100) -> list[FeatureFlag]:
+    @traced()
+    async def get_dependents(self, *, flag_ids: list[int]) -> list[FeatureFlag]:
+        """
+        Retrieves the flags directly depending on any of the given flags, in one
+        query and without eagerly loading their own relationships.
+        """
+        if not flag_ids:
+            return []
+        association = feature_dependency_association
+        statement = (
+            select(self.model)
+            .join(association, association.c.dependent_feature_id == self.model.id)
+            .where(
+                association.c.project_id == project_context.get(),
+                association.c.parent_feature_id.in_(flag_ids),
+            )
+            .distinct()
+            .options(
+                lazyload(self.model.dependencies),
+                lazyload(self.model.dependents),
+            )
+        )
+        result = await self.db.execute(statement)
+        return result.scalars().all()
+
+    @traced()
+    async def claim_versions(self, *, flags: list[FeatureFlag]) -> None:
+        """
+        Increments the version of flags whose state a write depends on, but
+        which the write does not modify itself, e.g. the dependencies of a
+        flag being enabled.
+
+        Any concurrent write to one of these flags now conflicts with the
+        caller's transaction, just as if the flags had been updated. Bulk
+        UPDATEs do not fire mapper events, so no audit entries are produced.
+
+        :raises StaleDataError: If a flag was modified since it was loaded.
+        """
+        if not flags:
+            return
+        statement = (
+            update(self.model)
+            .where(
+                tuple_(self.model.id, self.model.version).in_(
+                    [(flag.id, flag.version) for flag in flags]
+                )
+            )
+            .values(version=self.model.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(statement)
+        if result.rowcount != len(flags):
+            raise StaleDataError("A dependency was modified concurrently.")
+        for flag in flags:
+            set_committed_value(flag, "version", flag.version + 1)
+
+    @traced()
+    async def get_related_ids(self, *, flag_ids: list[int]) -> dict[int, int]:
+        """
+        Returns the given flags together with all of their transitive
+        dependencies and dependents, computed with two recursive queries
+        in a single statement, as a map from flag id to project id.
+
+        Edges never cross projects, so the flags may belong to several
+        projects, as in a batch of toggles. Each edge is looked up within
+        the project of the flag it is reached from.
+        """
+        if not flag_ids:
+            return {}
+        association = feature_dependency_association
+        seeds = select(
+            self.model.id.label("id"), self.model.project_id.label("project_id")
+        ).where(self.model.id.in_(flag_ids))
+
+        ancestors = seeds.cte("ancestors", recursive=True)
+        ancestors = ancestors.union(
+            select(association.c.parent_feature_id, association.c.project_id).join(
+                ancestors,
+                (association.c.project_id == ancestors.c.project_id)
+                & (association.c.dependent_feature_id == ancestors.c.id),
+            )
+        )
+        descendants = seeds.cte("descendants", recursive=True)
+        descendants = descendants.union(
+            select(association.c.dependent_feature_id, association.c.project_id).join(
+                descendants,
+                (association.c.project_id == descendants.c.project_id)
+                & (association.c.parent_feature_id == descendants.c.id),
+            )
+        )
+        statement = union(
+            select(ancestors.c.id, ancestors.c.project_id),
+            select(descendants.c.id, descendants.c.project_id),
+        )
+        result = await self.db.execute(statement)
+        return dict(result.tuples().all())
+
+    @traced()
+    async def lock_subgraph(self, *, flag_ids: list[int]) -> None:
+        """
+        Serializes this write with every other write touching the same part
+        of the dependency graph: the given flags, their transitive
+        dependencies and their transitive dependents. Flags sharing a
+        dependency therefore take turns too.
+
+        Every write holds the lock of its projects shared. A subgraph of up to
+        `MAX_FLAG_LOCKS` flags is then locked flag by flag, so writes on
+        disjoint subgraphs run in parallel. A larger one takes its projects'
+        locks exclusively instead, which bounds the locks per transaction at
+        the price of serializing the write with all others in its projects.
+
+        The subgraph is read again after locking, since a concurrent write may
+        have added edges before we got the locks. Any flags it grew by are
+        locked as well, until it is stable. Optimistic version checks remain
+        in place for the rare overlap this misses.
+
+        :raises StaleDataError: If Postgres broke a deadlock between this and
+            another transaction, in which case the caller should start over.
+        """
+        locked_flags: set[int] = set()
+        # Project id to whether its lock is held exclusively.
+        locked_projects: dict[int, bool] = {}
+        while True:
+            related = await self.get_related_ids(flag_ids=flag_ids)
+            exclusive = len(related) > MAX_FLAG_LOCKS
+            new_projects = [
+                project_id
+                for project_id in set(related.values())
+                if project_id not in locked_projects
+                or (exclusive and not locked_projects[project_id])
+            ]
+            new_flags = set() if exclusive else related.keys() - locked_flags
+            if not new_projects and not new_flags:
+                return
+            await self.lock_flags(
+                flag_ids=list(new_flags),
+                project_ids=new_projects,
+                exclusive_projects=exclusive,
+            )
+            locked_projects.update(dict.fromkeys(new_projects, exclusive))
+            locked_flags |= new_flags
+
+    @traced()
+    async def lock_flags(
+        self,
+        *,
+        flag_ids: list[int],
+        project_ids: Optional[list[int]] = None,
+        exclusive_projects: bool = False,
+    ) -> None:
+        """
+        Takes transaction-scoped advisory locks on the given flags, in id
+        order, and before that on the given projects, shared unless
+        `exclusive_projects`, in one statement. It waits for concurrent
+        holders. The locks are released when the transaction commits or
+        rolls back.
+
+        :raises StaleDataError: If Postgres broke a deadlock between this and
+            another transaction, in which case the caller should start over.
+        """
+        if not flag_ids and not project_ids:
+            return
+        try:
+            await self.db.execute(
+                LOCK_FLAGS_STATEMENT,
+                {
+                    "exclusive_projects": exclusive_projects,
+                    "project_namespace": PROJECT_LOCK_NAMESPACE,
+                    "project_ids": sorted(project_ids or []),
+                    "flag_namespace": FLAG_LOCK_NAMESPACE,
+                    "flag_ids": sorted(flag_ids),
+                },
+            )
+        except DBAPIError as exc:
+            if getattr(exc.orig, "sqlstate", None) == DEADLOCK_DETECTED:
+                raise StaleDataError("Deadlock while locking feature flags.") from exc
+            raise
+
+    @traced()
+    async def get_rows(
+        self,
+        *,
+        options: FeatureFlagReadOptions,
+        skip: int = 0,
+        limit: int = 100,
+        flag_id: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> tuple[list[Row], dict[str, list[Row]]]:
+        """
+        Selects a page of flags, or the single flag `flag_id` or `name`, as
+        plain column rows without building ORM instances. Only the requested
+        columns are selected, plus `id` and `version` which the caller needs
+        for ETags and caching, and only the requested relationships are
+        queried.
+
+        :return: The flag rows, and for each expanded relationship one row
+            per related flag (`flag_id`, `id`, `name`, `version`), ordered by
+            the related flag's id.
+        """
+        statement = self._select_columns(options)
+        if flag_id is not None:
+            statement = statement.where(self.model.id == flag_id)
+        elif name is not None:
+            statement = statement.where(self.model.name == name)
+        else:
+            statement = statement.order_by(self.model.id).offset(skip).limit(limit)
+        return await self._with_related_rows(statement, options)
+
+    @traced()
+    async def search_rows(
+        self, *, query: str, options: FeatureFlagReadOptions, limit: int = 20
+    ) -> tuple[list[Row], dict[str, list[Row]]]:
+        """
+        Selects the flags whose name contains `query`, ignoring case, as plain
+        column rows. Names starting with `query` come first, then the rest,
+        each in name order.
+
+        The match is served by the `pg_trgm` GIN index on the project and
+        name, which handles both prefix and substring patterns.
+        """
+        statement = (
+            self._select_columns(options)
+            .where(self.model.name.icontains(query, autoescape=True))
+            .order_by(
+                self.model.name.istartswith(query, autoescape=True).desc(),
+                self.model.name,
+            )
+            .limit(limit)
+        )
+        return await self._with_related_rows(statement, options)
+
+    def _select_columns(self, options: FeatureFlagReadOptions) -> Select:
+        columns = {"id", "version", *options.fields}
+        return self._in_project(
+            select(
+                *(getattr(self.model, name) for name in FLAG_FIELDS if name in columns)
+            )
+        )
+
+    async def _with_related_rows(
+        self, statement: Select, options: FeatureFlagReadOptions
+    ) -> tuple[list[Row], dict[str, list[Row]]]:
+        flag_rows = (await self.db.execute(statement)).all()
+        related: dict[str, list[Row]] = {}
+        for relationship in options.expand:
+            related[relationship] = await self._get_related_rows(
+                relationship, flag_ids=[row.id for row in flag_rows]
+            )
+        return flag_rows, related
+
+    async def _get_related_rows(
+        self, relationship: str, *, flag_ids: list[int]
+    ) -> list[Row]:
+        if not flag_ids:
+            return []
+        association = feature_dependency_association
+        if relationship == "dependencies":
+            owner, related = (
+                association.c.dependent_feature_id,
+                association.c.parent_feature_id,
+            )
+        else:
+            owner, related = (
+                association.c.parent_feature_id,
+                association.c.dependent_feature_id,
+            )
         statement = (
+            select(
+                owner.label("flag_id"),
+                self.model.id,
+                self.model.name,
+                self.model.version,
+            )
+            .join(association, related == self.model.id)
+            .where(
+                association.c.project_id == project_context.get(),
+                owner.in_(flag_ids),
+            )
+            .order_by(self.model.id)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_evaluation_rows(self, *, ids: list[int]) -> list[Row]:
+        """
+        Selects what evaluating the given flags needs, as plain rows: `id`,
+        `version`, `is_enabled` and `rules`.
+        """
+        if not ids:
+            return []
+        statement = self._in_project(
+            select(
+                self.model.id,
+                self.model.version,
+                self.model.is_enabled,
+                self.model.rules,
+            ).where(self.model.id.in_(ids))
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_all(self, *, skip: int = 0, limit: int = 100) -> list[FeatureFlag]:
+        statement = self._in_project(
             select(self.model)
             .order_by(self.model.id)
             .offset(skip)
@@ -1,25 +1,68 @@
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response, status
 from dependency_injector.wiring import inject, Provide
 from pydantic import BaseModel
-from src.common.dependencies import set_actor_from_header
+from src.common.context import project_context
+from src.common.dependencies import (
+    get_if_match_version,
+    set_actor_from_header,
+    set_project_from_header,
+)
+
+from sqlalchemy import Row
 
+from src.checkpoints.schemas import FlagStatesAsOf
+from src.checkpoints.service import FlagStateService
+from src.flag_usage import schemas as usage_schemas
+from src.flag_usage.counter import EvaluationCounter
+from src.flag_usage.service import FlagUsageService
 from src.infrastructure.containers import AppContainer
+from src.infrastructure.single_flight import SingleFlight
 from . import schemas
-from .service import FeatureFlagService
+from .serializers import FeatureFlagListSerializer
+from .service import FeatureFlagService, FlagEvaluationService
 
-router = APIRouter(prefix="/flags", tags=["Feature Flags"])
+router = APIRouter(
+    prefix="/flags",
+    tags=["Feature Flags"],
+    dependencies=[Depends(set_project_from_header)],
+)
 
 
 class TogglePayload(BaseModel):
     is_enabled: bool
 
 
+def set_etag(response: Response, flag) -> None:
+    """Exposes the flag's version as its ETag, for use in `If-Match`."""
+    response.headers["ETag"] = f'"{flag.version}"'
+
+
+def get_read_options(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. `name,is_enabled`. "
+        "The `id` is always returned. Defaults to all fields.",
+    ),
+    expand: Optional[str] = Query(
+        None,
+        description="Comma-separated relationships to include: `dependencies`, "
+        "`dependents`. Defaults to `dependencies`; pass it empty for none.",
+    ),
+) -> schemas.FeatureFlagReadOptions:
+    """A dependency parsing the sparse fieldset and expansion parameters."""
+    return schemas.FeatureFlagReadOptions.parse(fields=fields, expand=expand)
+
+
 @router.post(
     "/", response_model=schemas.FeatureFlag, status_code=status.HTTP_201_CREATED
 )
 @inject
 async def create_flag(
     payload: schemas.FeatureFlagCreate,
+    response: Response,
     _actor_context: None = Depends(set_actor_from_header),
     service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
 ):
@@ -29,7 +72,9 @@ async def create_flag(
     - Validates that dependencies exist.
     - Detects and rejects circular dependencies.
     """
-    return await service.create(obj_in=payload)
+    flag = await service.create(obj_in=payload)
+    set_etag(response, flag)
+    return flag
 
 
 @router.get("/", response_model=list[schemas.FeatureFlag])
@@ -37,26 +82,284 @@ async def create_flag(
 async def get_all_flags(
     skip: int = 0,
     limit: int = 100,
+    options: schemas.FeatureFlagReadOptions = Depends(get_read_options),
     _actor_context: None = Depends(set_actor_from_header),
     service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+    serializer: FeatureFlagListSerializer = Depends(
+        Provide[AppContainer.feature_flag_list_serializer]
+    ),
 ):
     """
     Retrieve all feature flags with pagination.
+
+    - `fields` and `expand` select the columns and relationships that are
+      loaded and returned; without them, each flag is loaded in one query.
+    - Identical concurrent requests share one query and one response body.
+    """
+
+    async def load() -> bytes:
+        flag_rows, related_rows = await service.get_page_rows(
+            skip=skip, limit=limit, options=options
+        )
+        return serializer.encode(flag_rows, related_rows, options)
+
+    key = (
+        "flags.get_all",
+        project_context.get(),
+        skip,
+        limit,
+        options.fields,
+        options.expand,
+    )
+    body = await single_flight.do(key, load)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/as-of", response_model=FlagStatesAsOf)
+@inject
+async def get_flags_as_of(
+    ts: datetime = Query(
+        ...,
+        description="The point in time, ISO 8601. Without a UTC offset it is "
+        "taken as UTC.",
+    ),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagStateService = Depends(Provide[AppContainer.flag_state_service]),
+):
+    """
+    Reconstruct the name, description and enabled state of every flag that
+    existed at a point in time.
+
+    - Starts from the nearest earlier checkpoint and replays only the audit
+      entries written since, so the cost follows the recent changes rather
+      than the whole history.
+    """
+    return await service.get_states_as_of(ts)
+
+
+@router.post("/evaluate", response_model=list[schemas.FlagEvaluation])
+@inject
+async def evaluate_flags(
+    payload: schemas.BulkEvaluationRequest,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagEvaluationService = Depends(
+        Provide[AppContainer.flag_evaluation_service]
+    ),
+    usage: EvaluationCounter = Depends(Provide[AppContainer.flag_usage_counter]),
+):
+    """
+    Evaluate up to 1000 flags for the same context, in one query.
+
+    - Fails with 404 if any of the flags does not exist.
+    """
+    evaluations = await service.evaluate(
+        flag_ids=payload.flag_ids, context=payload.context
+    )
+    usage.record_many(payload.flag_ids)
+    return evaluations
+
+
+@router.get("/usage/stale", response_model=list[usage_schemas.StaleFlag])
+@inject
+async def get_stale_flags(
+    days: int = Query(30, ge=1, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagUsageService = Depends(Provide[AppContainer.flag_usage_service]),
+):
     """
-    return await service.get_all(skip=skip, limit=limit)
+    List the flags that were not read or evaluated in the last `days` days,
+    the ones never evaluated first, then the longest unused. Candidates for
+    removal.
+    """
+    return await service.get_stale(days, limit)
+
+
+@router.get("/usage/hot", response_model=list[usage_schemas.HotFlag])
+@inject
+async def get_hot_flags(
+    days: int = Query(1, ge=1, le=3650),
+    limit: int = Query(20, ge=1, le=1000),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagUsageService = Depends(Provide[AppContainer.flag_usage_service]),
+):
+    """List the most read and evaluated flags of the last `days` days (UTC)."""
+    return await service.get_hot(days, limit)
+
+
+@router.get("/search", response_model=list[schemas.FeatureFlag])
+@inject
+async def search_flags(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=255,
+        description="Case-insensitive prefix or substring of the flag name.",
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    options: schemas.FeatureFlagReadOptions = Depends(get_read_options),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+    serializer: FeatureFlagListSerializer = Depends(
+        Provide[AppContainer.feature_flag_list_serializer]
+    ),
+):
+    """
+    Search feature flags by name.
+
+    - Names starting with `q` are listed first, then names containing it.
+    - Accepts the same `fields` and `expand` parameters as the flag list.
+    """
+
+    async def load() -> bytes:
+        flag_rows, related_rows = await service.search_rows(
+            query=q, limit=limit, options=options
+        )
+        return serializer.encode(flag_rows, related_rows, options)
+
+    key = (
+        "flags.search",
+        project_context.get(),
+        q,
+        limit,
+        options.fields,
+        options.expand,
+    )
+    body = await single_flight.do(key, load)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/by-name/{name:path}", response_model=schemas.FeatureFlag)
+@inject
+async def get_flag_by_name(
+    name: str,
+    options: schemas.FeatureFlagReadOptions = Depends(get_read_options),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+    serializer: FeatureFlagListSerializer = Depends(
+        Provide[AppContainer.feature_flag_list_serializer]
+    ),
+    usage: EvaluationCounter = Depends(Provide[AppContainer.flag_usage_counter]),
+):
+    """
+    Retrieve a specific flag by its unique name, as `GET /flags/{flag_id}`
+    does by ID. The name may contain slashes.
+    """
+
+    async def load() -> tuple[bytes, Row]:
+        flag_row, related_rows = await service.get_rows(name=name, options=options)
+        return serializer.encode_one(flag_row, related_rows, options), flag_row
+
+    key = (
+        "flags.get_by_name",
+        project_context.get(),
+        name,
+        options.fields,
+        options.expand,
+    )
+    body, flag = await single_flight.do(key, load)
+    usage.record(flag.id)
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, flag)
+    return response
 
 
 @router.get("/{flag_id}", response_model=schemas.FeatureFlag)
 @inject
 async def get_flag(
     flag_id: int,
+    options: schemas.FeatureFlagReadOptions = Depends(get_read_options),
     _actor_context: None = Depends(set_actor_from_header),
     service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
+    single_flight: SingleFlight = Depends(Provide[AppContainer.single_flight]),
+    serializer: FeatureFlagListSerializer = Depends(
+        Provide[AppContainer.feature_flag_list_serializer]
+    ),
+    usage: EvaluationCounter = Depends(Provide[AppContainer.flag_usage_counter]),
 ):
     """
     Retrieve the current status and details of a specific flag by its ID.
+
+    - `fields` and `expand` select the columns and relationships that are
+      loaded and returned.
+    - Identical concurrent requests share one query and one response body.
+    """
+
+    async def load() -> tuple[bytes, Row]:
+        flag_row, related_rows = await service.get_rows(flag_id, options=options)
+        return serializer.encode_one(flag_row, related_rows, options), flag_row
+
+    key = (
+        "flags.get",
+        project_context.get(),
+        flag_id,
+        options.fields,
+        options.expand,
+    )
+    body, flag = await single_flight.do(key, load)
+    usage.record(flag_id)
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, flag)
+    return response
+
+
+@router.get("/{flag_id}/rules", response_model=schemas.FeatureFlagRules)
+@inject
+async def get_flag_rules(
+    flag_id: int,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagEvaluationService = Depends(
+        Provide[AppContainer.flag_evaluation_service]
+    ),
+):
+    """Retrieve the targeting rules of a flag. They are set with `PATCH`."""
+    return await service.get_rules(flag_id)
+
+
+@router.get("/{flag_id}/usage", response_model=usage_schemas.FlagUsage)
+@inject
+async def get_flag_usage(
+    flag_id: int,
+    days: int = Query(30, ge=1, le=3650),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagUsageService = Depends(Provide[AppContainer.flag_usage_service]),
+):
+    """
+    Retrieve how often a flag was read or evaluated per day (UTC) over the
+    last `days` days, and when it was last.
+
+    - Counts are flushed from each worker every few seconds, so the latest
+      ones may not be included yet.
+    """
+    return await service.get_usage(flag_id, days)
+
+
+@router.post("/{flag_id}/evaluate", response_model=schemas.FlagEvaluation)
+@inject
+async def evaluate_flag(
+    flag_id: int,
+    payload: schemas.EvaluationContext,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: FlagEvaluationService = Depends(
+        Provide[AppContainer.flag_evaluation_service]
+    ),
+    usage: EvaluationCounter = Depends(Provide[AppContainer.flag_usage_counter]),
+):
+    """
+    Evaluate a flag for the subject described by `context`.
+
+    - A disabled flag is off, an enabled flag without rules is on.
+    - Otherwise the first rule whose conditions all match decides, enabling
+      the flag for its percentage of subjects, bucketed by a stable hash of
+      the `bucket_by` attribute. When no rule matches, the flag is off.
+    - The rules of the flag's dependencies are not evaluated.
     """
-    return await service.get(_id=flag_id)
+    [evaluation] = await service.evaluate(flag_ids=[flag_id], context=payload.context)
+    usage.record(flag_id)
+    return evaluation
 
 
 @router.patch("/{flag_id}/toggle", response_model=schemas.FeatureFlag)
@@ -64,6 +367,8 @@ async def get_flag(
 async def toggle_flag(
     flag_id: int,
     payload: TogglePayload,
+    response: Response,
+    expected_version: Optional[int] = Depends(get_if_match_version),
     _actor_context: None = Depends(set_actor_from_header),
     service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
 ):
@@ -72,8 +377,16 @@ async def toggle_flag(
 
     - When enabling, verifies that all dependencies are active.
     - When disabling, triggers a cascading disable of all dependent flags.
+    - With `If-Match`, fails with 409 if the flag's version changed.
+      Without it, concurrent modifications are retried server-side.
     """
-    return await service.toggle(flag_id=flag_id, is_enabled=payload.is_enabled)
+    flag = await service.toggle(
+        flag_id=flag_id,
+        is_enabled=payload.is_enabled,
+        expected_version=expected_version,
+    )
+    set_etag(response, flag)
+    return flag
 
 
 @router.patch("/{flag_id}", response_model=schemas.FeatureFlag)
@@ -81,6 +394,8 @@ async def toggle_flag(
 async def update_flag(
     flag_id: int,
     payload: schemas.FeatureFlagUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(get_if_match_version),
     _actor_context: None = Depends(set_actor_from_header),
     service: FeatureFlagService = Depends(Provide[AppContainer.feature_flag_service]),
 ):
@@ -90,5 +405,11 @@ async def update_flag(
 
     - Validates that new dependencies exist.
     - Detects and rejects circular dependencies.
+    - Fails with 409 on a concurrent modification, or if the flag's version
+      does not match `If-Match`.
     """
-    return await service.update(flag_id=flag_id, obj_in=payload)
+    flag = await service.update(
+        flag_id=flag_id, obj_in=payload, expected_version=expected_version
+    )
+    set_etag(response, flag)
+    return flag
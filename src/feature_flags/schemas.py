@@ -1,5 +1,13 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Literal, Optional, Union
+from pydantic import BaseModel, Field, field_validator
+
+from .evaluation import parse_semver_range
+from .exceptions import FeatureFlagBadRequestException
+
+# Selectable fields and expandable relationships of flag reads, in the order
+# of the `FeatureFlag` response model.
+FLAG_FIELDS = ("name", "description", "is_enabled", "id", "version")
+FLAG_EXPANSIONS = ("dependencies", "dependents")
 
 
 class FeatureFlagNested(BaseModel):
@@ -16,8 +24,51 @@ class FeatureFlagBase(BaseModel):
     is_enabled: bool = False
 
 
+class InListCondition(BaseModel):
+    """Matches when the context attribute is one of `values`."""
+
+    kind: Literal["in"] = "in"
+    attribute: str
+    values: list[Union[str, int, float, bool]] = Field(min_length=1)
+
+
+class SemverCondition(BaseModel):
+    """
+    Matches when the context attribute is a version within `range`, e.g.
+    `>=1.2.0 <2.0.0 || >=3.0.0`.
+    """
+
+    kind: Literal["semver"] = "semver"
+    attribute: str
+    range: str
+
+    @field_validator("range")
+    @classmethod
+    def check_range(cls, value: str) -> str:
+        parse_semver_range(value)
+        return value
+
+
+TargetingCondition = Annotated[
+    Union[InListCondition, SemverCondition], Field(discriminator="kind")
+]
+
+
+class TargetingRule(BaseModel):
+    """
+    A rule enabling the flag for the subjects matching all its conditions,
+    or for a stable `percentage` of them, bucketed by the `bucket_by`
+    context attribute.
+    """
+
+    conditions: list[TargetingCondition] = Field(default_factory=list)
+    percentage: float = Field(default=100, ge=0, le=100)
+    bucket_by: str = "key"
+
+
 class FeatureFlagCreate(FeatureFlagBase):
     dependency_ids: list[int] = Field(default_factory=list)
+    rules: Optional[list[TargetingRule]] = None
 
 
 class FeatureFlagUpdate(BaseModel):
@@ -25,11 +76,88 @@ class FeatureFlagUpdate(BaseModel):
     description: Optional[str] = None
     is_enabled: Optional[bool] = None
     dependency_ids: Optional[list[int]] = Field(default=None)
+    # An empty list removes the flag's rules.
+    rules: Optional[list[TargetingRule]] = None
+
+
+class ToggleRequest(BaseModel):
+    """A toggle waiting to be applied as part of a group commit."""
+
+    flag_id: int
+    is_enabled: bool
+    expected_version: Optional[int] = None
+    actor: str
+    project_id: int
 
 
 class FeatureFlag(FeatureFlagBase):
     id: int
+    version: int
     dependencies: list[FeatureFlagNested] = Field(default_factory=list)
 
     class Config:
         from_attributes = True
+
+
+class FeatureFlagRules(BaseModel):
+    id: int
+    version: int
+    rules: list[TargetingRule] = Field(default_factory=list)
+
+
+class EvaluationContext(BaseModel):
+    """The attributes of the subject a flag is evaluated for."""
+
+    context: dict[str, Any] = Field(default_factory=dict)
+
+
+class BulkEvaluationRequest(EvaluationContext):
+    flag_ids: list[int] = Field(min_length=1, max_length=1000)
+
+
+class FlagEvaluation(BaseModel):
+    flag_id: int
+    enabled: bool
+    reason: Literal[
+        "disabled", "enabled", "rule_match", "rollout_excluded", "no_rule_matched"
+    ]
+    # Index of the rule that decided, if any.
+    rule: Optional[int] = None
+
+
+class FeatureFlagReadOptions(BaseModel):
+    """Which columns and relationships a flag read loads and returns."""
+
+    fields: tuple[str, ...] = FLAG_FIELDS
+    expand: tuple[str, ...] = ("dependencies",)
+
+    @classmethod
+    def parse(
+        cls, fields: Optional[str], expand: Optional[str]
+    ) -> "FeatureFlagReadOptions":
+        """
+        Parses comma-separated `fields` and `expand` query parameters. The
+        `id` is always returned; omitted parameters keep the defaults.
+        """
+        options = cls()
+        if fields is not None:
+            requested = {name.strip() for name in fields.split(",") if name.strip()}
+            unknown = requested - set(FLAG_FIELDS)
+            if unknown:
+                raise FeatureFlagBadRequestException(
+                    f"Unknown fields: {', '.join(sorted(unknown))}."
+                )
+            options.fields = tuple(
+                name for name in FLAG_FIELDS if name in requested or name == "id"
+            )
+        if expand is not None:
+            requested = {name.strip() for name in expand.split(",") if name.strip()}
+            unknown = requested - set(FLAG_EXPANSIONS)
+            if unknown:
+                raise FeatureFlagBadRequestException(
+                    f"Unknown expansions: {', '.join(sorted(unknown))}."
+                )
+            options.expand = tuple(
+                name for name in FLAG_EXPANSIONS if name in requested
+            )
+        return options
@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import Any
+
+from sqlalchemy import Row
+
+from src.infrastructure.serialization import FragmentCache
+from .schemas import FeatureFlagReadOptions
+
+
+class FeatureFlagListSerializer:
+    """
+    Encodes flag rows into the JSON of `schemas.FeatureFlag`, with the same
+    fields in the same order as the response model, limited to the fields
+    and relationships of the read options.
+
+    Each flag's fragment is cached under the read options, its id and
+    version, and the ids and versions of its related flags. Every write
+    bumps the version, so a fragment is reused exactly until the flag, a
+    related flag's name, or the set of related flags changes.
+    """
+
+    def __init__(self, cache: FragmentCache):
+        self.cache = cache
+
+    def _fragments(
+        self,
+        flag_rows: list[Row],
+        related_rows: dict[str, list[Row]],
+        options: FeatureFlagReadOptions,
+    ) -> list[bytes]:
+        related: dict[str, dict[int, list[Row]]] = {}
+        for relationship, rows in related_rows.items():
+            by_flag = related[relationship] = defaultdict(list)
+            for row in rows:
+                by_flag[row.flag_id].append(row)
+
+        def build(flag: Row) -> dict[str, Any]:
+            data = {name: getattr(flag, name) for name in options.fields}
+            for relationship in options.expand:
+                data[relationship] = [
+                    {"id": r.id, "name": r.name}
+                    for r in related[relationship].get(flag.id, ())
+                ]
+            return data
+
+        return [
+            self.cache.get_or_encode(
+                (
+                    options.fields,
+                    options.expand,
+                    flag.id,
+                    flag.version,
+                    *(
+                        tuple((r.id, r.version) for r in related[rel].get(flag.id, ()))
+                        for rel in options.expand
+                    ),
+                ),
+                lambda flag=flag: build(flag),
+            )
+            for flag in flag_rows
+        ]
+
+    def encode(
+        self,
+        flag_rows: list[Row],
+        related_rows: dict[str, list[Row]],
+        options: FeatureFlagReadOptions,
+    ) -> bytes:
+        """Encodes a JSON array of flags."""
+        return self.cache.join(self._fragments(flag_rows, related_rows, options))
+
+    def encode_one(
+        self,
+        flag_row: Row,
+        related_rows: dict[str, list[Row]],
+        options: FeatureFlagReadOptions,
+    ) -> bytes:
+        """Encodes a single flag."""
+        return self._fragments([flag_row], related_rows, options)[0]
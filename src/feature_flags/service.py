@@ -1,5 +1,10 @@
-from typing import Set
+from typing import TYPE_CHECKING, Optional, Set, Union
 
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from .evaluation import EvaluatorCache
 from .repository import FeatureFlagRepository
 from . import schemas, model
 
@@ -9,20 +14,46 @@ from .exceptions import (
     FeatureFlagConflictException,
     CircularDependencyException,
     MissingDependenciesException,
+    FeatureFlagVersionConflictException,
 )
-from src.audit_logs.decorators import with_audit_action
+from src.audit_logs.decorators import audit_operation, with_audit_action
+from src.common.context import actor_context, project_context
+from src.projects.exceptions import ProjectNotFoundException
+from src.infrastructure.tracing import traced
 from .enums import FeatureFlagAuditActionEnum
 
+if TYPE_CHECKING:
+    from .group_commit import ToggleGroupCommitter
+
+FOREIGN_KEY_VIOLATION = "23503"
+
 
 class FeatureFlagService:
-    def __init__(self, repository: FeatureFlagRepository):
+    def __init__(
+        self,
+        repository: FeatureFlagRepository,
+        max_attempts: int = 3,
+        toggle_committer: Optional["ToggleGroupCommitter"] = None,
+    ):
         self.repository = repository
+        self.max_attempts = max_attempts
+        self.toggle_committer = toggle_committer
+
+    async def _lock_subgraph(self, flag_ids: list[int]) -> None:
+        """
+        Serializes this write with every other write touching the same part
+        of the dependency graph, see `FeatureFlagRepository.lock_subgraph`.
+        """
+        await self.repository.lock_subgraph(flag_ids=flag_ids)
 
+    @traced()
     async def _validate_circular_dependency(
         self, flag_id: int | None, dependency_ids: list[int]
     ):
         """
-        Performs a Depth-First Search (DFS) to detect cycles in the dependency graph.
+        Walks the transitive dependencies of `dependency_ids` level by level,
+        loading each level with one batched lookup, and rejects the new
+        dependencies if they lead back to the flag itself.
         """
         if not dependency_ids:
             return
@@ -30,32 +61,38 @@ class FeatureFlagService:
         if flag_id and flag_id in dependency_ids:
             raise SelfDependencyException()
 
-        path: Set[int] = set([flag_id]) if flag_id else set()
-        visiting: Set[int] = set([flag_id]) if flag_id else set()
-
-        async def dfs(node_id: int):
-            path.add(node_id)
-            visiting.add(node_id)
-
-            node = await self.repository.get(node_id)
-            if not node:
-                return
-
-            for dep in node.dependencies:
-                if dep.id in visiting:
-                    raise CircularDependencyException(flag_name=dep.name)
-                if dep.id not in path:
-                    await dfs(dep.id)
-
-            visiting.remove(node_id)
-
-        for dep_id in dependency_ids:
-            if dep_id not in path:
-                await dfs(dep_id)
+        seen: Set[int] = set(dependency_ids)
+        frontier = list(seen)
+        while frontier:
+            next_frontier = []
+            for node in await self.repository.load_many(ids=frontier):
+                if node is None:
+                    continue
+                for dep in node.dependencies:
+                    if dep.id == flag_id:
+                        raise CircularDependencyException(flag_name=dep.name)
+                    if dep.id not in seen:
+                        seen.add(dep.id)
+                        next_frontier.append(dep.id)
+            frontier = next_frontier
 
     @with_audit_action(FeatureFlagAuditActionEnum.CREATE)
+    @traced()
     async def create(self, *, obj_in: schemas.FeatureFlagCreate) -> model.FeatureFlag:
-        """Creates a new feature flag after validating its name and dependencies."""
+        """
+        Creates a new feature flag after validating its name and dependencies.
+        A deadlock broken while locking the subgraph is retried from the start.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._create(obj_in=obj_in)
+            except StaleDataError:
+                await self.repository.rollback()
+                if attempt == self.max_attempts:
+                    raise FeatureFlagVersionConflictException()
+
+    async def _create(self, *, obj_in: schemas.FeatureFlagCreate) -> model.FeatureFlag:
+        await self._lock_subgraph(obj_in.dependency_ids)
         if await self.repository.get_by_name(name=obj_in.name):
             raise FeatureFlagConflictException(
                 f"Feature flag with name '{obj_in.name}' already exists."
@@ -73,46 +110,198 @@ class FeatureFlagService:
             flag_id=None, dependency_ids=obj_in.dependency_ids
         )
 
-        return await self.repository.create(obj_in=obj_in)
+        try:
+            return await self.repository.create(obj_in=obj_in)
+        except IntegrityError as exc:
+            # The dependencies were found in the project, so only the
+            # project itself can be missing.
+            if getattr(exc.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                await self.repository.rollback()
+                raise ProjectNotFoundException()
+            raise
+
+    @staticmethod
+    def _check_version(db_flag: model.FeatureFlag, expected_version: int | None):
+        """Fails fast when the client's `If-Match` version is outdated."""
+        if expected_version is not None and db_flag.version != expected_version:
+            raise FeatureFlagVersionConflictException(
+                f"Feature flag version is {db_flag.version}, "
+                f"expected {expected_version}."
+            )
+
+    @with_audit_action(FeatureFlagAuditActionEnum.TOGGLE)
+    @traced()
+    async def toggle(
+        self, *, flag_id: int, is_enabled: bool, expected_version: int | None = None
+    ) -> model.FeatureFlag:
+        """
+        Toggles a flag's state, handling all dependency rules.
+
+        The toggle and its cascade are committed in a single transaction.
+        Setting a state is idempotent, so a concurrent modification is retried
+        from a fresh read, unless the caller pinned a version with `If-Match`.
+        With group commit enabled, the toggle is applied together with other
+        concurrent toggles instead.
+        """
+        if self.toggle_committer is not None:
+            return await self.toggle_committer.submit(
+                schemas.ToggleRequest(
+                    flag_id=flag_id,
+                    is_enabled=is_enabled,
+                    expected_version=expected_version,
+                    actor=actor_context.get(),
+                    project_id=project_context.get(),
+                )
+            )
+
+        attempts = 1 if expected_version is not None else self.max_attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._toggle(
+                    flag_id=flag_id,
+                    is_enabled=is_enabled,
+                    expected_version=expected_version,
+                )
+            except StaleDataError:
+                await self.repository.rollback()
+                if attempt == attempts:
+                    raise FeatureFlagVersionConflictException()
 
     @with_audit_action(FeatureFlagAuditActionEnum.TOGGLE)
-    async def toggle(self, *, flag_id: int, is_enabled: bool) -> model.FeatureFlag:
-        """Toggles a flag's state, handling all dependency rules."""
+    @traced()
+    async def toggle_batch(
+        self, requests: list[schemas.ToggleRequest]
+    ) -> list[Union[model.FeatureFlag, Exception]]:
+        """
+        Applies several toggles in a single transaction and commit.
+
+        The subgraphs of all toggles are locked up front, in one pass. Every
+        toggle then runs in its own savepoint under its requester's actor, so
+        a failing toggle is rolled back alone and reported in its slot of the
+        result, while the others are still committed. The requests may come
+        from different projects, each toggle runs in its requester's.
+        """
+        try:
+            await self._lock_subgraph(sorted({r.flag_id for r in requests}))
+        except StaleDataError:
+            await self.repository.rollback()
+            return [FeatureFlagVersionConflictException() for _ in requests]
+
+        outcomes: list[Optional[Exception]] = []
+        for request in requests:
+            token = actor_context.set(request.actor)
+            project_token = project_context.set(request.project_id)
+            try:
+                # Each requester's toggle is an audit operation of its own.
+                with audit_operation():
+                    await self._toggle_in_savepoint(request)
+                outcomes.append(None)
+            except Exception as exc:
+                outcomes.append(exc)
+            finally:
+                project_context.reset(project_token)
+                actor_context.reset(token)
+        await self.repository.commit()
+
+        # Later toggles in the batch may have changed flags returned by
+        # earlier ones, so all results are reloaded after the commit.
+        flags = {
+            flag.id: flag
+            for flag in await self.repository.get_many(
+                ids=[r.flag_id for r, exc in zip(requests, outcomes) if exc is None]
+            )
+        }
+        return [
+            exc if exc is not None else flags[r.flag_id]
+            for r, exc in zip(requests, outcomes)
+        ]
+
+    async def _toggle_in_savepoint(self, request: schemas.ToggleRequest) -> None:
+        attempts = 1 if request.expected_version is not None else self.max_attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                async with self.repository.savepoint():
+                    await self._toggle(
+                        flag_id=request.flag_id,
+                        is_enabled=request.is_enabled,
+                        expected_version=request.expected_version,
+                        commit=False,
+                    )
+                return
+            except StaleDataError:
+                if attempt == attempts:
+                    raise FeatureFlagVersionConflictException()
+
+    async def _toggle(
+        self,
+        *,
+        flag_id: int,
+        is_enabled: bool,
+        expected_version: int | None,
+        commit: bool = True,
+    ) -> model.FeatureFlag:
+        # Without a commit, the caller already holds the locks of a batch.
+        if commit:
+            await self._lock_subgraph([flag_id])
         db_flag = await self.repository.get(_id=flag_id)
         if not db_flag:
             raise FeatureFlagNotFoundException()
+        self._check_version(db_flag, expected_version)
         if is_enabled:
             missing_deps = [
                 dep.name for dep in db_flag.dependencies if not dep.is_enabled
             ]
             if missing_deps:
                 raise MissingDependenciesException(missing_dependencies=missing_deps)
+            if not db_flag.is_enabled:
+                # Enabling relies on the dependencies staying enabled, so a
+                # concurrent disable of any of them must conflict with us.
+                await self.repository.claim_versions(flags=db_flag.dependencies)
             updated_flag = await self.repository.update(
-                db_obj=db_flag, obj_in=schemas.FeatureFlagUpdate(is_enabled=is_enabled)
+                db_obj=db_flag,
+                obj_in=schemas.FeatureFlagUpdate(is_enabled=is_enabled),
+                commit=False,
             )
 
         else:
             updated_flag = await self.repository.update(
-                db_obj=db_flag, obj_in=schemas.FeatureFlagUpdate(is_enabled=is_enabled)
+                db_obj=db_flag,
+                obj_in=schemas.FeatureFlagUpdate(is_enabled=is_enabled),
+                commit=False,
             )
 
             await self._cascade_disable(db_flag)
 
+        if commit:
+            await self.repository.commit()
         return updated_flag
 
     @with_audit_action(FeatureFlagAuditActionEnum.AUTO_DISABLE)
+    @traced()
     async def _cascade_disable(self, parent_flag: model.FeatureFlag):
-        """Iteratively disables all flags that depend on the parent flag."""
-        flags_to_process = list(parent_flag.dependents)
-        while flags_to_process:
-            dependent_flag = flags_to_process.pop(0)
-            if dependent_flag.is_enabled:
-                await self.repository.update(
-                    db_obj=dependent_flag,
-                    obj_in=schemas.FeatureFlagUpdate(is_enabled=False),
-                )
-                flags_to_process.extend(dependent_flag.dependents)
+        """
+        Disables all flags that depend on the parent flag, level by level.
 
+        Each level is loaded with a single query. Only flags that were enabled
+        are followed further, since the dependents of a disabled flag are
+        already disabled.
+        """
+        frontier = [parent_flag.id]
+        while frontier:
+            disabled_ids = []
+            for dependent_flag in await self.repository.get_dependents(
+                flag_ids=frontier
+            ):
+                if dependent_flag.is_enabled:
+                    await self.repository.update(
+                        db_obj=dependent_flag,
+                        obj_in=schemas.FeatureFlagUpdate(is_enabled=False),
+                        commit=False,
+                    )
+                    disabled_ids.append(dependent_flag.id)
+            frontier = disabled_ids
+
+    @traced()
     async def get(self, _id: int) -> model.FeatureFlag:
         """Retrieves a single flag by its ID."""
         flag = await self.repository.get(_id)
@@ -120,17 +309,89 @@ class FeatureFlagService:
             raise FeatureFlagNotFoundException()
         return flag
 
+    @traced()
     async def get_all(self, *, skip: int, limit: int) -> list[model.FeatureFlag]:
         """Retrieves a paginated list of all feature flags."""
         return await self.repository.get_all(skip=skip, limit=limit)
 
+    @traced()
+    async def get_page_rows(
+        self, *, skip: int, limit: int, options: schemas.FeatureFlagReadOptions
+    ) -> tuple[list[Row], dict[str, list[Row]]]:
+        """
+        Retrieves the same page as `get_all`, as plain column rows for the
+        serialization fast path, limited to the requested fields and
+        relationships.
+        """
+        return await self.repository.get_rows(skip=skip, limit=limit, options=options)
+
+    @traced()
+    async def get_rows(
+        self,
+        flag_id: int | None = None,
+        *,
+        name: str | None = None,
+        options: schemas.FeatureFlagReadOptions,
+    ) -> tuple[Row, dict[str, list[Row]]]:
+        """
+        Retrieves a single flag by its ID or its unique name, as plain column
+        rows like `get_page_rows`.
+        """
+        flag_rows, related = await self.repository.get_rows(
+            flag_id=flag_id, name=name, options=options
+        )
+        if not flag_rows:
+            raise FeatureFlagNotFoundException()
+        return flag_rows[0], related
+
+    @traced()
+    async def search_rows(
+        self, *, query: str, limit: int, options: schemas.FeatureFlagReadOptions
+    ) -> tuple[list[Row], dict[str, list[Row]]]:
+        """Finds flags by a prefix or substring of their name."""
+        return await self.repository.search_rows(
+            query=query, limit=limit, options=options
+        )
+
     @with_audit_action(FeatureFlagAuditActionEnum.UPDATE)
+    @traced()
     async def update(
-        self, *, flag_id: int, obj_in: schemas.FeatureFlagUpdate
+        self,
+        *,
+        flag_id: int,
+        obj_in: schemas.FeatureFlagUpdate,
+        expected_version: int | None = None,
     ) -> model.FeatureFlag:
+        """
+        Updates a flag's properties and dependencies.
+
+        A concurrent modification of the flag, or of a new dependency, is
+        retried from a fresh read, as is a deadlock broken while locking the
+        subgraph, unless the caller pinned a version with `If-Match`.
+        """
+        attempts = 1 if expected_version is not None else self.max_attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._update(
+                    flag_id=flag_id, obj_in=obj_in, expected_version=expected_version
+                )
+            except StaleDataError:
+                await self.repository.rollback()
+                if attempt == attempts:
+                    raise FeatureFlagVersionConflictException()
+
+    async def _update(
+        self,
+        *,
+        flag_id: int,
+        obj_in: schemas.FeatureFlagUpdate,
+        expected_version: int | None,
+    ) -> model.FeatureFlag:
+        await self._lock_subgraph([flag_id, *(obj_in.dependency_ids or [])])
         db_flag = await self.repository.get(_id=flag_id)
         if not db_flag:
             raise FeatureFlagNotFoundException()
+        self._check_version(db_flag, expected_version)
 
         if obj_in.name and obj_in.name != db_flag.name:
             if await self.repository.get_by_name(name=obj_in.name):
@@ -142,5 +403,69 @@ class FeatureFlagService:
             await self._validate_circular_dependency(
                 flag_id=flag_id, dependency_ids=obj_in.dependency_ids
             )
+            # The cycle check read the new dependencies' edges, a concurrent
+            # edge change on any of them must conflict with this update.
+            await self.repository.claim_versions(
+                flags=await self.repository._get_dependencies_from_ids(
+                    dependency_ids=obj_in.dependency_ids
+                )
+            )
 
         return await self.repository.update(db_obj=db_flag, obj_in=obj_in)
+
+
+class FlagEvaluationService:
+    """
+    Evaluates flags for a subject's context. Each version of a flag's rules
+    is compiled once and kept in a process-wide cache, so an evaluation only
+    reads the flag's version and rules and runs the compiled predicates.
+    """
+
+    def __init__(self, repository: FeatureFlagRepository, evaluators: EvaluatorCache):
+        self.repository = repository
+        self.evaluators = evaluators
+
+    @traced()
+    async def get_rules(self, flag_id: int) -> schemas.FeatureFlagRules:
+        """Retrieves the targeting rules of a flag."""
+        [row] = await self._get_rows([flag_id])
+        return schemas.FeatureFlagRules(
+            id=row.id, version=row.version, rules=row.rules or []
+        )
+
+    @traced()
+    async def evaluate(
+        self, *, flag_ids: list[int], context: dict
+    ) -> list[schemas.FlagEvaluation]:
+        """
+        Evaluates the given flags for `context`, in the order of `flag_ids`.
+
+        :raises FeatureFlagNotFoundException: If any of the flags is unknown.
+        """
+        results = []
+        for row in await self._get_rows(flag_ids):
+            evaluator = self.evaluators.get_or_compile(
+                row.id, row.version, row.is_enabled, row.rules
+            )
+            evaluation = evaluator.evaluate(context)
+            results.append(
+                schemas.FlagEvaluation(
+                    flag_id=row.id,
+                    enabled=evaluation.enabled,
+                    reason=evaluation.reason,
+                    rule=evaluation.rule,
+                )
+            )
+        return results
+
+    async def _get_rows(self, flag_ids: list[int]) -> list[Row]:
+        ids = list(dict.fromkeys(flag_ids))
+        rows = {
+            row.id: row for row in await self.repository.get_evaluation_rows(ids=ids)
+        }
+        missing = [flag_id for flag_id in ids if flag_id not in rows]
+        if missing:
+            raise FeatureFlagNotFoundException(
+                f"Feature flags not found: {', '.join(map(str, missing))}."
+            )
+        return [rows[flag_id] for flag_id in ids]
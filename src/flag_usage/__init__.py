@@ -0,0 +1,11 @@
+from .counter import EvaluationCounter
+from .model import FlagUsageDay
+from .repository import FlagUsageRepository
+from .service import FlagUsageService
+
+__all__ = [
+    "EvaluationCounter",
+    "FlagUsageDay",
+    "FlagUsageRepository",
+    "FlagUsageService",
+]
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.infrastructure.database import Database
+from .counter import EvaluationCounter
+from .model import FlagUsageDay
+from .repository import FlagUsageRepository
+from .service import FlagUsageService
+
+logger = logging.getLogger(__name__)
+
+
+async def flush_flag_usage(db: Database, counter: EvaluationCounter) -> int:
+    """Adds the evaluations counted since the last flush to the usage table."""
+    async with db.session_scope():
+        session = db.get_session()
+        service = FlagUsageService(
+            repository=FlagUsageRepository(model=FlagUsageDay, db_session=session),
+            flag_repository=FeatureFlagRepository(
+                model=FeatureFlag, db_session=session
+            ),
+        )
+        return await service.flush(counter)
+
+
+async def flush_flag_usage_periodically(
+    db: Database, counter: EvaluationCounter, interval_s: float
+) -> None:
+    """
+    Runs `flush_flag_usage` every `interval_s` seconds until cancelled, and
+    once more then, so the counts of a stopping worker are not lost.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                await flush_flag_usage(db, counter)
+            except Exception:
+                logger.exception("Flushing flag usage failed.")
+    finally:
+        try:
+            await flush_flag_usage(db, counter)
+        except Exception:
+            logger.exception("Flushing flag usage on shutdown failed.")
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Integer
+
+from src.infrastructure.database import Base
+
+
+class FlagUsageDay(Base):
+    """
+    How often a flag was evaluated on one day (UTC), and when last. Workers
+    count evaluations in memory and add their counts every few seconds, see
+    `EvaluationCounter`, so a row is written per flag and day rather than
+    per evaluation.
+    """
+
+    __tablename__ = "flag_usage_days"
+
+    flag_id = Column(
+        Integer,
+        ForeignKey("feature_flags.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Also indexed on its own, for the most evaluated flags of recent days.
+    day = Column(Date, primary_key=True, index=True)
+    evaluations = Column(BigInteger, nullable=False)
+    # Naive UTC, like the audit log timestamps. Precise to the flush interval.
+    last_evaluated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,158 @@
+from datetime import date, datetime
+from typing import Mapping, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    Row,
+    Select,
+    bindparam,
+    func,
+    literal,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.common.context import project_context
+from src.feature_flags.model import FeatureFlag
+from src.infrastructure.base_repository import BaseRepository
+from src.infrastructure.tracing import traced
+from .model import FlagUsageDay
+
+
+class FlagUsageRepository(BaseRepository[FlagUsageDay, BaseModel, BaseModel]):
+    """
+    Writes the evaluation counts of all projects, and reads those of the
+    flags of the current project, see `project_context`.
+    """
+
+    @traced()
+    async def add_counts(self, *, counts: Mapping[int, int], at: datetime) -> int:
+        """
+        Adds evaluation counts to the flags' rows for the day of `at`, in one
+        statement whatever the number of flags, and commits. Counts of flags
+        deleted in the meantime are dropped.
+
+        Rows are written in flag id order, so concurrent flushes of several
+        workers wait for each other rather than deadlock.
+
+        :return: The number of rows inserted or updated.
+        """
+        flag_ids = sorted(counts)
+        usage = (
+            func.unnest(
+                bindparam("flag_ids", flag_ids, type_=ARRAY(Integer)),
+                bindparam(
+                    "evaluations",
+                    [counts[flag_id] for flag_id in flag_ids],
+                    type_=ARRAY(BigInteger),
+                ),
+            )
+            .table_valued("flag_id", "evaluations")
+            .render_derived()
+        )
+        rows = (
+            select(
+                usage.c.flag_id, literal(at.date()), usage.c.evaluations, literal(at)
+            )
+            .join(FeatureFlag, FeatureFlag.id == usage.c.flag_id)
+            .order_by(usage.c.flag_id)
+        )
+        statement = pg_insert(self.model).from_select(
+            ["flag_id", "day", "evaluations", "last_evaluated_at"], rows
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.flag_id, self.model.day],
+            set_={
+                "evaluations": self.model.evaluations + statement.excluded.evaluations,
+                "last_evaluated_at": func.greatest(
+                    self.model.last_evaluated_at, statement.excluded.last_evaluated_at
+                ),
+            },
+        )
+        written = await self.db.scalar(
+            select(func.count()).select_from(
+                statement.returning(self.model.flag_id).cte("written")
+            )
+        )
+        await self.db.commit()
+        return written
+
+    @traced()
+    async def get_days(self, *, flag_id: int, since: date) -> list[Row]:
+        """The flag's daily counts from `since` on, oldest first."""
+        statement = (
+            select(self.model.day, self.model.evaluations, self.model.last_evaluated_at)
+            .where(self.model.flag_id == flag_id, self.model.day >= since)
+            .order_by(self.model.day)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_last_evaluated_at(self, *, flag_id: int) -> Optional[datetime]:
+        return await self.db.scalar(self._last_evaluated_at(flag_id))
+
+    @traced()
+    async def get_stale(self, *, before: datetime, limit: int) -> list[Row]:
+        """
+        The project's flags not evaluated since `before`, the ones never
+        evaluated first, then the longest unused.
+        """
+        flags = (
+            select(
+                FeatureFlag.id,
+                FeatureFlag.name,
+                FeatureFlag.is_enabled,
+                self._last_evaluated_at(FeatureFlag.id)
+                .scalar_subquery()
+                .label("last_evaluated_at"),
+            )
+            .where(FeatureFlag.project_id == project_context.get())
+            .subquery()
+        )
+        statement = (
+            select(flags)
+            .where(
+                or_(
+                    flags.c.last_evaluated_at.is_(None),
+                    flags.c.last_evaluated_at < before,
+                )
+            )
+            .order_by(flags.c.last_evaluated_at.asc().nulls_first(), flags.c.id)
+            .limit(limit)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @traced()
+    async def get_hot(self, *, since: date, limit: int) -> list[Row]:
+        """The project's most evaluated flags from `since` on, most first."""
+        evaluations = func.sum(self.model.evaluations)
+        statement = (
+            select(
+                FeatureFlag.id,
+                FeatureFlag.name,
+                evaluations.label("evaluations"),
+                func.max(self.model.last_evaluated_at).label("last_evaluated_at"),
+            )
+            .join(FeatureFlag, FeatureFlag.id == self.model.flag_id)
+            .where(
+                FeatureFlag.project_id == project_context.get(),
+                self.model.day >= since,
+            )
+            .group_by(FeatureFlag.id)
+            .order_by(evaluations.desc(), FeatureFlag.id)
+            .limit(limit)
+        )
+        return (await self.db.execute(statement)).all()
+
+    def _last_evaluated_at(self, flag_id) -> Select:
+        # The latest day's row, found through the primary key.
+        return (
+            select(self.model.last_evaluated_at)
+            .where(self.model.flag_id == flag_id)
+            .order_by(self.model.day.desc())
+            .limit(1)
+        )
@@ -0,0 +1,43 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class FlagUsageDay(BaseModel):
+    day: datetime.date
+    evaluations: int
+    last_evaluated_at: datetime.datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FlagUsage(BaseModel):
+    flag_id: int
+    # Evaluations in the requested days, which are listed if they had any.
+    evaluations: int
+    # The last evaluation ever recorded, also before the requested days.
+    last_evaluated_at: Optional[datetime.datetime] = None
+    days: list[FlagUsageDay]
+
+
+class StaleFlag(BaseModel):
+    id: int
+    name: str
+    is_enabled: bool
+    # None if the flag was never evaluated.
+    last_evaluated_at: Optional[datetime.datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class HotFlag(BaseModel):
+    id: int
+    name: str
+    evaluations: int
+    last_evaluated_at: datetime.datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from src.feature_flags.exceptions import FeatureFlagNotFoundException
+from src.feature_flags.repository import FeatureFlagRepository
+from src.infrastructure.tracing import traced
+from . import schemas
+from .counter import EvaluationCounter
+from .repository import FlagUsageRepository
+
+
+class FlagUsageService:
+    def __init__(
+        self,
+        repository: FlagUsageRepository,
+        flag_repository: FeatureFlagRepository,
+    ):
+        self.repository = repository
+        self.flag_repository = flag_repository
+
+    @traced()
+    async def flush(self, counter: EvaluationCounter) -> int:
+        """
+        Adds the evaluations the counter recorded since the last flush to
+        the usage table. If that fails, the counts are kept for the next.
+
+        :return: The number of usage rows written.
+        """
+        counts = counter.drain()
+        if not counts:
+            return 0
+        try:
+            written = await self.repository.add_counts(
+                counts=counts, at=datetime.utcnow()
+            )
+        except BaseException:
+            counter.restore(counts)
+            raise
+        counter.flushed_evaluations += counts.total()
+        return written
+
+    @traced()
+    async def get_usage(self, flag_id: int, days: int) -> schemas.FlagUsage:
+        """The flag's evaluations per day over the last `days` days (UTC)."""
+        if not await self.flag_repository.get(flag_id):
+            raise FeatureFlagNotFoundException()
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = await self.repository.get_days(flag_id=flag_id, since=since)
+        return schemas.FlagUsage(
+            flag_id=flag_id,
+            evaluations=sum(row.evaluations for row in rows),
+            last_evaluated_at=await self.repository.get_last_evaluated_at(
+                flag_id=flag_id
+            ),
+            days=[schemas.FlagUsageDay.model_validate(row) for row in rows],
+        )
+
+    @traced()
+    async def get_stale(self, days: int, limit: int) -> list[schemas.StaleFlag]:
+        """The flags not evaluated in the last `days` days."""
+        rows = await self.repository.get_stale(
+            before=datetime.utcnow() - timedelta(days=days), limit=limit
+        )
+        return [schemas.StaleFlag.model_validate(row) for row in rows]
+
+    @traced()
+    async def get_hot(self, days: int, limit: int) -> list[schemas.HotFlag]:
+        """The most evaluated flags over the last `days` days (UTC)."""
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = await self.repository.get_hot(since=since, limit=limit)
+        return [schemas.HotFlag.model_validate(row) for row in rows]
@@ -0,0 +1,7 @@
+from .model import IdempotencyKey
+from .repository import IdempotencyKeyRepository
+
+__all__ = [
+    "IdempotencyKey",
+    "IdempotencyKeyRepository",
+]
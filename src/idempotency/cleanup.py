@@ -0,0 +1,32 @@
+import asyncio
+import logging
+
+from src.infrastructure.database import Database
+from .model import IdempotencyKey
+from .repository import IdempotencyKeyRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_keys(db: Database, batch_size: int) -> int:
+    """Deletes all expired idempotency keys, `batch_size` rows at a time."""
+    async with db.session_scope():
+        repository = IdempotencyKeyRepository(
+            model=IdempotencyKey, db_session=db.get_session()
+        )
+        return await repository.purge_expired(batch_size=batch_size)
+
+
+async def purge_expired_keys_periodically(
+    db: Database, interval_s: float, batch_size: int
+) -> None:
+    """Runs `purge_expired_keys` every `interval_s` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            deleted = await purge_expired_keys(db, batch_size)
+        except Exception:
+            logger.exception("Purging expired idempotency keys failed.")
+            continue
+        if deleted:
+            logger.info("Purged %d expired idempotency keys.", deleted)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, LargeBinary, SmallInteger, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.infrastructure.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    The stored outcome of a write request sent with an `Idempotency-Key`.
+    A row without a status code belongs to a request still being executed.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # SHA-256 of the request, so a key reused for another request is detected.
+    fingerprint = Column(LargeBinary(32), nullable=False)
+    status_code = Column(SmallInteger, nullable=True)
+    headers = Column(JSONB, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.infrastructure.base_repository import BaseRepository
+from src.infrastructure.tracing import traced
+from .model import IdempotencyKey
+
+
+class IdempotencyKeyRepository(BaseRepository[IdempotencyKey, BaseModel, BaseModel]):
+    """
+    Stores idempotency keys. Each method commits on its own, so a claim is
+    visible to concurrent duplicates while the request is still executing.
+    """
+
+    @traced()
+    async def claim(self, *, key: str, fingerprint: bytes, lease: timedelta) -> bool:
+        """
+        Claims a key for a new execution, for `lease` at most, so that a key
+        whose worker died can be claimed again soon. An expired key that has
+        not been purged yet is claimed as if it were absent.
+
+        :return: False if the key is already taken.
+        """
+        table = self.model.__table__
+        statement = (
+            insert(table)
+            .values(key=key, fingerprint=fingerprint, expires_at=func.now() + lease)
+            .on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={
+                    "fingerprint": fingerprint,
+                    "status_code": None,
+                    "headers": None,
+                    "body": None,
+                    "created_at": func.now(),
+                    "expires_at": func.now() + lease,
+                },
+                where=table.c.expires_at < func.now(),
+            )
+            .returning(table.c.key)
+        )
+        claimed = (await self.db.execute(statement)).scalar_one_or_none()
+        await self.db.commit()
+        return claimed is not None
+
+    @traced()
+    async def get(self, _id: str) -> Optional[IdempotencyKey]:
+        statement = select(self.model).where(
+            self.model.key == _id, self.model.expires_at >= func.now()
+        )
+        result = await self.db.execute(
+            statement.execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @traced()
+    async def complete(
+        self,
+        *,
+        key: str,
+        status_code: int,
+        headers: dict[str, str],
+        body: bytes,
+        ttl: timedelta,
+    ) -> None:
+        """
+        Stores the response of a claimed key's execution, which is kept for
+        `ttl` from now on.
+        """
+        await self.db.execute(
+            update(self.model)
+            .where(self.model.key == key)
+            .values(
+                status_code=status_code,
+                headers=headers,
+                body=body,
+                expires_at=func.now() + ttl,
+            )
+        )
+        await self.db.commit()
+
+    @traced()
+    async def release(self, *, key: str) -> None:
+        """Gives up a claimed key whose execution failed, so it can be retried."""
+        await self.db.execute(
+            delete(self.model).where(
+                self.model.key == key, self.model.status_code.is_(None)
+            )
+        )
+        await self.db.commit()
+
+    @traced()
+    async def purge_expired(self, *, batch_size: int) -> int:
+        """
+        Deletes expired keys in batches of `batch_size`, each batch in its own
+        short transaction so the purge never holds many row locks at once.
+
+        :return: The number of deleted keys.
+        """
+        deleted = 0
+        while True:
+            batch = (
+                select(self.model.key)
+                .where(self.model.expires_at < func.now())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self.db.execute(
+                delete(self.model).where(self.model.key.in_(batch.scalar_subquery()))
+            )
+            await self.db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
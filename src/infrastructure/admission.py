@@ -0,0 +1,198 @@
+import asyncio
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, budget: str, retry_after: float):
+        self.budget = budget
+        self.retry_after = retry_after
+        super().__init__(f"Admission to '{budget}' rejected.")
+
+
+class AdmissionBudget:
+    """
+    Limits how many requests of one class run at a time, with a bounded
+    FIFO queue for the rest.
+
+    A request is rejected right away when the queue is full, or when the
+    wait estimated from recent service times already exceeds the queue
+    timeout; otherwise it is rejected once it has waited that long.
+    """
+
+    # Weight of the latest service time in the moving average.
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout_ms: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.active = 0
+        self.service_time = 0.0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def estimated_wait(self) -> float:
+        """Seconds until a request arriving now would start running."""
+        return (len(self._waiters) + 1) * self.service_time / self.limit
+
+    def _reject(self) -> AdmissionRejected:
+        self.rejected += 1
+        retry_after = max(self.estimated_wait(), 1.0)
+        return AdmissionRejected(self.name, retry_after)
+
+    async def acquire(self) -> None:
+        """
+        Waits for a slot.
+
+        :raises AdmissionRejected: If the request should be shed instead.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject()
+        if self.estimated_wait() > self.queue_timeout:
+            raise self._reject()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(future)
+            raise self._reject()
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self.release()
+            else:
+                self._discard(future)
+            raise
+        self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Frees a slot, handing it straight to the next waiter if there is one."""
+        if service_time is not None:
+            self.service_time += self.EWMA_ALPHA * (service_time - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, future: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_length": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_time_ms": round(self.service_time * 1000, 3),
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Runs every request under the budget `classify` picks for it, answering
+    `503` with `Retry-After` when the budget sheds the request. Requests
+    classified as None are not limited.
+
+    It is a plain ASGI middleware placed outside the session and idempotency
+    middlewares, so a shed request never touches the database.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budgets: dict[str, AdmissionBudget],
+        classify: Callable[[Scope], Optional[str]],
+    ):
+        self.app = app
+        self.budgets = budgets
+        self.classify = classify
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        budget_name = self.classify(scope) if scope["type"] == "http" else None
+        if budget_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budgets[budget_name]
+        try:
+            await budget.acquire()
+        except AdmissionRejected as exc:
+            await self._send_rejection(send, exc)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release(service_time=time.perf_counter() - started)
+
+    @staticmethod
+    async def _send_rejection(send: Send, exc: AdmissionRejected) -> None:
+        body = b'{"detail":"The service is overloaded, retry later."}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(exc.retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def classify_by_method(
+    exempt_paths: tuple[str, ...] = ("/", "/ready", "/metrics"),
+    dedicated_paths: Optional[dict[str, str]] = None,
+    read_paths: Optional[str] = None,
+) -> Callable[[Scope], Optional[str]]:
+    """
+    Puts reads (`GET`, `HEAD`) in the `reads` budget and everything else,
+    i.e. the graph writes, in the `writes` budget.
+
+    :param dedicated_paths: Budgets of paths that get their own, such as
+        long-running exports that would skew the service time of reads.
+    :param read_paths: A regular expression matching whole paths that only
+        read whatever their method, such as evaluations sent as `POST`.
+    """
+    dedicated_paths = dedicated_paths or {}
+    read_pattern = re.compile(read_paths) if read_paths else None
+
+    def classify(scope: Scope) -> Optional[str]:
+        if scope["path"] in exempt_paths or scope["method"] == "OPTIONS":
+            return None
+        if scope["path"] in dedicated_paths:
+            return dedicated_paths[scope["path"]]
+        if scope["method"] in ("GET", "HEAD") or (
+            read_pattern and read_pattern.fullmatch(scope["path"])
+        ):
+            return "reads"
+        return "writes"
+
+    return classify
@@ -1,10 +1,13 @@
 from typing import Any, Generic, Type, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+from sqlalchemy.orm import selectinload
 
+from src.infrastructure.batch_loader import BatchLoader
 from src.infrastructure.database import Base
+from src.infrastructure.tracing import traced
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -19,6 +22,10 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     The session is passed to each method, ensuring a request-scoped session.
     """
 
+    # Relationships that `load` and `load_many` return loaded, so that
+    # callers can use them without lazy loading.
+    loaded_relationships: tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType], db_session: AsyncSession):
         """
         Initializes the repository with a model and a database session.
@@ -28,7 +35,12 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
         self.db = db_session
+        self._loader: BatchLoader[Any, ModelType] = BatchLoader(self._load_batch)
+        self._loaded_attributes = {
+            attribute.key for attribute in inspect(model).column_attrs
+        } | set(self.loaded_relationships)
 
+    @traced()
     async def get(self, _id: Any) -> ModelType | None:
         """
         Get a single record by its primary key.
@@ -40,6 +52,60 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
+    async def load(self, _id: Any) -> ModelType | None:
+        """
+        Gets a single record by its primary key, like `get`, but returns it
+        without a query if the session has already loaded it. Otherwise the
+        lookups of concurrent callers are batched into one `IN` query.
+
+        :param _id: The primary key of the record.
+        :return: The model instance or None if not found.
+        """
+        return (await self.load_many(ids=[_id]))[0]
+
+    async def load_many(self, *, ids: list[Any]) -> list[ModelType | None]:
+        """
+        Gets several records by their primary keys, like `load`, with at most
+        one query for all of them.
+
+        :param ids: The primary keys of the records.
+        :return: The model instances in the order of `ids`, None where a
+            record was not found.
+        """
+        instances = [self._get_loaded(_id) for _id in ids]
+        missing = [_id for _id, instance in zip(ids, instances) if instance is None]
+        if not missing:
+            return instances
+        found = iter(await self._loader.load_many(missing))
+        return [instance or next(found) for instance in instances]
+
+    def _get_loaded(self, _id: Any) -> ModelType | None:
+        """
+        Returns the session's instance of the record if it is fully loaded,
+        i.e. its columns and `loaded_relationships` are neither expired nor
+        deferred.
+        """
+        instance = self.db.identity_map.get(self.db.identity_key(self.model, _id))
+        if instance is None or inspect(instance).unloaded & self._loaded_attributes:
+            return None
+        return instance
+
+    @traced()
+    async def _load_batch(self, ids: list[Any]) -> dict[Any, ModelType]:
+        statement = (
+            select(self.model)
+            .where(self.model.id.in_(ids))
+            .options(
+                *(
+                    selectinload(getattr(self.model, relationship))
+                    for relationship in self.loaded_relationships
+                )
+            )
+        )
+        result = await self.db.execute(statement)
+        return {instance.id: instance for instance in result.scalars()}
+
+    @traced()
     async def get_all(self, *, skip: int = 0, limit: int = 100) -> list[ModelType]:
         """
         Get all records with pagination.
@@ -52,6 +118,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(statement)
         return result.scalars().all()
 
+    @traced()
     async def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Create a new record.
@@ -66,12 +133,17 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await self.db.refresh(db_obj)
         return db_obj
 
-    async def update(self, *, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
+    @traced()
+    async def update(
+        self, *, db_obj: ModelType, obj_in: UpdateSchemaType, commit: bool = True
+    ) -> ModelType:
         """
         Update an existing record.
 
         :param db_obj: The existing model instance to update.
         :param obj_in: The Pydantic schema with the update data.
+        :param commit: When False, the change is only flushed so that it can be
+            committed together with further changes via `commit()`.
         :return: The updated model instance.
         """
         update_data = obj_in.model_dump(exclude_unset=True)
@@ -80,10 +152,33 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             setattr(db_obj, field, value)
 
         self.db.add(db_obj)
+        if not commit:
+            await self.db.flush()
+            return db_obj
         await self.db.commit()
         await self.db.refresh(db_obj)
         return db_obj
 
+    async def commit(self) -> None:
+        """Commits the current transaction."""
+        await self.db.commit()
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """
+        Begins a SAVEPOINT. Used as `async with repository.savepoint():`, the
+        enclosed changes are rolled back alone if the block raises.
+        """
+        return self.db.begin_nested()
+
+    async def rollback(self) -> None:
+        """
+        Rolls back the current transaction and detaches every loaded instance,
+        so the next reads start from the committed database state.
+        """
+        await self.db.rollback()
+        self.db.expunge_all()
+
+    @traced()
     async def delete(self, *, id: Any) -> ModelType | None:
         """
         Delete a record by its primary key.
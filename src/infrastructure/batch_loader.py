@@ -0,0 +1,74 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class _Abandoned(Exception):
+    """Set on a batch whose caller was cancelled before it completed."""
+
+
+class BatchLoader(Generic[KeyType, ValueType]):
+    """
+    Batches lookups by key, in the style of DataLoader: the keys requested
+    by concurrent callers within the same event-loop iteration are fetched
+    with a single call of `batch_fn`, which returns the values found by key.
+
+    The batch runs in the task of the caller that opened it, after yielding
+    once so that the other ready tasks can add their keys. Batches run one
+    at a time, since they usually share a session. If the opening caller is
+    cancelled, the waiting callers open a new batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[KeyType]], Awaitable[dict[KeyType, ValueType]]],
+    ):
+        self._batch_fn = batch_fn
+        self._pending: Optional[dict[KeyType, asyncio.Future]] = None
+        self._lock = asyncio.Lock()
+
+    async def load(self, key: KeyType) -> Optional[ValueType]:
+        """Returns the value of `key`, or None if there is none."""
+        return (await self.load_many([key]))[0]
+
+    async def load_many(self, keys: list[KeyType]) -> list[Optional[ValueType]]:
+        """Returns the values of `keys` in order, with None for missing keys."""
+        loop = asyncio.get_running_loop()
+        while self._pending is not None:
+            batch = self._pending
+            futures = [
+                batch.get(key) or batch.setdefault(key, loop.create_future())
+                for key in keys
+            ]
+            try:
+                # Shielded, so a cancelled caller does not cancel the batch.
+                return list(await asyncio.shield(asyncio.gather(*futures)))
+            except _Abandoned:
+                continue
+
+        batch = self._pending = {key: loop.create_future() for key in keys}
+        try:
+            async with self._lock:
+                await asyncio.sleep(0)
+                self._pending = None
+                values = await self._batch_fn(list(batch))
+        except asyncio.CancelledError:
+            if self._pending is batch:
+                self._pending = None
+            self._settle(batch, exception=_Abandoned())
+            raise
+        except Exception as exc:
+            self._settle(batch, exception=exc)
+            raise
+        for key, future in batch.items():
+            future.set_result(values.get(key))
+        return [values.get(key) for key in keys]
+
+    @staticmethod
+    def _settle(batch: dict[KeyType, asyncio.Future], exception: BaseException) -> None:
+        for future in batch.values():
+            future.set_exception(exception)
+            # Marks the exception as retrieved, there may be no waiters.
+            future.exception()
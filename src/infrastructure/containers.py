@@ -1,16 +1,53 @@
 from dependency_injector import containers, providers
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.audit_logs.model import AuditLog
-from src.audit_logs.repository import AuditLogRepository
+from src.audit_logs.model import AuditLog, AuditLogHourlyRollup
+from src.audit_logs.repository import AuditLogRepository, AuditLogRollupRepository
+from src.audit_logs.serializers import AuditLogListSerializer
 from src.audit_logs.service import AuditLogService
+from src.checkpoints.model import FlagStateCheckpoint
+from src.checkpoints.repository import FlagStateCheckpointRepository
+from src.checkpoints.service import FlagStateService
+from src.environments.model import FlagEnvironmentState
+from src.environments.repository import FlagEnvironmentStateRepository
+from src.environments.service import EnvironmentFlagService
+from src.feature_flags.evaluation import EvaluatorCache
+from src.feature_flags.group_commit import ToggleGroupCommitter
 from src.feature_flags.model import FeatureFlag
 from src.feature_flags.repository import FeatureFlagRepository
-from src.feature_flags.service import FeatureFlagService
+from src.feature_flags.serializers import FeatureFlagListSerializer
+from src.feature_flags.service import FeatureFlagService, FlagEvaluationService
+from src.flag_usage.counter import EvaluationCounter
+from src.flag_usage.model import FlagUsageDay
+from src.flag_usage.repository import FlagUsageRepository
+from src.flag_usage.service import FlagUsageService
 from src.infrastructure.database import Database
+from src.infrastructure.serialization import FragmentCache
+from src.infrastructure.single_flight import SingleFlight
+from src.projects.model import Project
+from src.projects.repository import ProjectRepository
+from src.projects.service import ProjectService
+from src.schedules.model import ScheduledToggle
+from src.schedules.repository import ScheduledToggleRepository
+from src.schedules.scheduler import ToggleScheduler
+from src.schedules.service import ScheduledToggleService
 from src.common.settings import Settings
 
 
+def _toggle_committer(
+    database: Database, settings: Settings
+) -> ToggleGroupCommitter | None:
+    """Builds the toggle group committer, if enabled in the settings."""
+    if settings.toggle_group_commit_window_ms is None:
+        return None
+    return ToggleGroupCommitter(
+        database,
+        window_ms=settings.toggle_group_commit_window_ms,
+        max_batch=settings.toggle_group_commit_max_batch,
+        max_attempts=settings.optimistic_lock_attempts,
+    )
+
+
 class AppContainer(containers.DeclarativeContainer):
     """
     The central dependency injection container for the application.
@@ -24,24 +61,126 @@ class AppContainer(containers.DeclarativeContainer):
     database: providers.Singleton[Database] = providers.Singleton(
         Database,
         db_url=db_url_provider,
+        pool_size=settings.provided.db_pool_size,
+        max_overflow=settings.provided.db_max_overflow,
     )
     db_session: providers.Factory[AsyncSession] = providers.Factory(
         lambda db: db.get_session(),
         db=database,
     )
 
+    single_flight: providers.Singleton[SingleFlight] = providers.Singleton(
+        SingleFlight, enabled=settings.provided.single_flight_enabled
+    )
+    feature_flag_list_serializer = providers.Singleton(
+        FeatureFlagListSerializer,
+        cache=providers.Singleton(
+            FragmentCache, max_size=settings.provided.fragment_cache_size
+        ),
+    )
+    audit_log_list_serializer = providers.Singleton(
+        AuditLogListSerializer,
+        cache=providers.Singleton(
+            FragmentCache, max_size=settings.provided.fragment_cache_size
+        ),
+    )
+    flag_evaluators: providers.Singleton[EvaluatorCache] = providers.Singleton(
+        EvaluatorCache, max_size=settings.provided.evaluator_cache_size
+    )
+    flag_usage_counter: providers.Singleton[EvaluationCounter] = providers.Singleton(
+        EvaluationCounter, enabled=settings.provided.flag_usage_enabled
+    )
+    toggle_scheduler: providers.Singleton[ToggleScheduler] = providers.Singleton(
+        ToggleScheduler,
+        db=database,
+        max_attempts=settings.provided.optimistic_lock_attempts,
+        max_sleep_s=settings.provided.schedule_max_sleep_s,
+    )
+    toggle_committer: providers.Singleton[ToggleGroupCommitter | None] = (
+        providers.Singleton(_toggle_committer, database=database, settings=settings)
+    )
+
     audit_log_repo = providers.Factory(
         AuditLogRepository,
         model=AuditLog,
         db_session=db_session,
     )
+    audit_log_rollup_repo = providers.Factory(
+        AuditLogRollupRepository,
+        model=AuditLogHourlyRollup,
+        db_session=db_session,
+    )
     feature_flag_repo = providers.Factory(
         FeatureFlagRepository,
         model=FeatureFlag,
         db_session=db_session,
     )
+    environment_state_repo = providers.Factory(
+        FlagEnvironmentStateRepository,
+        model=FlagEnvironmentState,
+        db_session=db_session,
+    )
+    flag_usage_repo = providers.Factory(
+        FlagUsageRepository,
+        model=FlagUsageDay,
+        db_session=db_session,
+    )
+    project_repo = providers.Factory(
+        ProjectRepository,
+        model=Project,
+        db_session=db_session,
+    )
+    scheduled_toggle_repo = providers.Factory(
+        ScheduledToggleRepository,
+        model=ScheduledToggle,
+        db_session=db_session,
+    )
+    checkpoint_repo = providers.Factory(
+        FlagStateCheckpointRepository,
+        model=FlagStateCheckpoint,
+        db_session=db_session,
+    )
 
-    audit_log_service = providers.Factory(AuditLogService, repository=audit_log_repo)
+    audit_log_service = providers.Factory(
+        AuditLogService,
+        repository=audit_log_repo,
+        rollup_repository=audit_log_rollup_repo,
+    )
+    flag_state_service = providers.Factory(
+        FlagStateService,
+        checkpoint_repository=checkpoint_repo,
+        audit_log_repository=audit_log_repo,
+    )
     feature_flag_service = providers.Factory(
-        FeatureFlagService, repository=feature_flag_repo
+        FeatureFlagService,
+        repository=feature_flag_repo,
+        max_attempts=settings.provided.optimistic_lock_attempts,
+        toggle_committer=toggle_committer,
+    )
+    flag_evaluation_service = providers.Factory(
+        FlagEvaluationService,
+        repository=feature_flag_repo,
+        evaluators=flag_evaluators,
+    )
+    flag_usage_service = providers.Factory(
+        FlagUsageService,
+        repository=flag_usage_repo,
+        flag_repository=feature_flag_repo,
+    )
+    environment_flag_service = providers.Factory(
+        EnvironmentFlagService,
+        repository=environment_state_repo,
+        flag_repository=feature_flag_repo,
+        environments=settings.provided.environments,
+        max_attempts=settings.provided.optimistic_lock_attempts,
+    )
+    project_service = providers.Factory(
+        ProjectService,
+        repository=project_repo,
+    )
+    scheduled_toggle_service = providers.Factory(
+        ScheduledToggleService,
+        repository=scheduled_toggle_repo,
+        flag_repository=feature_flag_repo,
+        scheduler=toggle_scheduler,
     )
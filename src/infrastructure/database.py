@@ -1,8 +1,12 @@
 import asyncio
 import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    AsyncEngine,
     AsyncSession,
     async_scoped_session,
 )
@@ -12,6 +16,20 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 logger = logging.getLogger(__name__)
 Base = declarative_base()
 
+session_scope_context: ContextVar[object | None] = ContextVar(
+    "session_scope_context", default=None
+)
+
+
+def _current_scope() -> object:
+    """
+    Resolves the key of the current session scope.
+
+    Requests run inside an explicit scope, which is inherited by any task
+    spawned while handling them. Outside of a request the current task is used.
+    """
+    return session_scope_context.get() or asyncio.current_task()
+
 
 class Database:
     """
@@ -19,11 +37,13 @@ class Database:
     This class encapsulates the session lifecycle management.
     """
 
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, pool_size: int = 5, max_overflow: int = 10):
         """
         Initializes the async engine and the scoped session factory.
         """
-        self._engine = create_async_engine(db_url, echo=False)
+        self._engine = create_async_engine(
+            db_url, echo=False, pool_size=pool_size, max_overflow=max_overflow
+        )
         session_factory = sessionmaker(
             autocommit=False,
             autoflush=False,
@@ -31,15 +51,41 @@ class Database:
             class_=AsyncSession,
             expire_on_commit=False,
         )
+        self._unscoped_session_factory = session_factory
         self._session_factory = async_scoped_session(
             session_factory,
-            scopefunc=asyncio.current_task,
+            scopefunc=_current_scope,
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        """Returns the underlying async engine."""
+        return self._engine
+
     def get_session(self) -> AsyncSession:
         """Returns the session."""
         return self._session_factory()
 
+    def new_session(self) -> AsyncSession:
+        """
+        Returns a new session outside of any scope, for work that outlives
+        its request, such as a streamed response. The caller closes it.
+        """
+        return self._unscoped_session_factory()
+
     async def close_session(self):
         """Closes and removes the session."""
         await self._session_factory.remove()
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[None]:
+        """
+        Opens a session scope shared by every task started within it and
+        closes the scope's session on exit.
+        """
+        token = session_scope_context.set(object())
+        try:
+            yield
+        finally:
+            await self.close_session()
+            session_scope_context.reset(token)
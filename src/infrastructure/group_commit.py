@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Generic, Optional, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+class GroupCommitter(ABC, Generic[ItemType, ResultType]):
+    """
+    Collects items submitted concurrently within a short window and applies
+    them as one batch, typically in a single transaction and commit.
+
+    The window opens with the first pending item, and a batch is flushed
+    early once it reaches `max_batch` items. Each submitter awaits only its
+    own result: `apply` returns one result or exception per item, in order.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int = 100):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: list[tuple[ItemType, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+
+    @abstractmethod
+    async def apply(
+        self, items: list[ItemType]
+    ) -> list[Union[ResultType, BaseException]]:
+        """Applies a batch, returning a result or an exception for every item."""
+
+    async def submit(self, item: ItemType) -> ResultType:
+        """Queues an item for the next batch and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def close(self) -> None:
+        """Applies anything still pending and waits for running batches."""
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[ItemType, asyncio.Future]]) -> None:
+        try:
+            results = await self.apply([item for item, _ in batch])
+        except Exception as exc:
+            logger.exception("Group commit of %d items failed.", len(batch))
+            results = [exc] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # The submitter may have gone away, e.g. on a client disconnect.
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,159 @@
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """
+    A minimal sampling profiler.
+
+    A background thread periodically captures the stack of the thread that
+    started the sampler (the event loop thread) and counts identical stacks.
+    The result is written in the "folded stacks" format understood by
+    flamegraph.pl, speedscope and most other flamegraph viewers.
+
+    Note that the event loop interleaves concurrent requests, so samples may
+    include frames from other requests running at the same time.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._target_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @staticmethod
+    def _fold(frame: FrameType | None) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is not None:
+                self.samples[self._fold(frame)] += 1
+
+    def start(self) -> None:
+        self._target_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class SlowQueryLogger:
+    """
+    Logs every SQL statement slower than a threshold together with its
+    parameters and its query plan.
+
+    SELECT statements are explained with ``EXPLAIN (ANALYZE, BUFFERS)``, which
+    runs them a second time. Other statements, including CTEs that may modify
+    data, are only explained without ANALYZE so they are never executed twice.
+    """
+
+    _START_KEY = "slow_query_start"
+
+    def __init__(self, threshold_ms: float, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault(self._START_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = conn.info[self._START_KEY].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        plan = None
+        if self.explain and not executemany:
+            plan = self._explain(conn, statement, parameters)
+        logger.warning(
+            "Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n%s",
+            elapsed_ms,
+            statement,
+            parameters,
+            plan or "<not available>",
+        )
+
+    def _handle_error(self, context: ExceptionContext) -> None:
+        # A failed statement never reaches `after_cursor_execute`, so its
+        # start is dropped here rather than left on the pooled connection.
+        conn = context.connection
+        if conn is not None and conn.info.get(self._START_KEY):
+            conn.info[self._START_KEY].pop()
+
+    @staticmethod
+    def _explain(conn: Connection, statement: str, parameters: Any) -> str | None:
+        # A `WITH` may wrap data-modifying statements, so only a plain SELECT
+        # is analyzed. BUFFERS needs ANALYZE before Postgres 13.
+        is_select = statement.lstrip().upper().startswith("SELECT")
+        options = "(ANALYZE, BUFFERS) " if is_select else ""
+        # A raw DBAPI cursor keeps the EXPLAIN itself out of the engine events.
+        cursor = conn.connection.cursor()
+        try:
+            # In a savepoint, rolled back in any case, so a failing EXPLAIN
+            # leaves the caller's transaction usable.
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN {options}{statement}", parameters)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception:
+            logger.debug("Could not explain slow query.", exc_info=True)
+            return None
+        finally:
+            cursor.close()
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def detach(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
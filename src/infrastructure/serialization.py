@@ -0,0 +1,46 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from pydantic_core import to_json
+
+# pydantic's Rust JSON encoder, producing the same compact output as
+# `model_dump_json`, without building models first.
+encode_json: Callable[[Any], bytes] = to_json
+
+
+class FragmentCache:
+    """
+    A bounded LRU cache of encoded JSON fragments.
+
+    Callers key a fragment by everything it is encoded from, such as an id
+    plus a version, so a changed entity simply misses and the stale
+    fragment ages out.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._fragments: OrderedDict[Hashable, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_encode(self, key: Hashable, build: Callable[[], Any]) -> bytes:
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+        self.misses += 1
+        fragment = encode_json(build())
+        self._fragments[key] = fragment
+        if len(self._fragments) > self.max_size:
+            self._fragments.popitem(last=False)
+        return fragment
+
+    @staticmethod
+    def join(fragments: Iterable[bytes]) -> bytes:
+        """Combines fragments into a JSON array."""
+        return b"[" + b",".join(fragments) + b"]"
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._fragments), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+ResultType = TypeVar("ResultType")
+
+
+class _Abandoned(Exception):
+    """Set on a flight whose caller was cancelled before it completed."""
+
+
+@dataclass
+class FlightStats:
+    requests: int = 0
+    executions: int = 0
+
+    @property
+    def shared(self) -> int:
+        return self.requests - self.executions
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "shared": self.shared,
+            "coalescing_ratio": (
+                round(self.shared / self.requests, 4) if self.requests else 0.0
+            ),
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is in
+    flight, further calls for the same key wait for and share its result
+    (or exception) instead of running again.
+
+    Keys are tuples whose first element names the operation; statistics are
+    kept per operation. The flight runs in its first caller's task, so it
+    uses that caller's session. If that caller is cancelled, the waiting
+    callers start a new flight.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._stats: dict[str, FlightStats] = {}
+
+    async def do(
+        self, key: tuple[Hashable, ...], fn: Callable[[], Awaitable[ResultType]]
+    ) -> ResultType:
+        stats = self._stats.setdefault(str(key[0]), FlightStats())
+        stats.requests += 1
+        if not self.enabled:
+            stats.executions += 1
+            return await fn()
+
+        while key in self._flights:
+            try:
+                # Shielded, so a cancelled waiter does not cancel the flight.
+                return await asyncio.shield(self._flights[key])
+            except _Abandoned:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        stats.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._settle(future, exception=_Abandoned())
+            raise
+        except Exception as exc:
+            self._settle(future, exception=exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    @staticmethod
+    def _settle(future: asyncio.Future, exception: BaseException) -> None:
+        future.set_exception(exception)
+        # Marks the exception as retrieved, there may be no waiters.
+        future.exception()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+Warmer = Callable[[], Awaitable[None]]
+
+# Captured on first import, which src.app does before anything else.
+PROCESS_STARTED_AT = time.perf_counter()
+
+
+@dataclass
+class StartupTimeline:
+    """
+    Records when each startup phase was reached, measured from the moment
+    this module was first imported, and when the first fast request was served.
+    """
+
+    started_at: float = PROCESS_STARTED_AT
+    phases: dict[str, float] = field(default_factory=dict)
+    ready: bool = False
+    warmup_error: Optional[str] = None
+    time_to_first_fast_request: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self.started_at, 4)
+
+    def mark(self, phase: str, at: Optional[float] = None) -> None:
+        """Records a phase as reached now, or at the given `perf_counter` time."""
+        if at is None:
+            self.phases[phase] = self.elapsed()
+        else:
+            self.phases[phase] = round(at - self.started_at, 4)
+        logger.info(
+            "Startup phase '%s' reached after %.3fs.", phase, self.phases[phase]
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "phases": self.phases,
+            "warmup_error": self.warmup_error,
+            "time_to_first_fast_request": self.time_to_first_fast_request,
+        }
+
+
+async def warm_up_pool(engine: Any, connections: int) -> None:
+    """
+    Opens `connections` pool connections concurrently and returns them to the
+    pool, so the first requests do not pay for connection setup.
+    """
+    if connections <= 0:
+        return
+
+    async def open_connection(release: asyncio.Event) -> None:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+            await release.wait()
+
+    # Holding every connection until all are open forces the pool to create
+    # `connections` distinct connections instead of reusing the first one.
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(open_connection(release)) for _ in range(connections)]
+    try:
+        while engine.pool.checkedout() < connections and not any(
+            t.done() for t in tasks
+        ):
+            await asyncio.sleep(0.01)
+    finally:
+        release.set()
+        await asyncio.gather(*tasks)
+
+
+async def run_warm_up(
+    timeline: StartupTimeline,
+    engine: Any,
+    pool_connections: int,
+    warmers: list[Warmer],
+) -> None:
+    """
+    Runs every warm-up step and marks the timeline ready when all succeeded.
+    Failures are logged and reported through the timeline; the application
+    keeps serving, it just never reports ready.
+    """
+    try:
+        await warm_up_pool(engine, pool_connections)
+        timeline.mark("pool_warm")
+        for warmer in warmers:
+            await warmer()
+        timeline.mark("caches_warm")
+    except Exception as exc:
+        timeline.warmup_error = f"{type(exc).__name__}: {exc}"
+        logger.exception("Warm-up failed.")
+        return
+    timeline.ready = True
+    timeline.mark("ready")
+
+
+class FirstFastRequestMiddleware:
+    """
+    Records the time from startup until the first request that completes
+    under `threshold_ms`. It is a plain ASGI middleware so that, once the
+    number is recorded, it adds no more than an attribute check per request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        timeline: StartupTimeline,
+        threshold_ms: float,
+        exclude_paths: tuple[str, ...] = ("/", "/ready"),
+    ):
+        self.app = app
+        self.timeline = timeline
+        self.threshold = threshold_ms / 1000
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            self.timeline.time_to_first_fast_request is not None
+            or scope["type"] != "http"
+            or scope["path"] in self.exclude_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if status_code < 400 and time.perf_counter() - started <= self.threshold:
+            if self.timeline.time_to_first_fast_request is None:
+                self.timeline.time_to_first_fast_request = self.timeline.elapsed()
+                logger.info(
+                    "First fast request served %.3fs after startup.",
+                    self.timeline.time_to_first_fast_request,
+                )
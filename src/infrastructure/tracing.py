@@ -0,0 +1,358 @@
+import inspect
+import json
+import logging
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.common.context import action_context, actor_context, trace_context
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds.
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes.
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    # True for the first span of a trace in this process; ending it exports
+    # the whole trace.
+    is_local_root: bool = False
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C trace context header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @staticmethod
+    def _otlp_value(value: Any) -> dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Serializes the span in the OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": self._otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": (
+                {"code": STATUS_ERROR, "message": self.error}
+                if self.error
+                else {"code": STATUS_OK}
+            ),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class FileSpanExporter:
+    """
+    Appends finished traces to a file, one OTLP/JSON `ExportTraceServiceRequest`
+    per line, the same format the OpenTelemetry collector's file exporter
+    writes and its file receiver reads.
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload, default=str)
+        with self._lock, self.path.open("a") as f:
+            f.write(line + "\n")
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str]]:
+    """Extracts (trace_id, parent_span_id) from a W3C `traceparent` header."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Tracer:
+    """
+    A lightweight tracer producing nested spans.
+
+    The current span lives in `trace_context`, next to `actor_context` and
+    `action_context`, so it follows requests across awaits, child tasks and
+    SQLAlchemy's greenlets. Every span records the actor and audit action
+    active when it started. While no exporter is configured, all
+    instrumentation is a no-op.
+    """
+
+    _DB_SPAN_KEY = "tracing_spans"
+    _FLUSH_SPAN_KEY = "tracing_flush_span"
+
+    def __init__(self):
+        self.exporter: Optional[FileSpanExporter] = None
+        self._pending: dict[str, list[Span]] = {}
+        self._engines: list[Engine] = []
+        self._sessions_instrumented = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: FileSpanExporter) -> None:
+        self.exporter = exporter
+
+    def shutdown(self) -> None:
+        """Removes all instrumentation and drops unfinished traces."""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+            event.remove(engine, "handle_error", self._handle_error)
+        self._engines.clear()
+        if self._sessions_instrumented:
+            event.remove(Session, "before_flush", self._before_flush)
+            event.remove(Session, "after_flush_postexec", self._after_flush)
+            self._sessions_instrumented = False
+        self._pending.clear()
+        self.exporter = None
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        remote_parent: Optional[tuple[str, str]] = None,
+    ) -> Span:
+        """
+        Starts a span as a child of the current span without making it current.
+
+        :param remote_parent: (trace_id, span_id) received from a caller, used
+            when there is no current span.
+        """
+        parent = trace_context.get()
+        if parent is not None:
+            trace_id, parent_span_id = parent.trace_id, parent.span_id
+        elif remote_parent is not None:
+            trace_id, parent_span_id = remote_parent
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+
+        action: Optional[Enum] = action_context.get(None)
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent_span_id,
+            kind=kind,
+            is_local_root=parent is None,
+            attributes={
+                "enduser.id": actor_context.get(),
+                "audit.action": action.value if action else None,
+                **(attributes or {}),
+            },
+        )
+        self._pending.setdefault(trace_id, []).append(span)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        if span.is_local_root:
+            spans = self._pending.pop(span.trace_id, [])
+            if self.exporter and spans:
+                try:
+                    self.exporter.export(spans)
+                except OSError:
+                    logger.exception("Failed to export trace %s.", span.trace_id)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        remote_parent: Optional[tuple[str, str]] = None,
+    ) -> Iterator[Optional[Span]]:
+        """Runs the enclosed block in a new current span, or yields None when disabled."""
+        if not self.enabled:
+            yield None
+            return
+
+        span = self.start_span(
+            name, kind=kind, attributes=attributes, remote_parent=remote_parent
+        )
+        token = trace_context.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end_span(span, error=exc)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            trace_context.reset(token)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        A decorator wrapping a sync or async function in a span named after
+        its qualified name.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """Records a client span for every SQL statement sent through `engine`."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+        self._engines.append(engine)
+
+    def instrument_sessions(self) -> None:
+        """Records a span for every ORM flush, which includes the audit inserts."""
+        if self._sessions_instrumented:
+            return
+        event.listen(Session, "before_flush", self._before_flush)
+        event.listen(Session, "after_flush_postexec", self._after_flush)
+        self._sessions_instrumented = True
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        span = self.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            kind=SPAN_KIND_CLIENT,
+            attributes={
+                "db.system": "postgresql",
+                "db.statement": statement,
+                "db.executemany": executemany,
+            },
+        )
+        conn.info.setdefault(self._DB_SPAN_KEY, []).append(span)
+
+    def _after_cursor_execute(self, conn: Connection, *args: Any) -> None:
+        spans = conn.info.get(self._DB_SPAN_KEY)
+        if spans:
+            self.end_span(spans.pop())
+
+    def _handle_error(self, exception_context: Any) -> None:
+        conn = exception_context.connection
+        spans = conn.info.get(self._DB_SPAN_KEY) if conn is not None else None
+        if spans:
+            self.end_span(spans.pop(), error=exception_context.original_exception)
+
+    def _before_flush(self, session: Session, *args: Any) -> None:
+        span = self.start_span(
+            "Session.flush",
+            attributes={
+                "db.flush.new": len(session.new),
+                "db.flush.dirty": len(session.dirty),
+                "db.flush.deleted": len(session.deleted),
+            },
+        )
+        # The flush span is made current so statements and audit listeners
+        # running inside the flush nest under it.
+        session.info[self._FLUSH_SPAN_KEY] = (span, trace_context.set(span))
+
+    def _after_flush(self, session: Session, *args: Any) -> None:
+        span_and_token = session.info.pop(self._FLUSH_SPAN_KEY, None)
+        if span_and_token is not None:
+            span, token = span_and_token
+            trace_context.reset(token)
+            self.end_span(span)
+
+
+tracer = Tracer()
+traced = tracer.traced
@@ -17,8 +17,7 @@ class DBSessionMiddleware(BaseHTTPMiddleware):
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
     ) -> Response:
-        try:
-            response = await call_next(request)
-        finally:
-            await self.db_manager.close_session()
-        return response
+        # The endpoint runs in a child task of this one, so the session is
+        # keyed by an explicit scope rather than by the current task.
+        async with self.db_manager.session_scope():
+            return await call_next(request)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from src.idempotency.model import IdempotencyKey
+from src.idempotency.repository import IdempotencyKeyRepository
+from src.infrastructure.database import Database
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+
+# Response headers worth replaying; the rest are recomputed by the server.
+STORED_HEADERS = ("content-type", "etag", "location")
+
+# How much longer than duplicates wait a claim is held for a running request.
+CLAIM_LEASE_MARGIN_S = 30.0
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Makes write requests carrying an `Idempotency-Key` header safe to retry.
+
+    The first request with a key claims it and runs normally, and its
+    response is stored for `ttl_s` seconds. Later requests with the key are
+    answered from the stored response without running any service logic.
+    Duplicates arriving while the first request is still running wait for
+    its response. Server errors are not stored, so the request can be retried.
+
+    A running request holds its key for a short lease only, so the key of a
+    worker that died mid-request can be claimed again once the lease runs
+    out rather than after `ttl_s`.
+    """
+
+    def __init__(
+        self,
+        app,
+        db_manager: Database,
+        ttl_s: float,
+        wait_timeout_s: float,
+        poll_interval_ms: float = 50.0,
+        methods: tuple[str, ...] = ("POST", "PATCH"),
+    ):
+        super().__init__(app)
+        self.db_manager = db_manager
+        self.ttl = timedelta(seconds=ttl_s)
+        self.wait_timeout = wait_timeout_s
+        self.lease = timedelta(seconds=wait_timeout_s + CLAIM_LEASE_MARGIN_S)
+        self.poll_interval = poll_interval_ms / 1000
+        self.methods = methods
+
+    async def _fingerprint(self, request: Request) -> bytes:
+        digest = hashlib.sha256()
+        for part in (
+            request.method,
+            request.url.path,
+            request.url.query,
+            request.headers.get("X-Actor", ""),
+            request.headers.get("X-Project-Id", ""),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(await request.body())
+        return digest.digest()
+
+    async def _with_repository(self, operation):
+        async with self.db_manager.session_scope():
+            return await operation(
+                IdempotencyKeyRepository(
+                    model=IdempotencyKey, db_session=self.db_manager.get_session()
+                )
+            )
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None or request.method not in self.methods:
+            return await call_next(request)
+        if not 0 < len(key) <= 255:
+            return JSONResponse(
+                status_code=400, content={"detail": "Invalid Idempotency-Key header."}
+            )
+
+        fingerprint = await self._fingerprint(request)
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if await self._with_repository(
+                lambda repo: repo.claim(
+                    key=key, fingerprint=fingerprint, lease=self.lease
+                )
+            ):
+                return await self._execute(key, request, call_next)
+
+            record = await self._with_repository(lambda repo: repo.get(key))
+            if record is None:
+                # The first execution failed and released the key.
+                continue
+            if record.fingerprint != fingerprint:
+                return JSONResponse(
+                    status_code=422,
+                    content={
+                        "detail": "Idempotency-Key was already used for another request."
+                    },
+                )
+            if record.status_code is not None:
+                return self._replay(record)
+            if time.monotonic() >= deadline:
+                return JSONResponse(
+                    status_code=409,
+                    content={
+                        "detail": "A request with this Idempotency-Key is in progress."
+                    },
+                )
+            await asyncio.sleep(self.poll_interval)
+
+    async def _execute(
+        self, key: str, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        try:
+            response = await call_next(request)
+        except BaseException:
+            # Shielded, since a client disconnect cancels the surrounding
+            # scope and the key would stay claimed.
+            with anyio.CancelScope(shield=True):
+                await self._with_repository(lambda repo: repo.release(key=key))
+            raise
+
+        if response.status_code >= 500:
+            await self._with_repository(lambda repo: repo.release(key=key))
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name in STORED_HEADERS
+        }
+        await self._with_repository(
+            lambda repo: repo.complete(
+                key=key,
+                status_code=response.status_code,
+                headers=headers,
+                body=body,
+                ttl=self.ttl,
+            )
+        )
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            media_type=response.media_type,
+        )
+
+    @staticmethod
+    def _replay(record: IdempotencyKey) -> Response:
+        return Response(
+            content=record.body,
+            status_code=record.status_code,
+            headers={**record.headers, IDEMPOTENT_REPLAY_HEADER: "true"},
+        )
@@ -0,0 +1,66 @@
+import random
+import re
+import secrets
+import time
+from pathlib import Path
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from src.infrastructure.profiling import StackSampler
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Runs selected requests under a sampling profiler and writes a folded
+    stack file (flamegraph input) per profiled request.
+
+    A request is profiled when it carries the privileged `X-Profile` header
+    with the configured token, or when it is picked by the sampling rate.
+    """
+
+    def __init__(
+        self,
+        app,
+        output_dir: str,
+        header_token: str | None = None,
+        sample_rate: float = 0.0,
+        interval_ms: float = 1.0,
+    ):
+        super().__init__(app)
+        self.output_dir = Path(output_dir)
+        self.header_token = header_token
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    def _should_profile(self, request: Request) -> bool:
+        token = request.headers.get(PROFILE_HEADER)
+        if token and self.header_token:
+            return secrets.compare_digest(token, self.header_token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _profile_path(self, request: Request) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{slug}"
+        return self.output_dir / f"{name}-{secrets.token_hex(4)}.folded"
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if not self._should_profile(request):
+            return await call_next(request)
+
+        sampler = StackSampler(interval=self.interval)
+        sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+
+        path = self._profile_path(request)
+        sampler.write_folded(path)
+        response.headers[PROFILE_FILE_HEADER] = path.name
+        return response
@@ -0,0 +1,41 @@
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from src.infrastructure.tracing import SPAN_KIND_SERVER, Tracer, parse_traceparent
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """
+    Opens the root server span of every request.
+
+    An incoming W3C `traceparent` header continues the caller's trace, and the
+    response carries a `traceparent` header pointing at the request span.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        super().__init__(app)
+        self.tracer = tracer
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        with self.tracer.span(
+            f"{request.method} {request.url.path}",
+            kind=SPAN_KIND_SERVER,
+            attributes={
+                "http.request.method": request.method,
+                "url.path": request.url.path,
+            },
+            remote_parent=parse_traceparent(request.headers.get(TRACEPARENT_HEADER)),
+        ) as span:
+            response = await call_next(request)
+            if span is not None:
+                route = request.scope.get("route")
+                if route is not None:
+                    span.name = f"{request.method} {route.path}"
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.response.status_code", response.status_code)
+                response.headers[TRACEPARENT_HEADER] = span.traceparent
+            return response
@@ -0,0 +1,9 @@
+from .model import Project
+from .repository import ProjectRepository
+from .service import ProjectService
+
+__all__ = [
+    "Project",
+    "ProjectRepository",
+    "ProjectService",
+]
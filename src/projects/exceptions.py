@@ -0,0 +1,15 @@
+from src.common.exceptions import ConflictException, NotFoundException
+
+
+class ProjectException(Exception):
+    pass
+
+
+class ProjectNotFoundException(NotFoundException, ProjectException):
+    def __init__(self, message: str = "Project not found."):
+        super().__init__(message=message)
+
+
+class ProjectConflictException(ConflictException, ProjectException):
+    def __init__(self, message: str = "Project conflict."):
+        super().__init__(message=message)
@@ -0,0 +1,36 @@
+from sqlalchemy import DDL, Boolean, Column, DateTime, Integer, String, event, func
+
+from src.common.context import DEFAULT_PROJECT_ID
+from src.infrastructure.database import Base
+
+
+class Project(Base):
+    """
+    A tenant of the service. Flags, their dependencies, environment states
+    and audit entries all belong to one project, and are only visible
+    within it.
+    """
+
+    __tablename__ = "projects"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    # Whether the project's audit entries have a partition of their own.
+    has_partition = Column(Boolean, default=False, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# The default project exists in every database, also when created without
+# the migrations, as the tests do.
+event.listen(
+    Project.__table__,
+    "after_create",
+    DDL(
+        f"INSERT INTO projects (id, name, has_partition) "
+        f"VALUES ({DEFAULT_PROJECT_ID}, 'default', false); "
+        f"SELECT setval(pg_get_serial_sequence('projects', 'id'), "
+        f"{DEFAULT_PROJECT_ID})"
+    ),
+)
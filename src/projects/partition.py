@@ -0,0 +1,49 @@
+"""
+Gives a large project an audit log partition of its own, see
+`ProjectService.create_audit_partition`. A maintenance step rather than an
+endpoint, since it rewrites every audit entry of the project:
+
+    python -m src.projects.partition 42 --batch-size 5000
+"""
+
+import argparse
+import asyncio
+
+from src.common.settings import Settings
+from src.infrastructure.database import Database
+from .model import Project
+from .repository import ProjectRepository
+from .service import ProjectService
+
+
+async def create_audit_partition(db: Database, project_id: int, batch_size: int) -> int:
+    """Runs `ProjectService.create_audit_partition` in a session of its own."""
+    async with db.session_scope():
+        service = ProjectService(
+            repository=ProjectRepository(model=Project, db_session=db.get_session())
+        )
+        return await service.create_audit_partition(project_id, batch_size)
+
+
+async def _run(project_id: int, batch_size: int) -> int:
+    db = Database(str(Settings().postgres_dsn))
+    try:
+        return await create_audit_partition(db, project_id, batch_size)
+    finally:
+        await db.engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move a project's audit entries into a partition of its own."
+    )
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    args = parser.parse_args()
+
+    moved = asyncio.run(_run(args.project_id, args.batch_size))
+    print(f"Moved {moved} audit entries of project {args.project_id}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select, text
+
+from src.audit_logs.model import SHARED_AUDIT_PARTITION, AuditLog
+from src.infrastructure.base_repository import BaseRepository
+from src.infrastructure.tracing import traced
+from .model import Project
+from .schemas import ProjectCreate
+
+
+def audit_partition_name(project_id: int) -> str:
+    return f"audit_logs_p{project_id}"
+
+
+class ProjectRepository(BaseRepository[Project, ProjectCreate, BaseModel]):
+    @traced()
+    async def get_by_name(self, *, name: str) -> Optional[Project]:
+        statement = select(self.model).where(self.model.name == name)
+        return (await self.db.execute(statement)).scalar_one_or_none()
+
+    @traced()
+    async def get_all(self, *, skip: int = 0, limit: int = 100) -> list[Project]:
+        statement = select(self.model).order_by(self.model.id).offset(skip).limit(limit)
+        return (await self.db.execute(statement)).scalars().all()
+
+    @traced()
+    async def get_for_update(self, project_id: int) -> Optional[Project]:
+        """
+        Retrieves a project and locks its row until the transaction ends,
+        which serializes the steps of moving it into its own audit partition.
+        Flags can still be created in the project meanwhile.
+        """
+        statement = (
+            select(self.model)
+            .where(self.model.id == project_id)
+            .with_for_update(key_share=True)
+            .execution_options(populate_existing=True)
+        )
+        return (await self.db.execute(statement)).scalar_one_or_none()
+
+    @traced()
+    async def create_audit_partition_table(self, *, project: Project) -> None:
+        """
+        Creates the project's audit partition as a standalone table, unless
+        an interrupted earlier run has created it already.
+        """
+        partition = audit_partition_name(project.id)
+        exists = await self.db.scalar(
+            text("SELECT to_regclass(:partition) IS NOT NULL"),
+            {"partition": partition},
+        )
+        if not exists:
+            await self.db.execute(
+                text(
+                    f"CREATE TABLE {partition} "
+                    f"(LIKE {AuditLog.__table__.name} INCLUDING DEFAULTS)"
+                )
+            )
+
+    @traced()
+    async def move_audit_entries(
+        self, *, project: Project, limit: Optional[int] = None
+    ) -> int:
+        """
+        Moves up to `limit` of the project's entries, all without a limit, out
+        of the shared partition into the project's standalone partition.
+
+        :return: The number of entries moved.
+        """
+        partition = audit_partition_name(project.id)
+        columns = ", ".join(column.name for column in AuditLog.__table__.columns)
+        parameters = {"project_id": project.id}
+        batch = (
+            f"SELECT id FROM {SHARED_AUDIT_PARTITION} WHERE project_id = :project_id"
+        )
+        if limit is not None:
+            batch += " LIMIT :limit"
+            parameters["limit"] = limit
+        return await self.db.scalar(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {SHARED_AUDIT_PARTITION} "
+                f"WHERE project_id = :project_id AND id IN ({batch}) "
+                f"RETURNING {columns}"
+                f"), inserted AS ("
+                f"INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved "
+                f"RETURNING 1"
+                f") SELECT count(*) FROM inserted"
+            ),
+            parameters,
+        )
+
+    @traced()
+    async def attach_audit_partition(self, *, project: Project) -> int:
+        """
+        Moves the project's remaining entries into its partition, attaches the
+        partition and marks the project, without committing.
+
+        The shared partition is locked meanwhile, so audit writes of the
+        projects in it wait, and attaching scans it once to check that no
+        entries of the project are left in it.
+
+        :return: The number of entries moved.
+        """
+        await self.db.execute(
+            text(f"LOCK TABLE {SHARED_AUDIT_PARTITION} IN ACCESS EXCLUSIVE MODE")
+        )
+        moved = await self.move_audit_entries(project=project)
+        await self.db.execute(
+            text(
+                f"ALTER TABLE {AuditLog.__table__.name} "
+                f"ATTACH PARTITION {audit_partition_name(project.id)} "
+                f"FOR VALUES IN ({int(project.id)})"
+            )
+        )
+        project.has_partition = True
+        return moved
@@ -0,0 +1,35 @@
+from dependency_injector.wiring import inject, Provide
+from fastapi import APIRouter, Depends, Query, status
+
+from src.common.dependencies import set_actor_from_header
+from src.infrastructure.containers import AppContainer
+from . import schemas
+from .service import ProjectService
+
+router = APIRouter(prefix="/projects", tags=["Projects"])
+
+
+@router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
+@inject
+async def create_project(
+    payload: schemas.ProjectCreate,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: ProjectService = Depends(Provide[AppContainer.project_service]),
+):
+    """
+    Create a new project. Its flags are used by sending its id in the
+    `X-Project-Id` header.
+    """
+    return await service.create(obj_in=payload)
+
+
+@router.get("/", response_model=list[schemas.Project])
+@inject
+async def get_projects(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    _actor_context: None = Depends(set_actor_from_header),
+    service: ProjectService = Depends(Provide[AppContainer.project_service]),
+):
+    """Retrieve all projects with pagination."""
+    return await service.get_all(skip=skip, limit=limit)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class ProjectCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
+
+
+class Project(BaseModel):
+    id: int
+    name: str
+    has_partition: bool
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,67 @@
+from src.infrastructure.tracing import traced
+from . import model, schemas
+from .exceptions import ProjectConflictException, ProjectNotFoundException
+from .repository import ProjectRepository
+
+
+class ProjectService:
+    def __init__(self, repository: ProjectRepository):
+        self.repository = repository
+
+    @traced()
+    async def create(self, *, obj_in: schemas.ProjectCreate) -> model.Project:
+        """Creates a new project with a unique name."""
+        if await self.repository.get_by_name(name=obj_in.name):
+            raise ProjectConflictException(
+                f"Project with name '{obj_in.name}' already exists."
+            )
+        return await self.repository.create(obj_in=obj_in)
+
+    @traced()
+    async def get_all(self, *, skip: int, limit: int) -> list[model.Project]:
+        """Retrieves a page of projects, in id order."""
+        return await self.repository.get_all(skip=skip, limit=limit)
+
+    @traced()
+    async def _lock_unpartitioned(self, project_id: int) -> model.Project:
+        project = await self.repository.get_for_update(project_id)
+        if not project:
+            raise ProjectNotFoundException()
+        if project.has_partition:
+            raise ProjectConflictException(
+                f"Project '{project.name}' already has an audit partition."
+            )
+        return project
+
+    @traced()
+    async def create_audit_partition(self, project_id: int, batch_size: int) -> int:
+        """
+        Moves a project's audit entries into a partition of their own, for
+        large projects. Each project gets at most one.
+
+        The entries are moved in batches of `batch_size`, each committed on
+        its own, so the other projects' audit writes only wait for the last
+        step: moving the entries written meanwhile and attaching. Until then
+        the project's history misses the entries moved so far. Each step
+        locks the project, so concurrent runs take turns, and an interrupted
+        run is resumed by running it again.
+
+        :return: The number of entries moved.
+        """
+        project = await self._lock_unpartitioned(project_id)
+        await self.repository.create_audit_partition_table(project=project)
+        await self.repository.commit()
+        moved = 0
+        while True:
+            project = await self._lock_unpartitioned(project_id)
+            batch = await self.repository.move_audit_entries(
+                project=project, limit=batch_size
+            )
+            await self.repository.commit()
+            moved += batch
+            if batch < batch_size:
+                break
+        project = await self._lock_unpartitioned(project_id)
+        moved += await self.repository.attach_audit_partition(project=project)
+        await self.repository.commit()
+        return moved
@@ -0,0 +1,11 @@
+from .model import ScheduledToggle
+from .repository import ScheduledToggleRepository
+from .scheduler import ToggleScheduler
+from .service import ScheduledToggleService
+
+__all__ = [
+    "ScheduledToggle",
+    "ScheduledToggleRepository",
+    "ScheduledToggleService",
+    "ToggleScheduler",
+]
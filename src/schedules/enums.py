@@ -0,0 +1,9 @@
+import enum
+
+
+class ScheduleStatus(str, enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    # The toggle was rejected, e.g. for missing dependencies.
+    FAILED = "failed"
+    CANCELLED = "cancelled"
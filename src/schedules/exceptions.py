@@ -0,0 +1,15 @@
+from src.common.exceptions import ConflictException, NotFoundException
+
+
+class ScheduledToggleException(Exception):
+    pass
+
+
+class ScheduledToggleNotFoundException(NotFoundException, ScheduledToggleException):
+    def __init__(self, message: str = "Scheduled toggle not found."):
+        super().__init__(message=message)
+
+
+class ScheduledToggleConflictException(ConflictException, ScheduledToggleException):
+    def __init__(self, message: str = "Scheduled toggle conflict."):
+        super().__init__(message=message)
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    text,
+)
+
+from src.infrastructure.database import Base
+from .enums import ScheduleStatus
+
+
+class ScheduledToggle(Base):
+    """
+    A toggle of a flag's state to run at a given time, as the actor who
+    scheduled it. `ToggleScheduler` runs it through the regular toggle, so
+    the dependency rules and the audit log apply as for a manual toggle.
+    """
+
+    __tablename__ = "scheduled_toggles"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    flag_id = Column(Integer, nullable=False)
+    is_enabled = Column(Boolean, nullable=False)
+    # Naive UTC, like the audit log timestamps.
+    due_at = Column(DateTime, nullable=False)
+    actor = Column(String, nullable=False)
+    status = Column(
+        String,
+        nullable=False,
+        default=ScheduleStatus.PENDING.value,
+        server_default=ScheduleStatus.PENDING.value,
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    executed_at = Column(DateTime, nullable=True)
+    # Why the toggle was rejected, for failed schedules.
+    error = Column(String, nullable=True)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["project_id", "flag_id"],
+            ["feature_flags.project_id", "feature_flags.id"],
+            ondelete="CASCADE",
+        ),
+        # The scheduler only reads pending schedules, in due order, so the
+        # index leaves out the ones already run or cancelled.
+        Index(
+            "ix_scheduled_toggles_pending_due_at",
+            "due_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index("ix_scheduled_toggles_project_id_flag_id", "project_id", "flag_id"),
+    )
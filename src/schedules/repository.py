@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from src.common.context import actor_context, project_context
+from src.infrastructure.base_repository import BaseRepository
+from src.infrastructure.tracing import traced
+from .enums import ScheduleStatus
+from .model import ScheduledToggle
+from .schemas import ScheduledToggleCreate
+
+
+class ScheduledToggleRepository(
+    BaseRepository[ScheduledToggle, ScheduledToggleCreate, ScheduledToggleCreate]
+):
+    @traced()
+    async def add(
+        self, *, flag_id: int, obj_in: ScheduledToggleCreate
+    ) -> ScheduledToggle:
+        """Schedules a toggle of a flag of the current project, as the actor."""
+        db_obj = self.model(
+            project_id=project_context.get(),
+            flag_id=flag_id,
+            actor=actor_context.get(),
+            **obj_in.model_dump(),
+        )
+        self.db.add(db_obj)
+        await self.db.commit()
+        await self.db.refresh(db_obj)
+        return db_obj
+
+    @traced()
+    async def get_for_flag(
+        self, *, flag_id: int, schedule_id: Optional[int] = None
+    ) -> list[ScheduledToggle]:
+        """
+        Retrieves the schedules of a flag of the current project, or one of
+        them, in due order. They are read afresh, since the scheduler updates
+        them from another session.
+        """
+        statement = (
+            select(self.model)
+            .where(
+                self.model.project_id == project_context.get(),
+                self.model.flag_id == flag_id,
+            )
+            .order_by(self.model.due_at, self.model.id)
+            .execution_options(populate_existing=True)
+        )
+        if schedule_id is not None:
+            statement = statement.where(self.model.id == schedule_id)
+        return (await self.db.execute(statement)).scalars().all()
+
+    @traced()
+    async def cancel(self, *, schedule: ScheduledToggle) -> bool:
+        """
+        Cancels a pending schedule and commits.
+
+        :return: False if it is no longer pending, e.g. since the scheduler
+            has run it meanwhile.
+        """
+        statement = (
+            update(self.model)
+            .where(
+                self.model.id == schedule.id,
+                self.model.status == ScheduleStatus.PENDING.value,
+            )
+            .values(status=ScheduleStatus.CANCELLED.value)
+            .returning(self.model.id)
+        )
+        cancelled = (await self.db.execute(statement)).scalar_one_or_none()
+        await self.db.commit()
+        if cancelled is None:
+            return False
+        schedule.status = ScheduleStatus.CANCELLED.value
+        return True
+
+    @traced()
+    async def claim_next(self) -> Optional[ScheduledToggle]:
+        """
+        Locks the pending schedule of any project that is due next, read from
+        the first entry of the pending index. Schedules locked by another
+        worker are skipped rather than waited for, so each schedule is claimed
+        by one worker only. The lock is held until the transaction ends.
+        """
+        statement = (
+            select(self.model)
+            .where(self.model.status == ScheduleStatus.PENDING.value)
+            .order_by(self.model.due_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        return (await self.db.execute(statement)).scalar_one_or_none()
+
+    def finish(
+        self,
+        *,
+        schedule: ScheduledToggle,
+        status: ScheduleStatus,
+        error: Optional[str] = None,
+    ) -> None:
+        """Records a claimed schedule's outcome, written with the next commit."""
+        schedule.status = status.value
+        schedule.error = error
+        schedule.executed_at = datetime.utcnow()
@@ -0,0 +1,67 @@
+from dependency_injector.wiring import inject, Provide
+from fastapi import APIRouter, Depends, status
+
+from src.common.dependencies import set_actor_from_header, set_project_from_header
+from src.infrastructure.containers import AppContainer
+from . import schemas
+from .service import ScheduledToggleService
+
+router = APIRouter(
+    prefix="/flags",
+    tags=["Scheduled Toggles"],
+    dependencies=[Depends(set_project_from_header)],
+)
+
+
+@router.post(
+    "/{flag_id}/schedules",
+    response_model=schemas.ScheduledToggle,
+    status_code=status.HTTP_201_CREATED,
+)
+@inject
+async def create_scheduled_toggle(
+    flag_id: int,
+    payload: schemas.ScheduledToggleCreate,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: ScheduledToggleService = Depends(
+        Provide[AppContainer.scheduled_toggle_service]
+    ),
+):
+    """
+    Schedule a toggle of a flag's state at a given time.
+
+    - It runs as the actor scheduling it, with the dependency rules and
+      audit entries of a manual toggle.
+    - A toggle the dependency rules reject then is marked failed.
+    """
+    return await service.create(flag_id=flag_id, obj_in=payload)
+
+
+@router.get("/{flag_id}/schedules", response_model=list[schemas.ScheduledToggle])
+@inject
+async def get_scheduled_toggles(
+    flag_id: int,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: ScheduledToggleService = Depends(
+        Provide[AppContainer.scheduled_toggle_service]
+    ),
+):
+    """Retrieve a flag's scheduled toggles, in due order, with their outcome."""
+    return await service.get_for_flag(flag_id)
+
+
+@router.post(
+    "/{flag_id}/schedules/{schedule_id}/cancel",
+    response_model=schemas.ScheduledToggle,
+)
+@inject
+async def cancel_scheduled_toggle(
+    flag_id: int,
+    schedule_id: int,
+    _actor_context: None = Depends(set_actor_from_header),
+    service: ScheduledToggleService = Depends(
+        Provide[AppContainer.scheduled_toggle_service]
+    ),
+):
+    """Cancel a scheduled toggle that has not run yet."""
+    return await service.cancel(flag_id=flag_id, schedule_id=schedule_id)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.common.context import actor_context, project_context
+from src.common.exceptions import HTTPException
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.service import FeatureFlagService
+from src.infrastructure.database import Database
+from .enums import ScheduleStatus
+from .model import ScheduledToggle
+from .repository import ScheduledToggleRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ToggleScheduler:
+    """
+    Runs scheduled toggles when they are due, in every worker process.
+
+    Rather than polling, the scheduler sleeps until the next pending toggle
+    is due, which it reads from the first entry of the pending index. A
+    toggle scheduled in the same worker for an earlier time wakes it up
+    right away; one scheduled in another worker is seen within
+    `max_sleep_s`. An idle scheduler therefore costs one indexed query per
+    `max_sleep_s`, however many toggles are pending.
+
+    Due toggles are claimed one at a time with `FOR UPDATE SKIP LOCKED`, so
+    workers waking up at the same time split them instead of running them
+    twice. Each toggle runs through `FeatureFlagService.toggle`, as the
+    actor and in the project that scheduled it, and its outcome is committed
+    right after, which releases the claim. Only a worker stopping between
+    the two leaves an applied toggle pending, to be applied again, which is
+    harmless since setting a state is idempotent.
+    """
+
+    def __init__(self, db: Database, max_attempts: int = 3, max_sleep_s: float = 60.0):
+        self._db = db
+        self.max_attempts = max_attempts
+        self.max_sleep_s = max_sleep_s
+        self._wake_up = asyncio.Event()
+        self._wake_at: Optional[datetime] = None
+        self._closed = False
+        self.executed = 0
+        self.failed = 0
+
+    def notify(self, due_at: datetime) -> None:
+        """Wakes the scheduler up if a toggle is due before it would wake up."""
+        if self._wake_at is None or due_at < self._wake_at:
+            self._wake_up.set()
+
+    def close(self) -> None:
+        """
+        Stops `run` after the current toggle. Cancelling it alone is not
+        enough, since a cancellation arriving while a connection is opened or
+        closed can be lost in the database driver.
+        """
+        self._closed = True
+        self._wake_up.set()
+
+    async def run(self) -> None:
+        """Runs due toggles until closed or cancelled."""
+        while not self._closed:
+            # Until the next wake-up is known, any new toggle wakes it up.
+            self._wake_at = None
+            self._wake_up.clear()
+            next_due_at = None
+            try:
+                next_due_at = await self.run_due()
+            except Exception:
+                logger.exception("Running scheduled toggles failed.")
+            now = datetime.utcnow()
+            wake_at = now + timedelta(seconds=self.max_sleep_s)
+            if next_due_at is not None:
+                wake_at = max(min(next_due_at, wake_at), now)
+            self._wake_at = wake_at
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wake_up.wait(), (wake_at - now).total_seconds()
+                )
+
+    async def run_due(self) -> Optional[datetime]:
+        """
+        Runs the toggles due now, each in a transaction of its own.
+
+        :return: When the next pending toggle is due, None if there is none.
+        """
+        while not self._closed:
+            async with self._db.new_session() as session:
+                repository = ScheduledToggleRepository(
+                    model=ScheduledToggle, db_session=session
+                )
+                schedule = await repository.claim_next()
+                if schedule is None or schedule.due_at > datetime.utcnow():
+                    await repository.commit()
+                    return schedule.due_at if schedule is not None else None
+                await self._execute(repository, schedule)
+                await repository.commit()
+        return None
+
+    async def _execute(
+        self, repository: ScheduledToggleRepository, schedule: ScheduledToggle
+    ) -> None:
+        actor_token = actor_context.set(schedule.actor)
+        project_token = project_context.set(schedule.project_id)
+        try:
+            async with self._db.session_scope():
+                service = FeatureFlagService(
+                    repository=FeatureFlagRepository(
+                        model=FeatureFlag, db_session=self._db.get_session()
+                    ),
+                    max_attempts=self.max_attempts,
+                )
+                await service.toggle(
+                    flag_id=schedule.flag_id, is_enabled=schedule.is_enabled
+                )
+        except HTTPException as exc:
+            # Rejected by the dependency rules, or the flag is gone.
+            repository.finish(
+                schedule=schedule, status=ScheduleStatus.FAILED, error=str(exc.detail)
+            )
+            self.failed += 1
+        except Exception as exc:
+            # Not retried, so a toggle failing every time cannot hold up the
+            # ones due after it.
+            logger.exception("Scheduled toggle %s failed.", schedule.id)
+            repository.finish(
+                schedule=schedule, status=ScheduleStatus.FAILED, error=repr(exc)
+            )
+            self.failed += 1
+        else:
+            repository.finish(schedule=schedule, status=ScheduleStatus.DONE)
+            self.executed += 1
+        finally:
+            project_context.reset(project_token)
+            actor_context.reset(actor_token)
+
+    def stats(self) -> dict[str, Optional[str] | int]:
+        return {
+            "executed": self.executed,
+            "failed": self.failed,
+            "next_wake_up": self._wake_at.isoformat() if self._wake_at else None,
+        }
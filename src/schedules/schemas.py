@@ -0,0 +1,33 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel, field_validator
+
+from src.common.timestamps import to_utc_naive
+from .enums import ScheduleStatus
+
+
+class ScheduledToggleCreate(BaseModel):
+    is_enabled: bool
+    # UTC if naive. A time in the past runs right away.
+    due_at: datetime.datetime
+
+    @field_validator("due_at")
+    @classmethod
+    def _to_utc_naive(cls, moment: datetime.datetime) -> datetime.datetime:
+        return to_utc_naive(moment)
+
+
+class ScheduledToggle(BaseModel):
+    id: int
+    flag_id: int
+    is_enabled: bool
+    due_at: datetime.datetime
+    actor: str
+    status: ScheduleStatus
+    created_at: datetime.datetime
+    executed_at: Optional[datetime.datetime] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,66 @@
+from typing import TYPE_CHECKING, Optional
+
+from src.feature_flags.exceptions import FeatureFlagNotFoundException
+from src.feature_flags.repository import FeatureFlagRepository
+from src.infrastructure.tracing import traced
+from . import model, schemas
+from .enums import ScheduleStatus
+from .exceptions import (
+    ScheduledToggleConflictException,
+    ScheduledToggleNotFoundException,
+)
+from .repository import ScheduledToggleRepository
+
+if TYPE_CHECKING:
+    from .scheduler import ToggleScheduler
+
+
+class ScheduledToggleService:
+    def __init__(
+        self,
+        repository: ScheduledToggleRepository,
+        flag_repository: FeatureFlagRepository,
+        scheduler: Optional["ToggleScheduler"] = None,
+    ):
+        self.repository = repository
+        self.flag_repository = flag_repository
+        self.scheduler = scheduler
+
+    @traced()
+    async def create(
+        self, *, flag_id: int, obj_in: schemas.ScheduledToggleCreate
+    ) -> model.ScheduledToggle:
+        """
+        Schedules a toggle of a flag. The dependency rules are checked when
+        it runs, not now, since the flag's dependencies may change until then.
+        """
+        if not await self.flag_repository.get(flag_id):
+            raise FeatureFlagNotFoundException()
+        schedule = await self.repository.add(flag_id=flag_id, obj_in=obj_in)
+        if self.scheduler is not None:
+            self.scheduler.notify(schedule.due_at)
+        return schedule
+
+    @traced()
+    async def get_for_flag(self, flag_id: int) -> list[model.ScheduledToggle]:
+        """Retrieves a flag's schedules, in due order."""
+        if not await self.flag_repository.get(flag_id):
+            raise FeatureFlagNotFoundException()
+        return await self.repository.get_for_flag(flag_id=flag_id)
+
+    @traced()
+    async def cancel(self, *, flag_id: int, schedule_id: int) -> model.ScheduledToggle:
+        """Cancels a schedule that has not run yet."""
+        schedules = await self.repository.get_for_flag(
+            flag_id=flag_id, schedule_id=schedule_id
+        )
+        if not schedules:
+            raise ScheduledToggleNotFoundException()
+        [schedule] = schedules
+        if schedule.status != ScheduleStatus.PENDING.value or not (
+            await self.repository.cancel(schedule=schedule)
+        ):
+            raise ScheduledToggleConflictException(
+                "Only pending scheduled toggles can be cancelled."
+            )
+        return schedule
@@ -1,5 +1,5 @@
 import asyncio
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Callable, Generator
 
 import pytest
 from httpx import AsyncClient, ASGITransport
@@ -14,6 +14,7 @@ from src.feature_flags.model import FeatureFlag
 from src.feature_flags.repository import FeatureFlagRepository
 from src.infrastructure.containers import AppContainer
 from src.infrastructure.database import Base
+from tests.query_budget import QueryBudget
 
 
 @pytest.fixture(scope="session")
@@ -55,6 +56,16 @@ async def db_session(
         await session.close()
 
 
+@pytest.fixture
+async def session_factory(
+    test_settings: Settings, setup_database: None
+) -> AsyncGenerator[Callable[[], AsyncSession], None]:
+    """Provides independent sessions, for tests running concurrent transactions."""
+    engine = create_async_engine(str(test_settings.postgres_dsn))
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
 @pytest.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
@@ -83,3 +94,16 @@ def feature_flag_repo(db_session: AsyncSession) -> FeatureFlagRepository:
 def audit_log_repo(db_session: AsyncSession) -> AuditLogRepository:
     """Provides a repository instance for audit logs with the test session."""
     return AuditLogRepository(model=AuditLog, db_session=db_session)
+
+
+@pytest.fixture
+def query_budget(db_session: AsyncSession) -> Generator[QueryBudget, None, None]:
+    """
+    Counts the SQL statements issued through the test session's engine.
+
+    Usage: ``with query_budget(3, label="GET /flags/"): await client.get(...)``
+    """
+    budget = QueryBudget(engine=db_session.bind.sync_engine)
+    budget.attach()
+    yield budget
+    budget.detach()
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.app import create_app
+from src.common.settings import Settings
+from src.infrastructure.admission import (
+    AdmissionBudget,
+    AdmissionControlMiddleware,
+    AdmissionRejected,
+    classify_by_method,
+)
+
+
+async def test_budget_queues_then_sheds():
+    budget = AdmissionBudget("writes", limit=1, max_queue=1, queue_timeout_ms=1000)
+    await budget.acquire()
+
+    queued = asyncio.create_task(budget.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected):
+        await budget.acquire()
+
+    budget.release(service_time=0.01)
+    await queued
+    assert budget.stats()["active"] == 1
+    assert budget.stats()["rejected"] == 1
+
+
+async def test_budget_rejects_after_queue_timeout():
+    budget = AdmissionBudget("writes", limit=1, max_queue=10, queue_timeout_ms=20)
+    await budget.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await budget.acquire()
+
+    assert exc_info.value.retry_after >= 1
+    assert budget.stats()["queue_length"] == 0
+
+
+async def test_budget_rejects_when_estimated_wait_exceeds_timeout():
+    budget = AdmissionBudget("writes", limit=1, max_queue=10, queue_timeout_ms=100)
+    await budget.acquire()
+    budget.release(service_time=5.0)
+    await budget.acquire()
+
+    # The recent service time predicts a wait far beyond the queue timeout.
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await budget.acquire()
+
+    assert exc_info.value.retry_after >= 1
+    assert budget.stats()["queued"] == 0
+
+
+async def test_saturated_writes_do_not_stall_reads():
+    release_writes = asyncio.Event()
+
+    async def slow_write(request: Request) -> JSONResponse:
+        await release_writes.wait()
+        return JSONResponse({"written": True})
+
+    async def read(request: Request) -> JSONResponse:
+        return JSONResponse({"read": True})
+
+    app = AdmissionControlMiddleware(
+        Starlette(
+            routes=[
+                Route("/flags/", slow_write, methods=["POST"]),
+                Route("/flags/", read, methods=["GET"]),
+            ]
+        ),
+        budgets={
+            "writes": AdmissionBudget(
+                "writes", limit=1, max_queue=0, queue_timeout_ms=1000
+            ),
+            "reads": AdmissionBudget(
+                "reads", limit=1, max_queue=10, queue_timeout_ms=1000
+            ),
+        },
+        classify=classify_by_method(),
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        running_write = asyncio.create_task(client.post("/flags/"))
+        await asyncio.sleep(0.05)
+
+        shed = await client.post("/flags/")
+        assert shed.status_code == 503
+        assert int(shed.headers["Retry-After"]) >= 1
+
+        reads = await asyncio.wait_for(
+            asyncio.gather(*(client.get("/flags/") for _ in range(5))), timeout=1
+        )
+        assert all(r.status_code == 200 for r in reads)
+
+        release_writes.set()
+        assert (await running_write).status_code == 200
+
+
+def test_app_admits_evaluations_as_reads(test_settings: Settings):
+    settings = test_settings.model_copy(update={"admission_control_enabled": True})
+    [admission] = [
+        middleware
+        for middleware in create_app(settings=settings).user_middleware
+        if middleware.cls is AdmissionControlMiddleware
+    ]
+    classify = admission.kwargs["classify"]
+
+    assert classify({"method": "POST", "path": "/flags/evaluate"}) == "reads"
+    assert classify({"method": "POST", "path": "/flags/42/evaluate"}) == "reads"
+    assert classify({"method": "GET", "path": "/flags/"}) == "reads"
+    assert classify({"method": "POST", "path": "/flags/"}) == "writes"
+    assert classify({"method": "PATCH", "path": "/flags/42/toggle"}) == "writes"
+    assert classify({"method": "GET", "path": "/history/export"}) == "exports"
@@ -0,0 +1,148 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.common.context import DEFAULT_PROJECT_ID, actor_context
+from src.feature_flags import repository
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate, FeatureFlagUpdate
+from src.feature_flags.service import FeatureFlagService
+
+
+@pytest.fixture(autouse=True)
+def actor() -> None:
+    actor_context.set("lock-tester")
+
+
+async def _create_chain(repo: FeatureFlagRepository, prefix: str) -> list[int]:
+    """Creates `prefix Root <- prefix Middle <- prefix Leaf` and returns their ids."""
+    ids: list[int] = []
+    for name in ("Root", "Middle", "Leaf"):
+        flag = await repo.create(
+            obj_in=FeatureFlagCreate(
+                name=f"{prefix} {name}", is_enabled=True, dependency_ids=ids[-1:]
+            )
+        )
+        ids.append(flag.id)
+    return ids
+
+
+def _service(session: AsyncSession) -> FeatureFlagService:
+    return FeatureFlagService(
+        FeatureFlagRepository(model=FeatureFlag, db_session=session)
+    )
+
+
+async def test_related_ids_cover_ancestors_and_descendants(
+    feature_flag_repo: FeatureFlagRepository,
+):
+    root, middle, leaf = await _create_chain(feature_flag_repo, "A")
+    other = await _create_chain(feature_flag_repo, "B")
+
+    assert await feature_flag_repo.get_related_ids(flag_ids=[middle]) == {
+        root: DEFAULT_PROJECT_ID,
+        middle: DEFAULT_PROJECT_ID,
+        leaf: DEFAULT_PROJECT_ID,
+    }
+    assert set(await feature_flag_repo.get_related_ids(flag_ids=[other[0]])) == set(
+        other
+    )
+
+
+async def test_writes_block_only_within_the_same_subgraph(
+    session_factory: Callable[[], AsyncSession],
+):
+    async with session_factory() as session:
+        first_chain = await _create_chain(
+            FeatureFlagRepository(model=FeatureFlag, db_session=session), "A"
+        )
+        second_chain = await _create_chain(
+            FeatureFlagRepository(model=FeatureFlag, db_session=session), "B"
+        )
+
+    async with session_factory() as holder:
+        # Hold the locks of the first chain's subgraph in an open transaction.
+        await _service(holder)._lock_subgraph([first_chain[1]])
+
+        async with session_factory() as session:
+            # A write on an unrelated chain goes through right away.
+            await asyncio.wait_for(
+                _service(session).toggle(flag_id=second_chain[0], is_enabled=False),
+                timeout=5,
+            )
+
+        async with session_factory() as session:
+            blocked = asyncio.create_task(
+                _service(session).toggle(flag_id=first_chain[2], is_enabled=False)
+            )
+            await asyncio.sleep(0.3)
+            assert not blocked.done()
+
+            await holder.rollback()
+            flag = await asyncio.wait_for(blocked, timeout=5)
+            assert flag.is_enabled is False
+
+
+async def test_large_subgraphs_take_the_project_lock_instead(
+    session_factory: Callable[[], AsyncSession], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(repository, "MAX_FLAG_LOCKS", 2)
+    async with session_factory() as session:
+        first_chain = await _create_chain(
+            FeatureFlagRepository(model=FeatureFlag, db_session=session), "A"
+        )
+        second_chain = await _create_chain(
+            FeatureFlagRepository(model=FeatureFlag, db_session=session), "B"
+        )
+
+    async with session_factory() as holder:
+        await _service(holder)._lock_subgraph([first_chain[1]])
+        held = await holder.scalar(
+            text(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                "AND pid = pg_backend_pid()"
+            )
+        )
+        assert held == 1
+
+        async with session_factory() as session:
+            # Even a write on an unrelated chain of the project waits.
+            blocked = asyncio.create_task(
+                _service(session).toggle(flag_id=second_chain[2], is_enabled=False)
+            )
+            await asyncio.sleep(0.3)
+            assert not blocked.done()
+
+            await holder.rollback()
+            flag = await asyncio.wait_for(blocked, timeout=5)
+            assert flag.is_enabled is False
+
+
+async def test_writes_start_over_after_a_deadlock_while_locking(
+    session_factory: Callable[[], AsyncSession], monkeypatch: pytest.MonkeyPatch
+):
+    lock_subgraph = FeatureFlagRepository.lock_subgraph
+    deadlocks = []
+
+    async def deadlock_once(self, *, flag_ids: list[int]) -> None:
+        if len(deadlocks) % 2 == 0:
+            deadlocks.append(flag_ids)
+            raise StaleDataError("deadlock detected")
+        deadlocks.append(None)
+        await lock_subgraph(self, flag_ids=flag_ids)
+
+    monkeypatch.setattr(FeatureFlagRepository, "lock_subgraph", deadlock_once)
+    async with session_factory() as session:
+        service = _service(session)
+        flag = await service.create(obj_in=FeatureFlagCreate(name="Retried"))
+        renamed = await service.update(
+            flag_id=flag.id, obj_in=FeatureFlagUpdate(name="Retried again")
+        )
+
+    assert renamed.name == "Retried again"
+    assert len(deadlocks) == 4
@@ -0,0 +1,97 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs import events
+from src.audit_logs.auditors import compile_auditor
+from src.audit_logs.model import AuditLog
+from src.feature_flags.model import FeatureFlag
+
+HEADERS = {"X-Actor": "auditor"}
+
+
+async def _details(db_session: AsyncSession, action: str) -> list[dict]:
+    return list(
+        (
+            await db_session.execute(
+                select(AuditLog.details)
+                .where(AuditLog.action == action)
+                .order_by(AuditLog.id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+
+async def test_create_and_update_are_audited_per_column(
+    client: AsyncClient, db_session: AsyncSession
+):
+    flag = (
+        await client.post(
+            "/flags/",
+            json={"name": "Audited", "description": "Before"},
+            headers=HEADERS,
+        )
+    ).json()
+    await client.patch(
+        f"/flags/{flag['id']}", json={"description": "After"}, headers=HEADERS
+    )
+
+    [created] = await _details(db_session, "create")
+    [updated] = await _details(db_session, "update")
+    assert created["created"] == {
+        "id": flag["id"],
+        "name": "Audited",
+        "description": "Before",
+        "is_enabled": False,
+        "version": 1,
+        "rules": None,
+    }
+    assert updated["changes"]["description"] == {"before": "Before", "after": "After"}
+    assert "name" not in updated["changes"]
+
+
+async def test_excluded_columns_are_not_audited(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setitem(
+        events._auditors,
+        FeatureFlag,
+        compile_auditor(FeatureFlag, exclude=("description", "version")),
+    )
+
+    flag = (
+        await client.post(
+            "/flags/", json={"name": "Quiet", "description": "Hidden"}, headers=HEADERS
+        )
+    ).json()
+    await client.patch(
+        f"/flags/{flag['id']}", json={"description": "Still hidden"}, headers=HEADERS
+    )
+
+    [created] = await _details(db_session, "create")
+    assert created["created"] == {
+        "id": flag["id"],
+        "name": "Quiet",
+        "is_enabled": False,
+        "rules": None,
+    }
+    # Only excluded columns changed, so the update is not audited at all.
+    assert await _details(db_session, "update") == []
+
+
+def test_included_columns_keep_mapper_order():
+    auditor = compile_auditor(FeatureFlag, include=("is_enabled", "name"))
+
+    assert auditor.keys == ("name", "is_enabled")
+    assert auditor.snapshot(FeatureFlag(name="Flag", is_enabled=True)) == {
+        "name": "Flag",
+        "is_enabled": True,
+    }
+
+
+def test_unknown_audited_columns_are_rejected():
+    with pytest.raises(ValueError):
+        compile_auditor(FeatureFlag, exclude=("dependencies",))
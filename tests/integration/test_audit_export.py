@@ -0,0 +1,120 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+from starlette.requests import ClientDisconnect
+
+from src.audit_logs import export
+from src.audit_logs.export import ExportResponse, export_audit_logs
+from src.audit_logs.schemas import AuditLogExportQuery
+from src.common.settings import Settings
+from src.infrastructure.database import Database
+
+HEADERS = {"X-Actor": "compliance"}
+
+
+async def _create_flags(client: AsyncClient, count: int) -> None:
+    for i in range(count):
+        await client.post("/flags/", json={"name": f"Exported {i}"}, headers=HEADERS)
+
+
+async def test_ndjson_export_matches_history(client: AsyncClient):
+    await _create_flags(client, 3)
+    flag_id = (await client.get("/flags/", headers=HEADERS)).json()[0]["id"]
+    await client.patch(
+        f"/flags/{flag_id}/toggle", json={"is_enabled": True}, headers=HEADERS
+    )
+
+    response = await client.get("/history/export", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    history = (await client.get("/history/", headers=HEADERS)).json()
+    assert lines == sorted(history, key=lambda entry: entry["id"])
+
+
+async def test_csv_export_is_filtered(client: AsyncClient):
+    await _create_flags(client, 2)
+    flag_id = (await client.get("/flags/", headers=HEADERS)).json()[0]["id"]
+    await client.patch(
+        f"/flags/{flag_id}/toggle", json={"is_enabled": True}, headers=HEADERS
+    )
+
+    response = await client.get(
+        "/history/export", params={"format": "csv", "action": "toggle"}, headers=HEADERS
+    )
+
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *records = list(csv.reader(io.StringIO(response.text)))
+    assert header[:3] == ["id", "timestamp", "action"]
+    assert [record[2] for record in records] == ["toggle"]
+    assert json.loads(records[0][-1])["changes"]["is_enabled"]["after"] is True
+
+
+async def test_gzip_export_is_decoded_by_the_client(client: AsyncClient):
+    await _create_flags(client, 3)
+
+    response = await client.get(
+        "/history/export", params={"gzip": "true"}, headers=HEADERS
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 3
+
+
+async def test_export_is_streamed_in_batches(
+    client: AsyncClient, test_settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    await _create_flags(client, 5)
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+
+    db = Database(str(test_settings.postgres_dsn))
+    try:
+        chunks = [
+            chunk
+            async for chunk in export_audit_logs(db, AuditLogExportQuery(), "ndjson")
+        ]
+        compressed = b"".join(
+            [
+                chunk
+                async for chunk in export_audit_logs(
+                    db, AuditLogExportQuery(), "ndjson", compress=True
+                )
+            ]
+        )
+    finally:
+        await db.engine.dispose()
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    assert gzip.decompress(compressed) == b"".join(chunks)
+
+
+async def test_disconnected_export_releases_its_session(
+    client: AsyncClient, test_settings: Settings, monkeypatch: pytest.MonkeyPatch
+):
+    await _create_flags(client, 5)
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    sent = []
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body" and sent:
+            raise OSError("Connection reset by peer")
+        sent.append(message)
+
+    db = Database(str(test_settings.postgres_dsn))
+    try:
+        response = ExportResponse(
+            export_audit_logs(db, AuditLogExportQuery(), "ndjson", compress=True)
+        )
+        with pytest.raises(ClientDisconnect):
+            await response(
+                {"type": "http", "asgi": {"spec_version": "2.4"}}, None, send
+            )
+
+        assert db.engine.pool.checkedout() == 0
+    finally:
+        await db.engine.dispose()
@@ -0,0 +1,137 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs.events import register_audit_listeners
+from src.audit_logs.model import AuditLog
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate, FeatureFlagUpdate
+from tests.query_budget import QueryBudget
+
+HEADERS = {"X-Actor": "operator"}
+
+
+@pytest.fixture
+def coalesced_audit(client: AsyncClient):
+    """Writes audit entries in one INSERT at commit, after the app set it up."""
+    register_audit_listeners(coalesce=True)
+    yield
+    register_audit_listeners(coalesce=False)
+
+
+async def _create_cascade(client: AsyncClient) -> tuple[int, list[int]]:
+    root = (
+        await client.post(
+            "/flags/", json={"name": "Root", "is_enabled": True}, headers=HEADERS
+        )
+    ).json()
+    dependents = []
+    for i in range(3):
+        dependent = await client.post(
+            "/flags/",
+            json={
+                "name": f"Dependent {i}",
+                "is_enabled": True,
+                "dependency_ids": [root["id"]],
+            },
+            headers=HEADERS,
+        )
+        dependents.append(dependent.json()["id"])
+    return root["id"], dependents
+
+
+async def test_cascade_is_written_as_one_operation(
+    client: AsyncClient, coalesced_audit: None, query_budget: QueryBudget
+):
+    root_id, dependent_ids = await _create_cascade(client)
+
+    with query_budget(20, label="PATCH toggle", allow_repeats=True):
+        response = await client.patch(
+            f"/flags/{root_id}/toggle", json={"is_enabled": False}, headers=HEADERS
+        )
+    assert response.status_code == 200
+    audit_inserts = [
+        s
+        for s in query_budget.statements
+        if s.statement.startswith("INSERT INTO audit_logs")
+    ]
+    assert len(audit_inserts) == 1
+
+    history = (
+        await client.get("/history/", params={"action": "toggle"}, headers=HEADERS)
+    ).json()
+    operation_id = history[0]["operation_id"]
+    operation = (
+        await client.get(f"/history/operations/{operation_id}", headers=HEADERS)
+    ).json()
+
+    assert operation["actor"] == "operator"
+    assert operation["target_ids"] == [str(root_id), *map(str, dependent_ids)]
+    assert [change["action"] for change in operation["changes"]] == [
+        "toggle",
+        "auto_disable",
+        "auto_disable",
+        "auto_disable",
+    ]
+    assert operation["changes"][1]["details"]["changes"]["is_enabled"] == {
+        "before": True,
+        "after": False,
+    }
+
+    # Each affected flag's history still finds its entry by target id.
+    dependent_history = (
+        await client.get(
+            "/history/",
+            params={"target_id": str(dependent_ids[0]), "action": "auto_disable"},
+            headers=HEADERS,
+        )
+    ).json()
+    assert [entry["operation_id"] for entry in dependent_history] == [operation_id]
+
+
+async def test_separate_requests_are_separate_operations(client: AsyncClient):
+    await _create_cascade(client)
+
+    history = (
+        await client.get("/history/", params={"action": "create"}, headers=HEADERS)
+    ).json()
+
+    assert len({entry["operation_id"] for entry in history}) == 4
+
+
+async def test_unknown_operation_is_not_found(client: AsyncClient):
+    response = await client.get(f"/history/operations/{uuid.uuid4()}", headers=HEADERS)
+    assert response.status_code == 404
+
+
+async def test_entries_of_a_rolled_back_savepoint_are_dropped(
+    client: AsyncClient,
+    coalesced_audit: None,
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Kept"))
+
+    with pytest.raises(RuntimeError):
+        async with feature_flag_repo.savepoint():
+            await feature_flag_repo.update(
+                db_obj=flag, obj_in=FeatureFlagUpdate(name="Discarded"), commit=False
+            )
+            raise RuntimeError()
+    await feature_flag_repo.update(
+        db_obj=flag, obj_in=FeatureFlagUpdate(description="Kept too"), commit=False
+    )
+    await feature_flag_repo.commit()
+
+    details = (
+        (await db_session.execute(select(AuditLog.details).order_by(AuditLog.id)))
+        .scalars()
+        .all()
+    )
+    assert len(details) == 2
+    assert "created" in details[0]
+    assert "name" not in details[1]["changes"]
+    assert details[1]["changes"]["description"]["after"] == "Kept too"
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs.model import AuditLog, AuditLogHourlyRollup
+from src.audit_logs.repository import AuditLogRepository, AuditLogRollupRepository
+from src.audit_logs.service import AuditLogService
+
+HEADERS = {"X-Actor": "analyst"}
+DAY = datetime(2026, 3, 2)
+
+
+@pytest.fixture
+def audit_log_service(db_session: AsyncSession) -> AuditLogService:
+    return AuditLogService(
+        repository=AuditLogRepository(model=AuditLog, db_session=db_session),
+        rollup_repository=AuditLogRollupRepository(
+            model=AuditLogHourlyRollup, db_session=db_session
+        ),
+    )
+
+
+@pytest.fixture
+async def history(db_session: AsyncSession) -> None:
+    entries = [
+        (DAY.replace(hour=10, minute=5), "1", "alice", "toggle"),
+        (DAY.replace(hour=10, minute=40), "1", "bob", "toggle"),
+        (DAY.replace(hour=11, minute=10), "2", "alice", "toggle"),
+        (DAY.replace(hour=11, minute=20), "1", "alice", "toggle"),
+        (DAY.replace(hour=11, minute=50), "1", "alice", "update"),
+        (DAY.replace(hour=12, minute=30), "1", "alice", "toggle"),
+        (DAY + timedelta(days=1, hours=3), "2", "bob", "toggle"),
+    ]
+    db_session.add_all(
+        AuditLog(
+            timestamp=timestamp,
+            target_entity="feature_flags",
+            target_id=target_id,
+            actor=actor,
+            action=action,
+            details={},
+        )
+        for timestamp, target_id, actor, action in entries
+    )
+    await db_session.commit()
+
+
+async def _stats(client: AsyncClient, **params) -> dict:
+    response = await client.get("/history/stats", params=params, headers=HEADERS)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_counts_per_hour_and_dimension(client: AsyncClient, history: None):
+    stats = await _stats(client, group_by="target_id", bucket="hour", action="toggle")
+
+    assert stats["rolled_up_until"] is None
+    assert [(r["bucket"], r["target_id"], r["count"]) for r in stats["rows"]] == [
+        ("2026-03-02T10:00:00", "1", 2),
+        ("2026-03-02T11:00:00", "1", 1),
+        ("2026-03-02T11:00:00", "2", 1),
+        ("2026-03-02T12:00:00", "1", 1),
+        ("2026-03-03T03:00:00", "2", 1),
+    ]
+    assert all(r["actor"] is None for r in stats["rows"])
+
+
+async def test_totals_per_actor_and_day(client: AsyncClient, history: None):
+    stats = await _stats(client, group_by="action,actor", bucket="day")
+
+    assert [
+        (r["bucket"][:10], r["actor"], r["action"], r["count"]) for r in stats["rows"]
+    ] == [
+        ("2026-03-02", "alice", "toggle", 4),
+        ("2026-03-02", "alice", "update", 1),
+        ("2026-03-02", "bob", "toggle", 1),
+        ("2026-03-03", "bob", "toggle", 1),
+    ]
+    assert stats["group_by"] == ["actor", "action"]
+
+
+async def test_rolled_up_hours_give_the_same_counts(
+    client: AsyncClient, history: None, audit_log_service: AuditLogService
+):
+    range_params = {
+        "bucket": "hour",
+        "start": DAY.replace(hour=10, minute=30).isoformat(),
+        "end": (DAY + timedelta(days=2)).isoformat(),
+    }
+    requests = [
+        {**range_params, "group_by": "target_id,actor,action"},
+        # Served by the hourly totals.
+        {**range_params, "group_by": "action"},
+    ]
+    before = [await _stats(client, **params) for params in requests]
+
+    added = await audit_log_service.roll_up(until=DAY.replace(hour=12, minute=15))
+    after = [await _stats(client, **params) for params in requests]
+
+    # 5 rows per hour, target, actor and action, 3 per hour and action.
+    assert added == 8
+    for rolled_up, raw in zip(after, before):
+        assert rolled_up["rolled_up_until"] == "2026-03-02T12:00:00"
+        assert rolled_up["rows"] == raw["rows"]
+    # No new full hour to roll up.
+    unchanged = await audit_log_service.roll_up(until=DAY.replace(hour=12, minute=59))
+    assert unchanged is None
+
+
+async def test_unknown_dimension_is_rejected(client: AsyncClient):
+    response = await client.get(
+        "/history/stats", params={"group_by": "details"}, headers=HEADERS
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from src.infrastructure.batch_loader import BatchLoader
+from tests.query_budget import QueryBudget
+
+
+async def test_concurrent_loads_share_one_batch():
+    batches = []
+
+    async def load_batch(keys: list[int]) -> dict[int, str]:
+        batches.append(keys)
+        return {key: f"value-{key}" for key in keys if key != 3}
+
+    loader = BatchLoader(load_batch)
+    results = await asyncio.gather(
+        loader.load(1), loader.load_many([2, 3]), loader.load(1)
+    )
+
+    assert results == ["value-1", ["value-2", None], "value-1"]
+    assert batches == [[1, 2, 3]]
+
+
+async def test_batch_errors_reach_every_caller():
+    async def load_batch(keys: list[int]) -> dict[int, str]:
+        raise ValueError("boom")
+
+    loader = BatchLoader(load_batch)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_waiters_take_over_when_the_first_caller_is_cancelled():
+    batches = []
+
+    async def load_batch(keys: list[int]) -> dict[int, int]:
+        batches.append(keys)
+        await asyncio.sleep(0.01)
+        return {key: key for key in keys}
+
+    loader = BatchLoader(load_batch)
+    first = asyncio.create_task(loader.load(1))
+    second = asyncio.create_task(loader.load(2))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 2
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert batches == [[2]]
+
+
+async def test_repository_loads_are_batched_and_cached(
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+    query_budget: QueryBudget,
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    child = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Child", dependency_ids=[parent.id])
+    )
+    parent_id, child_id = parent.id, child.id
+    db_session.expunge_all()
+
+    # One query for the flags, one per loaded relationship.
+    with query_budget(3, label="batched load"):
+        loaded = await asyncio.gather(
+            feature_flag_repo.load(parent_id),
+            feature_flag_repo.load(child_id),
+            feature_flag_repo.load(child_id + 1),
+        )
+    assert [flag and flag.name for flag in loaded] == ["Parent", "Child", None]
+    assert [dep.name for dep in loaded[1].dependencies] == ["Parent"]
+
+    with query_budget(0, label="cached load"):
+        again = await feature_flag_repo.load_many(ids=[child_id, parent_id])
+    assert again == [loaded[1], loaded[0]]
+
+
+async def test_partially_loaded_flags_are_reloaded(
+    feature_flag_repo: FeatureFlagRepository, db_session: AsyncSession
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Child", dependency_ids=[parent.id])
+    )
+    db_session.expunge_all()
+    # Loads the child without its relationships.
+    [child] = await feature_flag_repo.get_dependents(flag_ids=[parent.id])
+
+    loaded = await feature_flag_repo.load(child.id)
+
+    assert loaded is child
+    assert [dep.name for dep in loaded.dependencies] == ["Parent"]
+
+
+async def test_create_does_not_reload_dependencies(
+    client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+    query_budget: QueryBudget,
+):
+    chain = []
+    for i in range(5):
+        flag = await feature_flag_repo.create(
+            obj_in=FeatureFlagCreate(name=f"Level {i}", dependency_ids=chain[-1:])
+        )
+        chain.append(flag.id)
+    db_session.expunge_all()
+
+    # The five dependencies and the cycle check over their ancestors are
+    # served by one batched load. Locking the subgraph re-reads it once to
+    # check that it is stable.
+    with query_budget(13, label="POST /flags/", allow_repeats=True):
+        response = await client.post(
+            "/flags/",
+            json={"name": "Leaf", "dependency_ids": chain},
+            headers={"X-Actor": "loader"},
+        )
+
+    assert response.status_code == 201
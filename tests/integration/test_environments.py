@@ -0,0 +1,94 @@
+from httpx import AsyncClient
+
+from tests.query_budget import QueryBudget
+
+HEADERS = {"X-Actor": "release-manager"}
+
+
+async def _create_flag(client: AsyncClient, name: str, **fields) -> int:
+    response = await client.post(
+        "/flags/", json={"name": name, **fields}, headers=HEADERS
+    )
+    return response.json()["id"]
+
+
+async def _toggle(
+    client: AsyncClient, environment: str, flag_id: int, is_enabled: bool, **kwargs
+):
+    return await client.patch(
+        f"/environments/{environment}/flags/{flag_id}/toggle",
+        json={"is_enabled": is_enabled},
+        headers={**HEADERS, **kwargs.pop("headers", {})},
+    )
+
+
+async def _states(client: AsyncClient, environment: str) -> dict[str, bool]:
+    response = await client.get(f"/environments/{environment}/flags", headers=HEADERS)
+    assert response.status_code == 200
+    return {flag["name"]: flag["is_enabled"] for flag in response.json()}
+
+
+async def test_states_are_resolved_per_environment_in_one_query(
+    client: AsyncClient, query_budget: QueryBudget
+):
+    checkout = await _create_flag(client, "Checkout", is_enabled=True)
+    await _create_flag(client, "Search")
+
+    toggled = await _toggle(client, "staging", checkout, True)
+    with query_budget(1, label="GET /environments/staging/flags"):
+        staging = await client.get("/environments/staging/flags", headers=HEADERS)
+
+    assert toggled.status_code == 200
+    assert toggled.headers["etag"] == '"1"'
+    assert staging.json() == [
+        {"id": checkout, "name": "Checkout", "is_enabled": True, "version": 1},
+        {"id": checkout + 1, "name": "Search", "is_enabled": False, "version": 0},
+    ]
+    # Other environments and the flag's own state are independent.
+    assert await _states(client, "prod") == {"Checkout": False, "Search": False}
+    flag = (await client.get(f"/flags/{checkout}", headers=HEADERS)).json()
+    assert flag["is_enabled"] is True
+
+
+async def test_dependency_rules_apply_per_environment(client: AsyncClient):
+    parent = await _create_flag(client, "Payments")
+    child = await _create_flag(client, "Wallet", dependency_ids=[parent])
+    await _toggle(client, "dev", parent, True)
+    await _toggle(client, "prod", parent, True)
+    await _toggle(client, "dev", child, True)
+    await _toggle(client, "prod", child, True)
+
+    missing = await _toggle(client, "staging", child, True)
+    await _toggle(client, "dev", parent, False)
+
+    assert missing.status_code == 400
+    assert await _states(client, "dev") == {"Payments": False, "Wallet": False}
+    assert await _states(client, "prod") == {"Payments": True, "Wallet": True}
+    history = (
+        await client.get(
+            "/history/",
+            params={
+                "target_entity": "flag_environment_states",
+                "action": "auto_disable",
+            },
+            headers=HEADERS,
+        )
+    ).json()
+    [cascade] = history
+    assert cascade["details"]["changes"]["is_enabled"] == {
+        "before": True,
+        "after": False,
+    }
+
+
+async def test_unknown_environment_and_stale_version_are_rejected(
+    client: AsyncClient,
+):
+    flag = await _create_flag(client, "Beta")
+    await _toggle(client, "dev", flag, True)
+
+    unknown = await client.get("/environments/qa/flags", headers=HEADERS)
+    stale = await _toggle(client, "dev", flag, False, headers={"If-Match": '"0"'})
+
+    assert unknown.status_code == 404
+    assert stale.status_code == 409
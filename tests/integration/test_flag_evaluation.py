@@ -0,0 +1,161 @@
+import pytest
+from httpx import AsyncClient
+
+from src.feature_flags.evaluation import (
+    FlagEvaluator,
+    bucket,
+    parse_semver_range,
+    parse_version,
+)
+
+HEADERS = {"X-Actor": "release-manager"}
+
+BETA_RULES = [
+    {
+        "conditions": [
+            {"kind": "in", "attribute": "country", "values": ["NL", "DE"]},
+            {"kind": "semver", "attribute": "app_version", "range": ">=2.1.0 <3"},
+        ],
+    },
+    {"percentage": 25, "bucket_by": "user_id"},
+]
+
+
+async def _create_flag(client: AsyncClient, **fields) -> dict:
+    response = await client.post("/flags/", json=fields, headers=HEADERS)
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _evaluate(client: AsyncClient, flag_id: int, context: dict) -> dict:
+    response = await client.post(
+        f"/flags/{flag_id}/evaluate", json={"context": context}, headers=HEADERS
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_first_matching_rule_decides(client: AsyncClient):
+    flag = await _create_flag(client, name="Beta", is_enabled=True, rules=BETA_RULES)
+
+    matched = await _evaluate(
+        client, flag["id"], {"country": "NL", "app_version": "2.4.1"}
+    )
+    too_old = await _evaluate(
+        client, flag["id"], {"country": "NL", "app_version": "2.1.0-rc.1"}
+    )
+    no_subject = await _evaluate(client, flag["id"], {"country": "FR"})
+
+    assert (matched["enabled"], matched["reason"], matched["rule"]) == (
+        True,
+        "rule_match",
+        0,
+    )
+    # A pre-release sorts before its release, so only the rollout applies.
+    assert too_old["rule"] == 1
+    assert (no_subject["enabled"], no_subject["reason"]) == (False, "rollout_excluded")
+
+
+async def test_disabled_and_ruleless_flags(client: AsyncClient):
+    disabled = await _create_flag(client, name="Off", rules=BETA_RULES)
+    ruleless = await _create_flag(client, name="On", is_enabled=True)
+    targeted = await _create_flag(
+        client,
+        name="Targeted",
+        is_enabled=True,
+        rules=[
+            {"conditions": [{"kind": "in", "attribute": "plan", "values": ["pro"]}]}
+        ],
+    )
+
+    response = await client.post(
+        "/flags/evaluate",
+        json={
+            "flag_ids": [targeted["id"], disabled["id"], ruleless["id"]],
+            "context": {"plan": "free", "country": "NL", "app_version": "2.5"},
+        },
+        headers=HEADERS,
+    )
+
+    assert [(e["flag_id"], e["reason"]) for e in response.json()] == [
+        (targeted["id"], "no_rule_matched"),
+        (disabled["id"], "disabled"),
+        (ruleless["id"], "enabled"),
+    ]
+
+
+async def test_updated_rules_are_compiled_again(client: AsyncClient):
+    flag = await _create_flag(client, name="Rollout", is_enabled=True)
+    assert (await _evaluate(client, flag["id"], {"key": "u1"}))["enabled"] is True
+
+    await client.patch(
+        f"/flags/{flag['id']}",
+        json={"rules": [{"percentage": 0}]},
+        headers=HEADERS,
+    )
+
+    assert (await _evaluate(client, flag["id"], {"key": "u1"}))["reason"] == (
+        "rollout_excluded"
+    )
+    rules = (await client.get(f"/flags/{flag['id']}/rules", headers=HEADERS)).json()
+    assert rules["rules"] == [{"conditions": [], "percentage": 0, "bucket_by": "key"}]
+    metrics = (await client.get("/metrics")).json()["flag_evaluators"]
+    assert metrics["misses"] >= 2
+
+
+async def test_invalid_rules_and_unknown_flags_are_rejected(client: AsyncClient):
+    invalid = await client.post(
+        "/flags/",
+        json={
+            "name": "Broken",
+            "rules": [
+                {"conditions": [{"kind": "semver", "attribute": "v", "range": "~1"}]}
+            ],
+        },
+        headers=HEADERS,
+    )
+    unknown = await client.post(
+        "/flags/evaluate", json={"flag_ids": [404]}, headers=HEADERS
+    )
+
+    assert invalid.status_code == 422
+    assert unknown.status_code == 404
+
+
+def test_rollout_buckets_are_stable_and_uniform():
+    evaluator = FlagEvaluator(7, 1, True, [{"percentage": 30}])
+
+    enabled = sum(
+        evaluator.evaluate({"key": f"user-{i}"}).enabled for i in range(20_000)
+    )
+
+    assert 0.28 < enabled / 20_000 < 0.32
+    assert bucket(7, "user-1") == bucket(7, "user-1")
+    # Each flag spreads the same subjects differently.
+    assert [bucket(7, f"user-{i}") for i in range(5)] != [
+        bucket(8, f"user-{i}") for i in range(5)
+    ]
+
+
+@pytest.mark.parametrize(
+    "version, range_, expected",
+    [
+        ("1.4.2", ">=1.2 <2.0.0", True),
+        ("v2.0.0", ">=1.2 <2.0.0", False),
+        ("2.0.0-beta.2", ">=2.0.0-beta.1 <2.0.0", True),
+        ("3.1.0", "<1 || >=3", True),
+        ("1.0.0+build.5", "=1.0.0", True),
+    ],
+)
+def test_semver_ranges(version: str, range_: str, expected: bool):
+    evaluator = FlagEvaluator(
+        1,
+        1,
+        True,
+        [{"conditions": [{"kind": "semver", "attribute": "v", "range": range_}]}],
+    )
+
+    assert evaluator.evaluate({"v": version}).enabled is expected
+    assert parse_version("1.2") == (1, 2, 0, 1, "")
+    with pytest.raises(ValueError):
+        parse_semver_range(">= || <2")
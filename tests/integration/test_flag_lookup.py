@@ -0,0 +1,75 @@
+from httpx import AsyncClient
+
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+
+HEADERS = {"X-Actor": "sdk"}
+
+
+async def test_get_flag_by_name(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="checkout"))
+    child = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="checkout/v2", dependency_ids=[parent.id])
+    )
+
+    by_name = await client.get("/flags/by-name/checkout/v2", headers=HEADERS)
+    by_id = await client.get(f"/flags/{child.id}", headers=HEADERS)
+
+    assert by_name.status_code == 200
+    assert by_name.content == by_id.content
+    assert by_name.headers["ETag"] == by_id.headers["ETag"]
+
+    missing = await client.get("/flags/by-name/unknown", headers=HEADERS)
+    assert missing.status_code == 404
+
+
+async def test_renamed_flag_is_found_by_its_new_name(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="old-name"))
+    await client.get("/flags/by-name/old-name", headers=HEADERS)
+
+    await client.patch(f"/flags/{flag.id}", json={"name": "new-name"}, headers=HEADERS)
+
+    old = await client.get("/flags/by-name/old-name", headers=HEADERS)
+    assert old.status_code == 404
+    renamed = await client.get("/flags/by-name/new-name", headers=HEADERS)
+    assert renamed.json()["id"] == flag.id
+
+
+async def test_search_lists_prefix_matches_first(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    for name in ("new-checkout", "Checkout", "checkout-beta", "search", "100%_off"):
+        await feature_flag_repo.create(obj_in=FeatureFlagCreate(name=name))
+
+    response = await client.get(
+        "/flags/search", params={"q": "checkout", "fields": "name"}, headers=HEADERS
+    )
+
+    assert response.status_code == 200
+    assert [flag["name"] for flag in response.json()] == [
+        "Checkout",
+        "checkout-beta",
+        "new-checkout",
+    ]
+
+    # LIKE wildcards in the query are matched literally.
+    response = await client.get("/flags/search", params={"q": "%_"}, headers=HEADERS)
+    assert [flag["name"] for flag in response.json()] == ["100%_off"]
+
+
+async def test_search_respects_limit(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    for i in range(5):
+        await feature_flag_repo.create(obj_in=FeatureFlagCreate(name=f"flag-{i}"))
+
+    response = await client.get(
+        "/flags/search", params={"q": "flag", "limit": 2}, headers=HEADERS
+    )
+
+    assert [flag["name"] for flag in response.json()] == ["flag-0", "flag-1"]
+    assert (await client.get("/flags/search", headers=HEADERS)).status_code == 422
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs.model import AuditLog
+from src.audit_logs.repository import AuditLogRepository
+from src.checkpoints.model import FlagStateCheckpoint
+from src.checkpoints.repository import FlagStateCheckpointRepository
+from src.checkpoints.service import FlagStateService
+
+HEADERS = {"X-Actor": "investigator"}
+
+
+@pytest.fixture
+def flag_state_service(db_session: AsyncSession) -> FlagStateService:
+    return FlagStateService(
+        checkpoint_repository=FlagStateCheckpointRepository(
+            model=FlagStateCheckpoint, db_session=db_session
+        ),
+        audit_log_repository=AuditLogRepository(model=AuditLog, db_session=db_session),
+    )
+
+
+async def _states_at(client: AsyncClient, moment: datetime) -> dict:
+    response = await client.get(
+        "/flags/as-of", params={"ts": moment.isoformat()}, headers=HEADERS
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def _build_history(client: AsyncClient) -> tuple[int, list[datetime]]:
+    """Creates, enables and renames a flag, returning the time after each step."""
+    moments = []
+    flag = (
+        await client.post("/flags/", json={"name": "Checkout"}, headers=HEADERS)
+    ).json()
+    moments.append(datetime.utcnow())
+    await client.patch(
+        f"/flags/{flag['id']}/toggle", json={"is_enabled": True}, headers=HEADERS
+    )
+    moments.append(datetime.utcnow())
+    await client.patch(
+        f"/flags/{flag['id']}", json={"name": "Checkout v2"}, headers=HEADERS
+    )
+    await client.post("/flags/", json={"name": "Search"}, headers=HEADERS)
+    moments.append(datetime.utcnow())
+    return flag["id"], moments
+
+
+async def test_states_are_reconstructed_from_the_audit_log(client: AsyncClient):
+    before = datetime.utcnow()
+    flag_id, (created, enabled, renamed) = await _build_history(client)
+
+    assert (await _states_at(client, before))["flags"] == []
+    assert (await _states_at(client, created))["flags"] == [
+        {"id": flag_id, "name": "Checkout", "description": None, "is_enabled": False}
+    ]
+    assert (await _states_at(client, enabled))["flags"][0]["is_enabled"] is True
+    assert [
+        (flag["name"], flag["is_enabled"])
+        for flag in (await _states_at(client, renamed))["flags"]
+    ] == [("Checkout v2", True), ("Search", False)]
+
+
+async def test_timestamps_with_offset_are_converted_to_utc(client: AsyncClient):
+    _, (created, _, _) = await _build_history(client)
+    local = created.replace(tzinfo=timezone.utc).astimezone(
+        timezone(timedelta(hours=3, minutes=30))
+    )
+
+    body = await _states_at(client, local)
+
+    assert body["as_of"] == created.isoformat()
+    assert [flag["name"] for flag in body["flags"]] == ["Checkout"]
+
+
+async def test_checkpoints_limit_the_replay(
+    client: AsyncClient, flag_state_service: FlagStateService
+):
+    _, (created, enabled, renamed) = await _build_history(client)
+    uncheckpointed = await _states_at(client, renamed)
+
+    [checkpoint] = await flag_state_service.create_checkpoints(until=enabled)
+    assert checkpoint.flag_count == 1
+
+    checkpointed = await _states_at(client, renamed)
+    assert checkpointed["flags"] == uncheckpointed["flags"]
+    assert checkpointed["checkpoint_taken_at"] == enabled.isoformat()
+    # The rename and the second create, instead of all four changes.
+    assert uncheckpointed["replayed_changes"] == 4
+    assert checkpointed["replayed_changes"] == 2
+
+    # Earlier points in time still replay from the beginning.
+    before_checkpoint = await _states_at(client, created)
+    assert before_checkpoint["checkpoint_taken_at"] is None
+    assert before_checkpoint["flags"][0]["is_enabled"] is False
+
+
+async def test_checkpoint_is_skipped_without_new_changes(
+    client: AsyncClient, flag_state_service: FlagStateService
+):
+    _, (_, _, renamed) = await _build_history(client)
+
+    assert len(await flag_state_service.create_checkpoints(until=renamed)) == 1
+    assert (
+        await flag_state_service.create_checkpoints(
+            until=renamed + timedelta(seconds=1)
+        )
+        == []
+    )
+
+
+async def test_checkpoints_and_replays_are_per_project(
+    client: AsyncClient, flag_state_service: FlagStateService
+):
+    response = await client.post("/projects/", json={"name": "Acme"}, headers=HEADERS)
+    acme = {**HEADERS, "X-Project-Id": str(response.json()["id"])}
+    await client.post("/flags/", json={"name": "Wallet"}, headers=acme)
+    flag_id, (_, _, renamed) = await _build_history(client)
+
+    checkpoints = await flag_state_service.create_checkpoints(until=renamed)
+    assert sorted(
+        (checkpoint.project_id, checkpoint.flag_count) for checkpoint in checkpoints
+    ) == [(1, 2), (response.json()["id"], 1)]
+
+    await client.patch(
+        f"/flags/{flag_id}/toggle", json={"is_enabled": False}, headers=HEADERS
+    )
+    moment = datetime.utcnow()
+    default_states = await _states_at(client, moment)
+    acme_states = (
+        await client.get(
+            "/flags/as-of", params={"ts": moment.isoformat()}, headers=acme
+        )
+    ).json()
+
+    assert [flag["name"] for flag in default_states["flags"]] == [
+        "Checkout v2",
+        "Search",
+    ]
+    assert default_states["replayed_changes"] == 1
+    assert [flag["name"] for flag in acme_states["flags"]] == ["Wallet"]
+    assert acme_states["replayed_changes"] == 0
+    assert acme_states["checkpoint_taken_at"] == renamed.isoformat()
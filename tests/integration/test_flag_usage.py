@@ -0,0 +1,127 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app import create_app
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.flag_usage.counter import EvaluationCounter
+from src.flag_usage.flush import flush_flag_usage
+from src.flag_usage.model import FlagUsageDay
+from src.flag_usage.repository import FlagUsageRepository
+from src.flag_usage.service import FlagUsageService
+
+HEADERS = {"X-Actor": "release-manager"}
+
+
+@pytest.fixture
+async def usage_app(test_settings: Settings, db_session: AsyncSession):
+    settings = test_settings.model_copy(
+        update={
+            # The tests flush explicitly.
+            "flag_usage_flush_interval_s": 3600.0,
+            "warmup_preload": False,
+        }
+    )
+    app = create_app(settings=settings)
+    app.container.db_session.override(db_session)
+    return app
+
+
+@pytest.fixture
+async def usage_client(usage_app) -> AsyncGenerator[AsyncClient, None]:
+    async with usage_app.router.lifespan_context(usage_app):
+        transport = ASGITransport(app=usage_app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+async def _flush(app) -> int:
+    return await flush_flag_usage(
+        app.container.database(), app.container.flag_usage_counter()
+    )
+
+
+async def _create_flag(client: AsyncClient, name: str) -> int:
+    response = await client.post("/flags/", json={"name": name}, headers=HEADERS)
+    return response.json()["id"]
+
+
+async def test_reads_and_evaluations_are_counted_and_flushed(
+    usage_app, usage_client: AsyncClient, db_session: AsyncSession
+):
+    checkout, search, legacy, unused = [
+        await _create_flag(usage_client, name)
+        for name in ("Checkout", "Search", "Legacy", "Unused")
+    ]
+    for _ in range(3):
+        await usage_client.get(f"/flags/{checkout}", headers=HEADERS)
+    await usage_client.post(
+        "/flags/evaluate", json={"flag_ids": [checkout, search]}, headers=HEADERS
+    )
+    await usage_client.get("/flags/by-name/Search", headers=HEADERS)
+
+    pending = (await usage_client.get("/metrics")).json()["flag_usage"]
+    assert (pending["pending_flags"], pending["pending_evaluations"]) == (2, 6)
+    assert await _flush(usage_app) == 2
+    # Later flushes add to the day's row.
+    await usage_client.get(f"/flags/{checkout}", headers=HEADERS)
+    assert await _flush(usage_app) == 1
+    last_used = datetime.utcnow() - timedelta(days=40)
+    db_session.add(
+        FlagUsageDay(
+            flag_id=legacy,
+            day=last_used.date(),
+            evaluations=7,
+            last_evaluated_at=last_used,
+        )
+    )
+    await db_session.commit()
+
+    usage = (await usage_client.get(f"/flags/{checkout}/usage", headers=HEADERS)).json()
+    hot = (await usage_client.get("/flags/usage/hot", headers=HEADERS)).json()
+    stale = (await usage_client.get("/flags/usage/stale", headers=HEADERS)).json()
+
+    assert usage["evaluations"] == 5
+    assert [day["evaluations"] for day in usage["days"]] == [5]
+    assert usage["last_evaluated_at"] == usage["days"][0]["last_evaluated_at"]
+    assert [(flag["id"], flag["evaluations"]) for flag in hot] == [
+        (checkout, 5),
+        (search, 2),
+    ]
+    # Never evaluated first, then the longest unused.
+    assert [flag["id"] for flag in stale] == [unused, legacy]
+    assert stale[0]["last_evaluated_at"] is None
+    metrics = (await usage_client.get("/metrics")).json()["flag_usage"]
+    assert (metrics["pending_evaluations"], metrics["flushed_evaluations"]) == (0, 7)
+
+
+async def test_flush_drops_deleted_flags_and_keeps_counts_on_failure(
+    db_session: AsyncSession, feature_flag_repo: FeatureFlagRepository
+):
+    service = FlagUsageService(
+        repository=FlagUsageRepository(model=FlagUsageDay, db_session=db_session),
+        flag_repository=feature_flag_repo,
+    )
+    flag = FeatureFlag(name="Counted")
+    db_session.add(flag)
+    await db_session.commit()
+    counter = EvaluationCounter()
+    counter.record_many([flag.id, flag.id, 404])
+
+    assert await service.flush(counter) == 1
+    assert await service.flush(counter) == 0
+
+    async def failing_add_counts(**kwargs):
+        raise RuntimeError("database unavailable")
+
+    service.repository.add_counts = failing_add_counts
+    counter.record(flag.id)
+    with pytest.raises(RuntimeError):
+        await service.flush(counter)
+    assert counter.drain() == Counter({flag.id: 1})
@@ -0,0 +1,124 @@
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app import create_app
+from src.audit_logs.model import AuditLog
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+
+
+@pytest.fixture
+async def group_commit_app(test_settings: Settings, db_session: AsyncSession):
+    settings = test_settings.model_copy(
+        update={
+            "toggle_group_commit_window_ms": 50.0,
+            "warmup_preload": False,
+            # The write budget would otherwise split the burst into batches.
+            "admission_control_enabled": False,
+        }
+    )
+    app = create_app(settings=settings)
+    app.container.db_session.override(db_session)
+    return app
+
+
+@pytest.fixture
+async def group_commit_client(group_commit_app) -> AsyncGenerator[AsyncClient, None]:
+    async with group_commit_app.router.lifespan_context(group_commit_app):
+        transport = ASGITransport(app=group_commit_app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+async def test_concurrent_toggles_share_one_commit(
+    group_commit_app,
+    group_commit_client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    child = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Child", dependency_ids=[parent.id])
+    )
+    others = [
+        await feature_flag_repo.create(obj_in=FeatureFlagCreate(name=f"Other {i}"))
+        for i in range(4)
+    ]
+
+    commits = []
+
+    def on_commit(conn) -> None:
+        commits.append(conn)
+
+    engine = group_commit_app.container.database().engine.sync_engine
+    event.listen(engine, "commit", on_commit)
+    try:
+        responses = await asyncio.gather(
+            *(
+                group_commit_client.patch(
+                    f"/flags/{flag.id}/toggle",
+                    json={"is_enabled": True},
+                    headers={"X-Actor": f"actor-{flag.id}"},
+                )
+                for flag in [*others, child]
+            )
+        )
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert len(commits) == 1
+    # Each caller gets its own result: the child's parent is disabled.
+    assert [r.status_code for r in responses] == [200, 200, 200, 200, 400]
+    assert all(r.json()["is_enabled"] for r in responses[:4])
+    assert [r.json()["version"] for r in responses[:4]] == [2, 2, 2, 2]
+
+    logs = (
+        await db_session.execute(
+            select(AuditLog).where(AuditLog.action == "toggle").order_by(AuditLog.id)
+        )
+    ).scalars()
+    # Each toggle is audited under its own requester.
+    assert {(log.target_id, log.actor) for log in logs} == {
+        (str(flag.id), f"actor-{flag.id}") for flag in others
+    }
+
+
+async def test_group_commit_cascades_and_honours_if_match(
+    group_commit_client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+):
+    parent = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Parent", is_enabled=True)
+    )
+    child = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(
+            name="Child", is_enabled=True, dependency_ids=[parent.id]
+        )
+    )
+    headers = {"X-Actor": "group-commit"}
+
+    disable, stale = await asyncio.gather(
+        group_commit_client.patch(
+            f"/flags/{parent.id}/toggle", json={"is_enabled": False}, headers=headers
+        ),
+        group_commit_client.patch(
+            f"/flags/{child.id}/toggle",
+            json={"is_enabled": True},
+            headers={**headers, "If-Match": '"7"'},
+        ),
+    )
+
+    assert disable.status_code == 200
+    assert stale.status_code == 409
+    child_enabled = await db_session.scalar(
+        select(FeatureFlag.is_enabled).where(FeatureFlag.id == child.id)
+    )
+    assert child_enabled is False
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs.model import AuditLog
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from src.idempotency.cleanup import purge_expired_keys
+from src.idempotency.model import IdempotencyKey
+from src.idempotency.repository import IdempotencyKeyRepository
+from src.infrastructure.database import Database
+from src.middlewares.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    IDEMPOTENT_REPLAY_HEADER,
+)
+
+
+async def _count(db_session: AsyncSession, model, *criteria) -> int:
+    return await db_session.scalar(
+        select(func.count()).select_from(model).where(*criteria)
+    )
+
+
+async def test_retried_create_is_replayed(
+    client: AsyncClient, db_session: AsyncSession
+):
+    headers = {"X-Actor": "deployer", IDEMPOTENCY_KEY_HEADER: "create-1"}
+    payload = {"name": "Deployed"}
+
+    first = await client.post("/flags/", json=payload, headers=headers)
+    retry = await client.post("/flags/", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["ETag"] == first.headers["ETag"]
+    assert IDEMPOTENT_REPLAY_HEADER not in first.headers
+    assert retry.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+    assert await _count(db_session, FeatureFlag) == 1
+    assert await _count(db_session, AuditLog) == 1
+
+
+async def test_key_reused_for_another_request_is_rejected(client: AsyncClient):
+    headers = {"X-Actor": "deployer", IDEMPOTENCY_KEY_HEADER: "create-2"}
+
+    await client.post("/flags/", json={"name": "First"}, headers=headers)
+    response = await client.post("/flags/", json={"name": "Second"}, headers=headers)
+
+    assert response.status_code == 422
+
+
+async def test_concurrent_duplicates_wait_for_the_first_execution(
+    client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    db_session: AsyncSession,
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Toggled"))
+    headers = {"X-Actor": "deployer", IDEMPOTENCY_KEY_HEADER: "toggle-1"}
+
+    responses = await asyncio.gather(
+        *(
+            client.patch(
+                f"/flags/{flag.id}/toggle", json={"is_enabled": True}, headers=headers
+            )
+            for _ in range(3)
+        )
+    )
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.content for r in responses}) == 1
+    assert sum(IDEMPOTENT_REPLAY_HEADER in r.headers for r in responses) == 2
+    assert await _count(db_session, AuditLog, AuditLog.action == "toggle") == 1
+
+
+async def test_expired_keys_are_purged_in_batches(
+    test_settings: Settings, setup_database: None, db_session: AsyncSession
+):
+    db = Database(str(test_settings.postgres_dsn))
+    try:
+        async with db.session_scope():
+            repository = IdempotencyKeyRepository(
+                model=IdempotencyKey, db_session=db.get_session()
+            )
+            for i in range(5):
+                await repository.claim(
+                    key=f"expired-{i}", fingerprint=b"x", lease=timedelta(seconds=-1)
+                )
+            await repository.claim(
+                key="live", fingerprint=b"x", lease=timedelta(hours=1)
+            )
+
+        assert await purge_expired_keys(db, batch_size=2) == 5
+    finally:
+        await db.engine.dispose()
+
+    keys = (await db_session.execute(select(IdempotencyKey.key))).scalars().all()
+    assert keys == ["live"]
+
+
+async def test_running_requests_hold_their_key_for_a_lease_only(
+    test_settings: Settings, setup_database: None
+):
+    db = Database(str(test_settings.postgres_dsn))
+    try:
+        async with db.session_scope():
+            repository = IdempotencyKeyRepository(
+                model=IdempotencyKey, db_session=db.get_session()
+            )
+            assert await repository.claim(
+                key="running", fingerprint=b"x", lease=timedelta(seconds=40)
+            )
+            claimed = await repository.get("running")
+            leased_for = claimed.expires_at - claimed.created_at
+
+            await repository.complete(
+                key="running",
+                status_code=201,
+                headers={},
+                body=b"{}",
+                ttl=timedelta(days=1),
+            )
+            completed = await repository.get("running")
+            kept_for = completed.expires_at - completed.created_at
+    finally:
+        await db.engine.dispose()
+
+    assert leased_for == timedelta(seconds=40)
+    assert kept_for >= timedelta(days=1)
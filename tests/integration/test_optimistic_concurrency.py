@@ -0,0 +1,136 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.common.context import actor_context
+from src.feature_flags.exceptions import (
+    FeatureFlagVersionConflictException,
+    MissingDependenciesException,
+)
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from src.feature_flags.service import FeatureFlagService
+
+
+@pytest.fixture
+async def headers() -> dict:
+    actor_id = "occ-tester"
+    actor_context.set(actor_id)
+    return {"X-Actor": actor_id}
+
+
+async def test_toggle_returns_etag_and_honours_if_match(
+    client: AsyncClient, headers: dict, feature_flag_repo: FeatureFlagRepository
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Versioned"))
+    assert flag.version == 1
+
+    response = await client.patch(
+        f"/flags/{flag.id}/toggle",
+        json={"is_enabled": True},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+    stale = await client.patch(
+        f"/flags/{flag.id}/toggle",
+        json={"is_enabled": False},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert stale.status_code == 409
+
+    stale_update = await client.patch(
+        f"/flags/{flag.id}",
+        json={"description": "stale"},
+        headers={**headers, "If-Match": 'W/"1"'},
+    )
+    assert stale_update.status_code == 409
+
+
+async def test_invalid_if_match_is_rejected(
+    client: AsyncClient, headers: dict, feature_flag_repo: FeatureFlagRepository
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Versioned"))
+
+    response = await client.patch(
+        f"/flags/{flag.id}/toggle",
+        json={"is_enabled": True},
+        headers={**headers, "If-Match": "not-a-version"},
+    )
+    assert response.status_code == 400
+
+
+async def test_concurrent_enable_and_disable_keep_dependency_rule(
+    session_factory: Callable[[], AsyncSession],
+):
+    """
+    Races enabling a chain of dependents against disabling its root. Whatever
+    the interleaving, no flag may end up enabled with a disabled dependency.
+    """
+    async with session_factory() as session:
+        repo = FeatureFlagRepository(model=FeatureFlag, db_session=session)
+        root = await repo.create(obj_in=FeatureFlagCreate(name="Root", is_enabled=True))
+        middle = await repo.create(
+            obj_in=FeatureFlagCreate(
+                name="Middle", is_enabled=True, dependency_ids=[root.id]
+            )
+        )
+        leaves = [
+            await repo.create(
+                obj_in=FeatureFlagCreate(name=f"Leaf {i}", dependency_ids=[middle.id])
+            )
+            for i in range(8)
+        ]
+        leaf_ids = [leaf.id for leaf in leaves]
+        all_ids = [root.id, middle.id, *leaf_ids]
+
+    async def toggle(flag_id: int, is_enabled: bool, delay: float = 0) -> None:
+        await asyncio.sleep(delay)
+        async with session_factory() as session:
+            service = FeatureFlagService(
+                FeatureFlagRepository(model=FeatureFlag, db_session=session)
+            )
+            try:
+                await service.toggle(flag_id=flag_id, is_enabled=is_enabled)
+            except (MissingDependenciesException, FeatureFlagVersionConflictException):
+                pass
+
+    for round_number in range(20):
+        async with session_factory() as session:
+            await session.execute(
+                update(FeatureFlag)
+                .where(FeatureFlag.id.in_([root.id, middle.id]))
+                .values(is_enabled=True)
+            )
+            await session.execute(
+                update(FeatureFlag)
+                .where(FeatureFlag.id.in_(leaf_ids))
+                .values(is_enabled=False)
+            )
+            await session.commit()
+
+        # Stagger the disable so it lands at different points of the enables.
+        await asyncio.gather(
+            toggle(root.id, False, delay=0.001 * (round_number % 10)),
+            *(toggle(leaf_id, True) for leaf_id in leaf_ids),
+        )
+
+        async with session_factory() as session:
+            flags = (
+                await session.execute(
+                    select(FeatureFlag)
+                    .options(selectinload(FeatureFlag.dependencies))
+                    .where(FeatureFlag.id.in_(all_ids))
+                )
+            ).scalars()
+            for flag in flags:
+                if flag.is_enabled:
+                    assert all(dep.is_enabled for dep in flag.dependencies), flag.name
@@ -0,0 +1,122 @@
+import logging
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app import create_app
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.infrastructure.profiling import SlowQueryLogger
+from src.middlewares.profiling import PROFILE_FILE_HEADER, PROFILE_HEADER
+
+
+@pytest.fixture
+async def profiling_client(
+    test_settings: Settings, db_session: AsyncSession, tmp_path: Path
+) -> AsyncGenerator[AsyncClient, None]:
+    settings = test_settings.model_copy(
+        update={
+            "profiling_header_token": "let-me-profile",
+            "profiling_output_dir": str(tmp_path),
+        }
+    )
+    app = create_app(settings=settings)
+    app.container.db_session.override(db_session)
+
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+async def test_profiled_request_writes_folded_stacks(
+    profiling_client: AsyncClient, tmp_path: Path
+):
+    response = await profiling_client.get(
+        "/flags/", headers={"X-Actor": "profiler", PROFILE_HEADER: "let-me-profile"}
+    )
+
+    assert response.status_code == 200
+    profile = tmp_path / response.headers[PROFILE_FILE_HEADER]
+    assert profile.exists()
+
+
+async def test_request_without_token_is_not_profiled(
+    profiling_client: AsyncClient, tmp_path: Path
+):
+    response = await profiling_client.get(
+        "/flags/", headers={"X-Actor": "profiler", PROFILE_HEADER: "wrong-token"}
+    )
+
+    assert response.status_code == 200
+    assert PROFILE_FILE_HEADER not in response.headers
+    assert not any(tmp_path.iterdir())
+
+
+async def test_slow_query_is_logged_with_plan(
+    db_session: AsyncSession, caplog: pytest.LogCaptureFixture
+):
+    engine = db_session.bind.sync_engine
+    slow_query_logger = SlowQueryLogger(threshold_ms=0)
+    slow_query_logger.attach(engine)
+    try:
+        with caplog.at_level(logging.WARNING, logger="src.infrastructure.profiling"):
+            await db_session.execute(
+                select(FeatureFlag).where(FeatureFlag.name == "missing")
+            )
+    finally:
+        slow_query_logger.detach(engine)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("Slow query" in m and "missing" in m for m in messages)
+    assert any("Buffers" in m or "actual time" in m for m in messages)
+
+
+async def test_explaining_leaves_statements_and_transaction_intact(
+    db_session: AsyncSession, caplog: pytest.LogCaptureFixture
+):
+    engine = db_session.bind.sync_engine
+    slow_query_logger = SlowQueryLogger(threshold_ms=0)
+    slow_query_logger.attach(engine)
+    try:
+        with caplog.at_level(logging.WARNING, logger="src.infrastructure.profiling"):
+            await db_session.execute(
+                text(
+                    "WITH created AS (INSERT INTO projects (name, has_partition) "
+                    "VALUES ('Once', false) RETURNING id) SELECT count(*) FROM created"
+                )
+            )
+            # Cannot be explained at all.
+            await db_session.execute(text("SHOW search_path"))
+            created = await db_session.scalar(
+                text("SELECT count(*) FROM projects WHERE name = 'Once'")
+            )
+    finally:
+        slow_query_logger.detach(engine)
+
+    assert created == 1
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("SHOW search_path" in m and "<not available>" in m for m in messages)
+
+
+async def test_failed_statements_leave_no_start_on_the_connection(
+    db_session: AsyncSession,
+):
+    engine = db_session.bind.sync_engine
+    slow_query_logger = SlowQueryLogger(threshold_ms=60_000)
+    slow_query_logger.attach(engine)
+    try:
+        with pytest.raises(ProgrammingError):
+            await db_session.execute(text("SELECT * FROM no_such_table"))
+        await db_session.rollback()
+        connection = await db_session.connection()
+        starts = connection.sync_connection.info.get(SlowQueryLogger._START_KEY)
+    finally:
+        slow_query_logger.detach(engine)
+
+    assert starts == []
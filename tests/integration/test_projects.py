@@ -0,0 +1,90 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.settings import Settings
+from src.infrastructure.database import Database
+from src.projects.exceptions import ProjectConflictException
+from src.projects.partition import create_audit_partition
+
+HEADERS = {"X-Actor": "platform-team"}
+
+
+async def _create_project(client: AsyncClient, name: str) -> dict[str, str]:
+    response = await client.post("/projects/", json={"name": name}, headers=HEADERS)
+    assert response.status_code == 201
+    return {**HEADERS, "X-Project-Id": str(response.json()["id"])}
+
+
+async def _create_flag(client: AsyncClient, headers: dict, name: str, **fields):
+    return await client.post("/flags/", json={"name": name, **fields}, headers=headers)
+
+
+async def test_flags_and_dependencies_are_isolated_per_project(client: AsyncClient):
+    acme = await _create_project(client, "Acme")
+    default_flag = (await _create_flag(client, HEADERS, "Checkout")).json()
+    acme_flag = await _create_flag(client, acme, "Checkout", is_enabled=True)
+
+    cross_dependency = await _create_flag(
+        client, acme, "Wallet", dependency_ids=[default_flag["id"]]
+    )
+    cross_read = await client.get(f"/flags/{default_flag['id']}", headers=acme)
+    unknown_project = await _create_flag(
+        client, {**HEADERS, "X-Project-Id": "404"}, "Orphan"
+    )
+
+    # Names are unique per project only.
+    assert acme_flag.status_code == 201
+    assert cross_dependency.status_code == 404
+    assert cross_read.status_code == 404
+    assert unknown_project.status_code == 404
+    acme_flags = (await client.get("/flags/", headers=acme)).json()
+    assert [flag["id"] for flag in acme_flags] == [acme_flag.json()["id"]]
+    search = (
+        await client.get("/flags/search", params={"q": "check"}, headers=HEADERS)
+    ).json()
+    assert [flag["id"] for flag in search] == [default_flag["id"]]
+    dev = (await client.get("/environments/dev/flags", headers=acme)).json()
+    assert [flag["id"] for flag in dev] == [acme_flag.json()["id"]]
+
+
+async def test_history_is_scoped_and_moved_into_a_project_partition(
+    client: AsyncClient, db_session: AsyncSession, test_settings: Settings
+):
+    acme = await _create_project(client, "Acme")
+    await _create_flag(client, HEADERS, "Search")
+    for name in ("Payments", "Wallet", "Loyalty"):
+        await _create_flag(client, acme, name)
+    project_id = acme["X-Project-Id"]
+    db = Database(str(test_settings.postgres_dsn))
+
+    try:
+        moved = await create_audit_partition(db, int(project_id), batch_size=2)
+        with pytest.raises(ProjectConflictException):
+            await create_audit_partition(db, int(project_id), batch_size=2)
+    finally:
+        await db.engine.dispose()
+    await _create_flag(client, acme, "Rewards")
+
+    assert moved == 3
+    history = (await client.get("/history/", headers=acme)).json()
+    assert [entry["details"]["created"]["name"] for entry in history] == [
+        "Rewards",
+        "Loyalty",
+        "Wallet",
+        "Payments",
+    ]
+    default_history = (await client.get("/history/", headers=HEADERS)).json()
+    [created] = default_history
+    assert created["details"]["created"]["name"] == "Search"
+    placement = await db_session.execute(
+        text(
+            "SELECT tableoid::regclass::text, count(*) FROM audit_logs "
+            "GROUP BY 1 ORDER BY 1"
+        )
+    )
+    assert placement.all() == [
+        (f"audit_logs_p{project_id}", 4),
+        ("audit_logs_shared", 1),
+    ]
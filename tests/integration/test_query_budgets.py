@@ -0,0 +1,70 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.context import actor_context
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from tests.query_budget import QueryBudget
+
+
+@pytest.fixture
+async def headers() -> dict:
+    actor_id = "budget-tester"
+    actor_context.set(actor_id)
+    return {"X-Actor": actor_id}
+
+
+@pytest.mark.parametrize("flag_count", [1, 10, 50])
+async def test_get_all_flags_query_budget_is_independent_of_page_size(
+    client: AsyncClient,
+    headers: dict,
+    feature_flag_repo: FeatureFlagRepository,
+    query_budget: QueryBudget,
+    flag_count: int,
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Root"))
+    for i in range(flag_count):
+        await feature_flag_repo.create(
+            obj_in=FeatureFlagCreate(name=f"Flag {i}", dependency_ids=[parent.id])
+        )
+
+    with query_budget(3, label="GET /flags/"):
+        response = await client.get("/flags/", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == flag_count + 1
+
+
+async def test_get_history_query_budget(
+    client: AsyncClient,
+    headers: dict,
+    feature_flag_repo: FeatureFlagRepository,
+    query_budget: QueryBudget,
+):
+    for i in range(5):
+        await feature_flag_repo.create(obj_in=FeatureFlagCreate(name=f"Flag {i}"))
+
+    with query_budget(1, label="GET /history/"):
+        response = await client.get("/history/", headers=headers)
+
+    assert response.status_code == 200
+
+
+async def test_query_budget_reports_repeated_statements(
+    db_session: AsyncSession, query_budget: QueryBudget
+):
+    with pytest.raises(pytest.fail.Exception, match="repeated identical statements"):
+        with query_budget(10, label="synthetic"):
+            await db_session.execute(text("SELECT 1"))
+            await db_session.execute(text("SELECT 1"))
+
+
+async def test_query_budget_reports_exceeded_budget(
+    db_session: AsyncSession, query_budget: QueryBudget
+):
+    with pytest.raises(pytest.fail.Exception, match="issued 2 queries, budget is 1"):
+        with query_budget(1, label="synthetic"):
+            await db_session.execute(text("SELECT 1"))
+            await db_session.execute(text("SELECT 2"))
@@ -0,0 +1,201 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.context import DEFAULT_PROJECT_ID
+from src.common.settings import Settings
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.service import FeatureFlagService
+from src.infrastructure.database import Database
+from src.schedules.model import ScheduledToggle
+from src.schedules.scheduler import ToggleScheduler
+
+HEADERS = {"X-Actor": "release-manager"}
+
+
+async def _create_flag(client: AsyncClient, name: str, **fields) -> int:
+    response = await client.post(
+        "/flags/", json={"name": name, **fields}, headers=HEADERS
+    )
+    return response.json()["id"]
+
+
+async def _schedule(
+    client: AsyncClient, flag_id: int, is_enabled: bool, due_at: datetime
+) -> dict:
+    response = await client.post(
+        f"/flags/{flag_id}/schedules",
+        json={"is_enabled": is_enabled, "due_at": due_at.isoformat()},
+        headers=HEADERS,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _wait_until_run(client: AsyncClient, flag_id: int) -> dict:
+    """Waits for the app's scheduler to run the flag's first schedule."""
+    for _ in range(100):
+        response = await client.get(f"/flags/{flag_id}/schedules", headers=HEADERS)
+        first = response.json()[0]
+        if first["status"] != "pending":
+            return first
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"The schedule of flag {flag_id} did not run.")
+
+
+async def test_due_toggles_run_with_the_dependency_rules(client: AsyncClient):
+    parent = await _create_flag(client, "Payments")
+    child = await _create_flag(client, "Wallet", dependency_ids=[parent])
+    now = datetime.utcnow()
+    # The child comes first, while its dependency is still disabled.
+    await _schedule(client, child, True, now - timedelta(minutes=2))
+    await _schedule(client, parent, True, now - timedelta(minutes=1))
+    later = await _schedule(client, child, False, now + timedelta(hours=1))
+
+    rejected = await _wait_until_run(client, child)
+    launched = await _wait_until_run(client, parent)
+
+    assert (rejected["status"], rejected["error"]) == (
+        "failed",
+        "Cannot enable due to inactive dependencies.",
+    )
+    assert launched["status"] == "done"
+    assert launched["executed_at"] is not None
+    flag = (await client.get(f"/flags/{parent}", headers=HEADERS)).json()
+    assert flag["is_enabled"] is True
+    schedules = (await client.get(f"/flags/{child}/schedules", headers=HEADERS)).json()
+    assert schedules[1] == later
+    history = (
+        await client.get(
+            "/history/",
+            params={"target_id": str(parent), "action": "toggle"},
+            headers=HEADERS,
+        )
+    ).json()
+    [toggled] = history
+    assert toggled["actor"] == "release-manager"
+    metrics = (await client.get("/metrics")).json()["toggle_scheduler"]
+    assert (metrics["executed"], metrics["failed"]) == (1, 1)
+
+
+async def test_schedules_are_cancelled_only_while_pending(client: AsyncClient):
+    flag = await _create_flag(client, "Beta")
+    now = datetime.utcnow()
+    ran = await _schedule(client, flag, True, now - timedelta(minutes=1))
+    pending = await _schedule(client, flag, False, now + timedelta(days=1))
+    await _wait_until_run(client, flag)
+
+    cancelled = await client.post(
+        f"/flags/{flag}/schedules/{pending['id']}/cancel", headers=HEADERS
+    )
+    again = await client.post(
+        f"/flags/{flag}/schedules/{pending['id']}/cancel", headers=HEADERS
+    )
+    already_ran = await client.post(
+        f"/flags/{flag}/schedules/{ran['id']}/cancel", headers=HEADERS
+    )
+    other_flag = await client.post(
+        f"/flags/{flag + 1}/schedules/{pending['id']}/cancel", headers=HEADERS
+    )
+    unknown_flag = await client.post(
+        f"/flags/{flag + 1}/schedules",
+        json={"is_enabled": True, "due_at": now.isoformat()},
+        headers=HEADERS,
+    )
+
+    assert cancelled.json()["status"] == "cancelled"
+    assert again.status_code == 409
+    assert already_ran.status_code == 409
+    assert other_flag.status_code == 404
+    assert unknown_flag.status_code == 404
+
+
+async def test_due_toggles_locked_by_another_worker_are_skipped(
+    test_settings: Settings, db_session: AsyncSession, session_factory
+):
+    flags = [FeatureFlag(name=name) for name in ("Search", "Checkout", "Rewards")]
+    db_session.add_all(flags)
+    await db_session.commit()
+    now = datetime.utcnow()
+    due, locked, future = [
+        ScheduledToggle(
+            project_id=DEFAULT_PROJECT_ID,
+            flag_id=flag.id,
+            is_enabled=True,
+            due_at=due_at,
+            actor="release-manager",
+        )
+        for flag, due_at in zip(
+            flags,
+            [
+                now - timedelta(minutes=2),
+                now - timedelta(minutes=1),
+                now + timedelta(hours=1),
+            ],
+        )
+    ]
+    db_session.add_all([due, locked, future])
+    await db_session.commit()
+    db = Database(str(test_settings.postgres_dsn))
+    scheduler = ToggleScheduler(db)
+
+    async with session_factory() as other_worker:
+        await other_worker.execute(
+            select(ScheduledToggle)
+            .where(ScheduledToggle.id == locked.id)
+            .with_for_update()
+        )
+        # The locked toggle is neither run nor waited for.
+        next_due_at = await scheduler.run_due()
+        assert scheduler.executed == 1
+        await other_worker.rollback()
+    next_due_at_after_release = await scheduler.run_due()
+    await db.engine.dispose()
+
+    assert next_due_at == next_due_at_after_release == future.due_at
+    assert scheduler.executed == 2
+    states = await db_session.execute(
+        select(FeatureFlag.name, FeatureFlag.is_enabled).order_by(FeatureFlag.id)
+    )
+    assert states.all() == [("Search", True), ("Checkout", True), ("Rewards", False)]
+    statuses = await db_session.execute(
+        select(ScheduledToggle.status).order_by(ScheduledToggle.id)
+    )
+    assert statuses.scalars().all() == ["done", "done", "pending"]
+
+
+async def test_unexpected_errors_fail_the_toggle_without_retrying_it(
+    test_settings: Settings, db_session: AsyncSession, monkeypatch
+):
+    flag = FeatureFlag(name="Search")
+    db_session.add(flag)
+    await db_session.commit()
+    db_session.add(
+        ScheduledToggle(
+            project_id=DEFAULT_PROJECT_ID,
+            flag_id=flag.id,
+            is_enabled=True,
+            due_at=datetime.utcnow() - timedelta(minutes=1),
+            actor="release-manager",
+        )
+    )
+    await db_session.commit()
+
+    async def failing_toggle(self, **kwargs):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(FeatureFlagService, "toggle", failing_toggle)
+    db = Database(str(test_settings.postgres_dsn))
+    scheduler = ToggleScheduler(db)
+    next_due_at = await scheduler.run_due()
+    await db.engine.dispose()
+
+    assert next_due_at is None
+    assert scheduler.failed == 1
+    outcome = await db_session.execute(
+        select(ScheduledToggle.status, ScheduledToggle.error)
+    )
+    assert outcome.all() == [("failed", "RuntimeError('connection lost')")]
@@ -0,0 +1,104 @@
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.audit_logs.model import AuditLog
+from src.audit_logs.schemas import AuditLog as AuditLogSchema
+from src.feature_flags.model import FeatureFlag
+from src.feature_flags.schemas import FeatureFlag as FeatureFlagSchema
+
+HEADERS = {"X-Actor": "serializer"}
+
+
+async def _create_flags(client: AsyncClient) -> list[dict]:
+    base = (
+        await client.post(
+            "/flags/",
+            json={"name": "Base", "description": "Root", "is_enabled": True},
+            headers=HEADERS,
+        )
+    ).json()
+    other = (
+        await client.post("/flags/", json={"name": "Other"}, headers=HEADERS)
+    ).json()
+    child = (
+        await client.post(
+            "/flags/",
+            json={"name": "Child", "dependency_ids": [other["id"], base["id"]]},
+            headers=HEADERS,
+        )
+    ).json()
+    return [base, other, child]
+
+
+async def test_flag_list_matches_response_model(
+    client: AsyncClient, db_session: AsyncSession
+):
+    await _create_flags(client)
+
+    response = await client.get("/flags/", headers=HEADERS)
+
+    flags = (
+        (await db_session.execute(select(FeatureFlag).order_by(FeatureFlag.id)))
+        .scalars()
+        .all()
+    )
+    for flag in flags:
+        flag.dependencies.sort(key=lambda dependency: dependency.id)
+    adapter = TypeAdapter(list[FeatureFlagSchema])
+    assert response.content == adapter.dump_json(
+        adapter.validate_python(flags, from_attributes=True)
+    )
+
+
+async def test_history_matches_response_model(
+    client: AsyncClient, db_session: AsyncSession
+):
+    await _create_flags(client)
+
+    response = await client.get("/history/", headers=HEADERS)
+
+    logs = (
+        (await db_session.execute(select(AuditLog).order_by(AuditLog.timestamp.desc())))
+        .scalars()
+        .all()
+    )
+    adapter = TypeAdapter(list[AuditLogSchema])
+    assert response.content == adapter.dump_json(
+        adapter.validate_python(logs, from_attributes=True)
+    )
+
+
+async def test_cached_fragments_follow_changes(client: AsyncClient):
+    base, _, child = await _create_flags(client)
+    await client.get("/flags/", headers=HEADERS)
+
+    await client.patch(
+        f"/flags/{base['id']}", json={"name": "Renamed base"}, headers=HEADERS
+    )
+    flags = {f["id"]: f for f in (await client.get("/flags/", headers=HEADERS)).json()}
+
+    assert flags[base["id"]]["name"] == "Renamed base"
+    assert {"id": base["id"], "name": "Renamed base"} in flags[child["id"]][
+        "dependencies"
+    ]
+
+    metrics = (await client.get("/metrics")).json()["fragment_cache"]
+    assert metrics["feature_flags"]["hits"] >= 1
+
+
+async def test_openapi_keeps_response_models(client: AsyncClient):
+    paths = (await client.get("/openapi.json")).json()["paths"]
+
+    def response_schema(path: str) -> dict:
+        return paths[path]["get"]["responses"]["200"]["content"]["application/json"][
+            "schema"
+        ]
+
+    assert response_schema("/flags/")["items"] == {
+        "$ref": "#/components/schemas/FeatureFlag"
+    }
+    assert response_schema("/history/")["items"] == {
+        "$ref": "#/components/schemas/AuditLog"
+    }
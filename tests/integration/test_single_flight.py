@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from src.infrastructure.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(
+        *(single_flight.do(("answer",), load) for _ in range(5))
+    )
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert single_flight.stats()["answer"] == {
+        "requests": 5,
+        "executions": 1,
+        "shared": 4,
+        "coalescing_ratio": 0.8,
+    }
+
+
+async def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(single_flight.do(("fail",), fail) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed() -> str:
+        return "ok"
+
+    assert await single_flight.do(("fail",), succeed) == "ok"
+
+
+async def test_waiters_take_over_when_the_first_caller_is_cancelled():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def load() -> str:
+        started.set()
+        await asyncio.sleep(0.05)
+        return "loaded"
+
+    leader = asyncio.create_task(single_flight.do(("key",), load))
+    await started.wait()
+    follower = asyncio.create_task(single_flight.do(("key",), load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "loaded"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_identical_list_requests_are_coalesced(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    for i in range(3):
+        await feature_flag_repo.create(obj_in=FeatureFlagCreate(name=f"Flag {i}"))
+    headers = {"X-Actor": "sdk"}
+
+    responses = await asyncio.gather(
+        *(client.get("/flags/", headers=headers) for _ in range(10))
+    )
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.content for r in responses}) == 1
+    assert [flag["name"] for flag in responses[0].json()] == [
+        "Flag 0",
+        "Flag 1",
+        "Flag 2",
+    ]
+
+    metrics = (await client.get("/metrics")).json()["single_flight"]["flags.get_all"]
+    assert metrics["requests"] == 10
+    assert metrics["executions"] < 10
@@ -0,0 +1,84 @@
+from httpx import AsyncClient
+
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate
+from tests.query_budget import QueryBudget
+
+HEADERS = {"X-Actor": "sdk"}
+
+
+async def test_fields_without_expansion_load_in_one_query(
+    client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    query_budget: QueryBudget,
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Child", dependency_ids=[parent.id])
+    )
+
+    with query_budget(1, label="GET /flags/?fields=name,is_enabled&expand="):
+        response = await client.get(
+            "/flags/",
+            params={"fields": "name,is_enabled", "expand": ""},
+            headers=HEADERS,
+        )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"name": "Parent", "is_enabled": False, "id": parent.id},
+        {"name": "Child", "is_enabled": False, "id": parent.id + 1},
+    ]
+
+
+async def test_dependents_can_be_expanded(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    child = await feature_flag_repo.create(
+        obj_in=FeatureFlagCreate(name="Child", dependency_ids=[parent.id])
+    )
+
+    response = await client.get(
+        f"/flags/{parent.id}",
+        params={"fields": "name", "expand": "dependencies,dependents"},
+        headers=HEADERS,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{parent.version}"'
+    assert response.json() == {
+        "name": "Parent",
+        "id": parent.id,
+        "dependencies": [],
+        "dependents": [{"id": child.id, "name": "Child"}],
+    }
+
+
+async def test_default_response_is_unchanged(
+    client: AsyncClient, feature_flag_repo: FeatureFlagRepository
+):
+    flag = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Flag"))
+
+    response = await client.get(f"/flags/{flag.id}", headers=HEADERS)
+
+    assert list(response.json()) == [
+        "name",
+        "description",
+        "is_enabled",
+        "id",
+        "version",
+        "dependencies",
+    ]
+
+
+async def test_unknown_fields_are_rejected(client: AsyncClient):
+    response = await client.get(
+        "/flags/", params={"fields": "name,owner"}, headers=HEADERS
+    )
+    assert response.status_code == 400
+
+    response = await client.get(
+        "/flags/", params={"expand": "parents"}, headers=HEADERS
+    )
+    assert response.status_code == 400
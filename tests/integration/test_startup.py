@@ -0,0 +1,34 @@
+import asyncio
+
+from httpx import AsyncClient
+
+
+async def wait_until_ready(client: AsyncClient, timeout: float = 10.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        response = await client.get("/ready")
+        if response.status_code == 200:
+            return response.json()
+        assert asyncio.get_running_loop().time() < deadline, response.json()
+        await asyncio.sleep(0.05)
+
+
+async def test_ready_passes_after_warm_up(client: AsyncClient):
+    body = await wait_until_ready(client)
+
+    assert body["ready"] is True
+    assert body["warmup_error"] is None
+    phases = body["phases"]
+    for phase in ("imports", "app_created", "container_wired", "pool_warm", "ready"):
+        assert phase in phases
+    assert phases["pool_warm"] <= phases["ready"]
+
+
+async def test_first_fast_request_is_tracked(client: AsyncClient):
+    await wait_until_ready(client)
+
+    response = await client.get("/flags/", headers={"X-Actor": "startup"})
+    assert response.status_code == 200
+
+    body = (await client.get("/ready")).json()
+    assert body["time_to_first_fast_request"] is not None
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app import create_app
+from src.common.settings import Settings
+from src.feature_flags.repository import FeatureFlagRepository
+from src.feature_flags.schemas import FeatureFlagCreate, FeatureFlagUpdate
+from src.infrastructure.tracing import tracer
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path) -> Path:
+    return tmp_path / "traces.jsonl"
+
+
+@pytest.fixture
+async def tracing_client(
+    test_settings: Settings, db_session: AsyncSession, trace_file: Path
+) -> AsyncGenerator[AsyncClient, None]:
+    settings = test_settings.model_copy(update={"tracing_export_path": str(trace_file)})
+    app = create_app(settings=settings)
+    app.container.db_session.override(db_session)
+    tracer.instrument_engine(db_session.bind.sync_engine)
+
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+def read_spans(trace_file: Path) -> list[dict]:
+    spans = []
+    for line in trace_file.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return spans
+
+
+async def test_toggle_produces_nested_spans(
+    tracing_client: AsyncClient,
+    feature_flag_repo: FeatureFlagRepository,
+    trace_file: Path,
+):
+    parent = await feature_flag_repo.create(obj_in=FeatureFlagCreate(name="Parent"))
+    parent = await feature_flag_repo.update(
+        db_obj=parent, obj_in=FeatureFlagUpdate(is_enabled=True)
+    )
+    remote_trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    response = await tracing_client.patch(
+        f"/flags/{parent.id}/toggle",
+        json={"is_enabled": False},
+        headers={
+            "X-Actor": "tracer",
+            "traceparent": f"00-{remote_trace_id}-00f067aa0ba902b7-01",
+        },
+    )
+
+    assert response.status_code == 200
+    assert remote_trace_id in response.headers["traceparent"]
+
+    spans = [s for s in read_spans(trace_file) if s["traceId"] == remote_trace_id]
+    by_id = {s["spanId"]: s for s in spans}
+    by_name = {s["name"]: s for s in spans}
+
+    root = by_name["PATCH /flags/{flag_id}/toggle"]
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+
+    service_span = by_name["FeatureFlagService.toggle"]
+    assert service_span["parentSpanId"] == root["spanId"]
+    attributes = {a["key"]: a["value"] for a in service_span["attributes"]}
+    assert attributes["enduser.id"] == {"stringValue": "tracer"}
+    assert attributes["audit.action"] == {"stringValue": "toggle"}
+
+    assert by_id[by_name["FeatureFlagRepository.get"]["parentSpanId"]] is service_span
+    assert any(s["name"] == "SELECT" for s in spans)
+    assert "Session.flush" in by_name
+    assert "audit.log_update" in by_name
@@ -0,0 +1,105 @@
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class RecordedStatement:
+    statement: str
+    parameters: Any
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.statement, repr(self.parameters)
+
+    def __str__(self) -> str:
+        return f"{self.statement}  -- params: {self.parameters!r}"
+
+
+@dataclass
+class QueryBudget:
+    """
+    Records every SQL statement sent through an engine while it is active.
+
+    Tests use it as a context manager around a single request, declaring the
+    maximum number of statements the request may issue. Exceeding the budget,
+    or repeating an identical statement (a typical N+1 symptom), fails the test
+    with the offending statements listed.
+    """
+
+    engine: Engine
+    statements: list[RecordedStatement] = field(default_factory=list)
+    _recording: bool = False
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if self._recording:
+            self.statements.append(RecordedStatement(statement, parameters))
+
+    def attach(self) -> None:
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def detach(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self) -> list[tuple[RecordedStatement, int]]:
+        """Returns identical statements (same SQL and parameters) issued more than once."""
+        counts = Counter(s.key for s in self.statements)
+        seen: set[tuple[str, str]] = set()
+        repeats = []
+        for s in self.statements:
+            if counts[s.key] > 1 and s.key not in seen:
+                seen.add(s.key)
+                repeats.append((s, counts[s.key]))
+        return repeats
+
+    @contextmanager
+    def __call__(
+        self,
+        max_queries: int,
+        *,
+        label: str = "request",
+        allow_repeats: bool = False,
+    ) -> Iterator["QueryBudget"]:
+        """
+        Asserts that the enclosed block issues at most `max_queries` statements.
+
+        :param max_queries: The statement budget for the enclosed block.
+        :param label: A human readable name used in the failure message.
+        :param allow_repeats: Skip the identical-statement check.
+        """
+        self.statements = []
+        self._recording = True
+        try:
+            yield self
+        finally:
+            self._recording = False
+
+        if self.count > max_queries:
+            pytest.fail(
+                f"{label} issued {self.count} queries, budget is {max_queries}:\n"
+                + self._format(self.statements),
+                pytrace=False,
+            )
+
+        repeats = self.repeated()
+        if repeats and not allow_repeats:
+            pytest.fail(
+                f"{label} repeated identical statements (possible N+1):\n"
+                + "\n".join(f"  [{n}x] {s}" for s, n in repeats),
+                pytrace=False,
+            )
+
+    @staticmethod
+    def _format(statements: list[RecordedStatement]) -> str:
+        return "\n".join(f"  {i}. {s}" for i, s in enumerate(statements, start=1))